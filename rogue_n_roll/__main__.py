@@ -1,10 +1,5 @@
-from rogue_n_roll.engine.game_engine import GameEngine
-
-
-def main():
-    engine = GameEngine()
-    engine.game_loop()
+from rogue_n_roll.main import main
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,353 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from rogue_n_roll.engine.combat import resolve_attacks
+from rogue_n_roll.engine.game_engine import GameEngine
+from rogue_n_roll.game_objects.entity_store import default_store
+from rogue_n_roll.game_objects.items import HealthPotion
+from rogue_n_roll.game_objects.monster import Monster
+from rogue_n_roll.game_objects.player import Player
+from rogue_n_roll.map.game_map import GameMap
+from rogue_n_roll.map.map_generator import MapGenerator
+
+BENCH_VERSION = 1
+
+# Размеры сценариев: ширина карты, высота карты, количество монстров
+SIZES: Dict[str, Tuple[int, int, int]] = {
+    "small": (80, 43, 10),
+    "medium": (200, 200, 200),
+    "large": (500, 500, 2000),
+}
+
+# Количество поисков по карте за один замер
+LOOKUPS_PER_SAMPLE = 1000
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class World:
+    """Подготовленный мир для сценария."""
+
+    game_map: GameMap
+    player: Player
+    floor: np.ndarray  # (n, 2) координаты проходимых клеток: x, y
+
+
+@dataclass
+class BenchResult:
+    """Результат одного сценария. Время указано в миллисекундах на замер."""
+
+    name: str
+    size: str
+    repeat: int
+    ops_per_sample: int
+    p50: float
+    p90: float
+    p99: float
+    mean: float
+    min: float
+    max: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.size}"
+
+
+@dataclass
+class Regression:
+    """Замедление сценария относительно базовой линии."""
+
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def build_world(size: str, seed: int = 0) -> World:
+    """Генерирует карту заданного размера и расставляет игрока и монстров."""
+    width, height, monsters = SIZES[size]
+    rng = random.Random(seed)
+    # Количество комнат растет с площадью карты, чтобы плотность была сопоставимой
+    max_rooms = max(30, width * height // 120)
+    generator = MapGenerator(width, height, max_rooms=max_rooms, rng=rng)
+    game_map, rooms = generator.generate_map()
+
+    ys, xs = np.nonzero(game_map.tiles["walkable"])
+    floor = np.stack([xs, ys], axis=1)
+    player = Player(*rooms[0].center)
+    game_map.add_entity(player)
+    for index in rng.sample(range(len(floor)), min(monsters, len(floor) - 1)):
+        x, y = (int(value) for value in floor[index])
+        if game_map.is_walkable(x, y):
+            game_map.add_entity(Monster.create_orc(x, y))
+    return World(game_map, player, floor)
+
+
+# Сценарий получает подготовленный мир и возвращает замеряемую функцию
+# и количество операций в одном ее вызове
+Scenario = Callable[[World, str], Tuple[Callable[[], None], int]]
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    """Регистрирует сценарий под именем name."""
+
+    def register(function: Scenario) -> Scenario:
+        SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+@scenario("render")
+def bench_render(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Полная отрисовка кадра во внеэкранную консоль."""
+    engine = GameEngine(headless=True, seed=0, generate_world=False)
+    engine.game_map = world.game_map
+    engine.player = world.player
+    world.game_map.update_fov(world.player.x, world.player.y, radius=8)
+    return engine.render, 1
+
+
+@scenario("fov")
+def bench_fov(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Пересчет поля зрения при каждом шаге в новую клетку (без попаданий в кэш)."""
+    rng = random.Random(1)
+    # Позиций больше, чем вмещает кэш поля зрения, поэтому каждый вызов - промах
+    count = max(64, world.game_map.fov_cache_size * 4)
+    positions = [tuple(int(v) for v in world.floor[rng.randrange(len(world.floor))]) for _ in range(count)]
+    state = {"index": 0}
+
+    def run() -> None:
+        x, y = positions[state["index"] % count]
+        state["index"] += 1
+        world.game_map.update_fov(x, y, radius=8)
+
+    return run, 1
+
+
+@scenario("generate")
+def bench_generate(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Генерация карты того же размера."""
+    width, height, _ = SIZES[size]
+    generator = MapGenerator(width, height, max_rooms=max(30, width * height // 120), rng=random.Random(2))
+    return generator.generate_map, 1
+
+
+@scenario("lookup")
+def bench_lookup(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Поиск блокирующих сущностей и проверка проходимости случайных клеток."""
+    rng = random.Random(3)
+    width, height = world.game_map.width, world.game_map.height
+    cells = [(rng.randrange(width), rng.randrange(height)) for _ in range(LOOKUPS_PER_SAMPLE)]
+    game_map = world.game_map
+
+    def run() -> None:
+        for x, y in cells:
+            game_map.get_blocking_entity_at(x, y)
+            game_map.is_walkable(x, y)
+
+    return run, LOOKUPS_PER_SAMPLE * 2
+
+
+@scenario("spatial")
+def bench_spatial(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Пространственные запросы: ближайшая сущность и сущности в радиусе из случайных клеток."""
+    rng = random.Random(4)
+    cells = [tuple(int(v) for v in world.floor[rng.randrange(len(world.floor))]) for _ in range(LOOKUPS_PER_SAMPLE)]
+    game_map = world.game_map
+
+    def run() -> None:
+        for x, y in cells:
+            game_map.nearest(x, y, max_radius=8)
+            game_map.within_radius(x, y, 8)
+
+    return run, LOOKUPS_PER_SAMPLE * 2
+
+
+@scenario("pickup_drop")
+def bench_pickup_drop(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Подбор и выбрасывание предмета на клетке с другими предметами."""
+    player = world.player
+    for _ in range(8):
+        world.game_map.add_item(HealthPotion(player.x, player.y))
+    item = HealthPotion(player.x, player.y)
+    world.game_map.add_item(item)
+
+    def run() -> None:
+        player.pick_up_item(item)
+        player.drop_item(item)
+
+    return run, 2
+
+
+@scenario("combat")
+def bench_combat(world: World, size: str) -> Tuple[Callable[[], None], int]:
+    """Пакетное разрешение ударов: каждая сущность бьет предыдущую по списку."""
+    store = default_store()
+    slots = world.game_map.entity_slots()
+    attackers = slots
+    defenders = np.roll(slots, 1)
+    hp = store.hp.copy()
+
+    def run() -> None:
+        resolve_attacks(attackers, defenders, store.attack, store.defense, hp.copy(), store.modifiers)
+
+    return run, len(slots)
+
+
+def measure(function: Callable[[], None], repeat: int, warmup: int = 1) -> np.ndarray:
+    """Замеряет время вызовов функции в миллисекундах."""
+    for _ in range(warmup):
+        function()
+    samples = np.empty(repeat)
+    for index in range(repeat):
+        start = time.perf_counter_ns()
+        function()
+        samples[index] = (time.perf_counter_ns() - start) / 1e6
+    return samples
+
+
+def run_scenario(name: str, size: str, repeat: int, seed: int = 0) -> BenchResult:
+    """Готовит мир, выполняет сценарий и считает статистику."""
+    function, ops = SCENARIOS[name](build_world(size, seed), size)
+    samples = measure(function, repeat)
+    p50, p90, p99 = np.percentile(samples, PERCENTILES)
+    return BenchResult(
+        name=name,
+        size=size,
+        repeat=repeat,
+        ops_per_sample=ops,
+        p50=float(p50),
+        p90=float(p90),
+        p99=float(p99),
+        mean=float(samples.mean()),
+        min=float(samples.min()),
+        max=float(samples.max()),
+    )
+
+
+def run_suite(
+    names: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    repeat: int = 50,
+    report: Optional[Callable[[BenchResult], None]] = None,
+) -> List[BenchResult]:
+    """Выполняет выбранные сценарии на выбранных размерах."""
+    results = []
+    for name in names or list(SCENARIOS):
+        for size in sizes or list(SIZES):
+            result = run_scenario(name, size, repeat)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def to_json(results: List[BenchResult]) -> dict:
+    """Собирает результаты и сведения об окружении в словарь для JSON."""
+    return {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {result.key: asdict(result) for result in results},
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float = 0.10,
+    thresholds: Optional[Dict[str, float]] = None,
+    metric: str = "p50",
+) -> List[Regression]:
+    """Сравнивает результаты с базовой линией.
+
+    Сценарий считается замедлившимся, если метрика выросла больше чем на
+    долю threshold. В thresholds можно задать порог для отдельных ключей
+    ("render/large") или имен сценариев ("render"). Сценарии, которых нет
+    в базовой линии, пропускаются.
+    """
+    thresholds = thresholds or {}
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        limit = thresholds.get(key, thresholds.get(result["name"], threshold))
+        if result[metric] > base[metric] * (1 + limit):
+            regressions.append(Regression(key, metric, base[metric], result[metric], limit))
+    return regressions
+
+
+def _format(result: BenchResult) -> str:
+    return (
+        f"{result.key:<24} p50 {result.p50:9.3f} ms  p90 {result.p90:9.3f} ms  "
+        f"p99 {result.p99:9.3f} ms  ({result.ops_per_sample} оп./замер)"
+    )
+
+
+def _parse_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        key, _, limit = value.partition("=")
+        thresholds[key] = float(limit)
+    return thresholds
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности Rogue'n'Roll")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="сценарий (можно повторять)")
+    parser.add_argument("--size", action="append", choices=list(SIZES), help="размер мира (можно повторять)")
+    parser.add_argument("--repeat", type=int, default=50, help="количество замеров на сценарий")
+    parser.add_argument("--output", default=None, help="файл для сохранения результатов в JSON")
+    parser.add_argument("--baseline", default=None, help="JSON с базовой линией для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.10, help="допустимое замедление (доля)")
+    parser.add_argument(
+        "--scenario-threshold",
+        action="append",
+        default=[],
+        metavar="KEY=LIMIT",
+        help="порог для сценария или ключа, например render/large=0.25",
+    )
+    parser.add_argument("--metric", default="p50", choices=["p50", "p90", "p99", "mean", "min"])
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scenario, args.size, args.repeat, report=lambda r: print(_format(r)))
+    data = to_json(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(
+            data, baseline, args.threshold, _parse_thresholds(args.scenario_threshold), args.metric
+        )
+        for regression in regressions:
+            print(
+                f"ЗАМЕДЛЕНИЕ {regression.key}: {regression.metric} {regression.baseline:.3f} -> "
+                f"{regression.current:.3f} ms (x{regression.ratio:.2f}, порог +{regression.threshold:.0%})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Iterable, Tuple
+import struct
+import numpy as np
+
+
+class Action(IntEnum):
+    """Действия игрока, не зависящие от источника ввода."""
+
+    NONE = 0
+    MOVE_UP = 1
+    MOVE_DOWN = 2
+    MOVE_LEFT = 3
+    MOVE_RIGHT = 4
+    PICK_UP = 5
+    OPEN_INVENTORY = 6
+    CLOSE_INVENTORY = 7
+    SELECT_PREV = 8
+    SELECT_NEXT = 9
+    USE_SELECTED = 10
+    DROP_SELECTED = 11
+    QUIT = 12
+    DESCEND = 13
+    ASCEND = 14
+    EXPLORE = 15
+    RUN_UP = 16
+    RUN_DOWN = 17
+    RUN_LEFT = 18
+    RUN_RIGHT = 19
+
+
+# Смещения для действий перемещения
+MOVE_DELTAS: Dict[Action, Tuple[int, int]] = {
+    Action.MOVE_UP: (0, -1),
+    Action.MOVE_DOWN: (0, 1),
+    Action.MOVE_LEFT: (-1, 0),
+    Action.MOVE_RIGHT: (1, 0),
+}
+
+# Бег: повторяет перемещение в одном направлении
+RUN_DELTAS: Dict[Action, Tuple[int, int]] = {
+    Action.RUN_UP: (0, -1),
+    Action.RUN_DOWN: (0, 1),
+    Action.RUN_LEFT: (-1, 0),
+    Action.RUN_RIGHT: (1, 0),
+}
+
+
+@dataclass
+class Observation:
+    """Состояние игры после хода в безоконном режиме.
+
+    Массивы - копии состояния на момент хода: последующие ходы их не
+    меняют, поэтому наблюдения можно хранить как историю партии.
+    """
+
+    turn: int
+    walkable: np.ndarray  # (height, width) bool
+    visible: np.ndarray  # (height, width) bool
+    explored: np.ndarray  # (height, width) bool
+    entity_positions: np.ndarray  # (n, 2) int32, столбцы x, y
+    entity_hp: np.ndarray  # (n,) int32
+    player_position: Tuple[int, int]
+    player_hp: int
+    done: bool
+
+
+class ActionLog:
+    """Компактная запись партии: сид мира и упакованный массив действий.
+
+    Каждое действие занимает один байт, поэтому запись длиной в сотни тысяч
+    ходов занимает сотни килобайт.
+    """
+
+    MAGIC = b"RNRLOG"
+    VERSION = 1
+    _HEADER = struct.Struct("<6sHQI")  # magic, версия, сид, количество действий
+
+    def __init__(self, seed: int, actions: Iterable[int] = ()):
+        self.seed = seed
+        self.actions = array("B", actions)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def append(self, action: Action) -> None:
+        """Добавляет действие в запись."""
+        self.actions.append(action)
+
+    def as_array(self) -> np.ndarray:
+        """Возвращает действия как массив NumPy без копирования."""
+        return np.frombuffer(self.actions, dtype=np.uint8)
+
+    def to_bytes(self) -> bytes:
+        """Сериализует запись."""
+        header = self._HEADER.pack(self.MAGIC, self.VERSION, self.seed, len(self.actions))
+        return header + self.actions.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ActionLog":
+        """Восстанавливает запись из байтов."""
+        magic, version, seed, count = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Неподдерживаемый формат записи партии")
+        log = cls(seed)
+        log.actions.frombytes(data[cls._HEADER.size : cls._HEADER.size + count])
+        if len(log.actions) != count:
+            raise ValueError("Запись партии обрезана")
+        return log
+
+    def save(self, path: str) -> None:
+        """Сохраняет запись в файл."""
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ActionLog":
+        """Загружает запись из файла."""
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
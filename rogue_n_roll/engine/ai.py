@@ -0,0 +1,99 @@
+from typing import Callable, List, Optional, Tuple, TYPE_CHECKING
+import numpy as np
+from rogue_n_roll.game_objects.entity_store import FLAG_HOSTILE, default_store
+
+if TYPE_CHECKING:
+    from rogue_n_roll.game_objects.entity import Entity
+    from rogue_n_roll.map.game_map import GameMap
+
+# Обработчик удара: атакующий, цель, потерянное целью здоровье
+AttackCallback = Callable[["Entity", "Entity", int], None]
+
+# Монстры дальше этого расстояния по пути от игрока не действуют
+AGGRO_DISTANCE = 12
+
+# Направления шага монстра (как у игрока - только по сторонам)
+DIRECTIONS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int32)
+
+
+def distance_field(
+    game_map: "GameMap", target_x: int, target_y: int, radius: int
+) -> Tuple[np.ndarray, int, int]:
+    """Строит карту расстояний Дейкстры до цели в окне радиуса radius.
+
+    Стены непроходимы, сущности не учитываются: они мешают только при
+    движении. Возвращает массив расстояний и координаты (x, y) левого
+    верхнего угла окна.
+    """
+    x0, y0 = max(0, target_x - radius), max(0, target_y - radius)
+    x1 = min(game_map.width, target_x + radius + 1)
+    y1 = min(game_map.height, target_y + radius + 1)
+    import tcod.path
+
+    cost = game_map.tiles["walkable"][y0:y1, x0:x1].astype(np.int8)
+    distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+    distance[target_y - y0, target_x - x0] = 0
+    tcod.path.dijkstra2d(distance, cost, cardinal=1, diagonal=None, out=distance)
+    return distance, x0, y0
+
+
+def take_monster_turns(
+    game_map: "GameMap",
+    player: "Entity",
+    actors: Optional[List["Entity"]] = None,
+    aggro_distance: int = AGGRO_DISTANCE,
+    on_attack: Optional[AttackCallback] = None,
+) -> None:
+    """Фаза хода монстров: все враждебные монстры спускаются по общей карте расстояний.
+
+    Карта расстояний до игрока строится один раз за ход. Шаги выбираются
+    для всех монстров сразу по массивам EntityStore, затем применяются по
+    очереди от ближних к дальним, чтобы монстры не мешали друг другу.
+    actors ограничивает фазу списком сущностей (по умолчанию - вся карта).
+    on_attack вызывается после каждого удара монстра.
+    """
+    store = default_store()
+    if actors is None:
+        slots = game_map.entity_slots()
+    else:
+        slots = np.fromiter((actor.slot for actor in actors), dtype=np.int64, count=len(actors))
+    hostile = ((store.flags[slots] & FLAG_HOSTILE) != 0) & (store.hp[slots] > 0)
+    xs, ys = store.x[slots], store.y[slots]
+    # Дешевый отсев до построения карты расстояний
+    near = np.maximum(np.abs(xs - player.x), np.abs(ys - player.y)) <= aggro_distance
+    slots = slots[hostile & near]
+    if slots.size == 0:
+        return
+
+    distance, x0, y0 = distance_field(game_map, player.x, player.y, aggro_distance)
+    height, width = distance.shape
+    local_x = store.x[slots] - x0
+    local_y = store.y[slots] - y0
+    current = distance[local_y, local_x]
+
+    # Расстояния в соседних клетках для всех монстров сразу: (n, 4)
+    nx = local_x[:, None] + DIRECTIONS[:, 0]
+    ny = local_y[:, None] + DIRECTIONS[:, 1]
+    inside = (nx >= 0) & (ny >= 0) & (nx < width) & (ny < height)
+    neighbour = np.full(nx.shape, np.iinfo(np.int32).max, dtype=np.int32)
+    neighbour[inside] = distance[ny[inside], nx[inside]]
+    order = np.argsort(neighbour, axis=1, kind="stable")
+
+    entities = {entity.slot: entity for entity in game_map.entities}
+    for index in np.argsort(current, kind="stable"):
+        if current[index] > aggro_distance or not player.is_alive():
+            continue
+        monster = entities.get(int(slots[index]))
+        if monster is None or not monster.is_alive():
+            continue
+        for direction in order[index]:
+            if neighbour[index, direction] >= current[index]:
+                break
+            dx, dy = (int(value) for value in DIRECTIONS[direction])
+            if (monster.x + dx, monster.y + dy) == (player.x, player.y):
+                damage = monster.attack(player)
+                if on_attack is not None:
+                    on_attack(monster, player, damage)
+                break
+            if monster.move(dx, dy):
+                break
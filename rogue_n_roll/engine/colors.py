@@ -30,8 +30,3 @@ UI_BACKGROUND = DARK_BLUE
 HEALTH_GOOD = GREEN
 HEALTH_WARNING = YELLOW
 HEALTH_CRITICAL = RED
-
-SWORD_COLOR = GRAY
-SHIELD_COLOR = GRAY
-POTION_COLOR = RED
-SCROLL_COLOR = YELLOW 
\ No newline at end of file
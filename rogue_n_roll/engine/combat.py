@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+import numpy as np
+from rogue_n_roll.game_objects.entity_store import MODIFIER_INDEX, EntityStore, default_store
+
+# Минимальный урон удара, даже если защита выше атаки
+MIN_DAMAGE = 1
+
+ATTACK_INDEX = MODIFIER_INDEX["attack_power"]
+DEFENSE_INDEX = MODIFIER_INDEX["defense"]
+
+IntOrArray = Union[int, np.ndarray]
+
+
+def attack_damage(attack: IntOrArray, defense: IntOrArray) -> IntOrArray:
+    """Урон удара по эффективным атаке и защите. Работает с числами и массивами."""
+    if isinstance(attack, np.ndarray) or isinstance(defense, np.ndarray):
+        return np.maximum(np.subtract(attack, defense), MIN_DAMAGE)
+    return max(MIN_DAMAGE, attack - defense)
+
+
+@dataclass
+class CombatResult:
+    """Итог пакета ударов."""
+
+    damage: np.ndarray  # Урон каждого удара
+    killed: np.ndarray  # Индексы бойцов, погибших в этом пакете
+
+
+def resolve_attacks(
+    attackers: np.ndarray,
+    defenders: np.ndarray,
+    attack: np.ndarray,
+    defense: np.ndarray,
+    hp: np.ndarray,
+    modifiers: Optional[np.ndarray] = None,
+) -> CombatResult:
+    """Разрешает пакет ударов attackers[i] -> defenders[i] за один вызов.
+
+    attack, defense, hp и modifiers - столбцы бойцов (как в EntityStore),
+    attackers и defenders - индексы в них. hp изменяется на месте. Урон по
+    одной цели от нескольких ударов суммируется, а здоровье ограничивается
+    нулем, поэтому результат совпадает с последовательными вызовами
+    Entity.attack в любом порядке.
+    """
+    attackers = np.asarray(attackers, dtype=np.intp)
+    defenders = np.asarray(defenders, dtype=np.intp)
+    effective_attack = attack[attackers]
+    effective_defense = defense[defenders]
+    if modifiers is not None:
+        effective_attack = effective_attack + modifiers[attackers, ATTACK_INDEX]
+        effective_defense = effective_defense + modifiers[defenders, DEFENSE_INDEX]
+    damage = attack_damage(effective_attack, effective_defense)
+
+    targets, inverse = np.unique(defenders, return_inverse=True)
+    total = np.bincount(inverse, weights=damage, minlength=len(targets)).astype(hp.dtype)
+    before = hp[targets]
+    after = np.maximum(before - total, 0)
+    hp[targets] = after
+    return CombatResult(damage=damage, killed=targets[(before > 0) & (after == 0)])
+
+
+def resolve_store_attacks(
+    attacker_slots: np.ndarray, defender_slots: np.ndarray, store: Optional[EntityStore] = None
+) -> CombatResult:
+    """Разрешает пакет ударов между сущностями прямо в массивах EntityStore."""
+    store = store or default_store()
+    return resolve_attacks(
+        attacker_slots, defender_slots, store.attack, store.defense, store.hp, store.modifiers
+    )
@@ -0,0 +1,194 @@
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import random
+import numpy as np
+from rogue_n_roll.engine.scheduler import TurnScheduler
+from rogue_n_roll.game_objects.content import choose_type, content
+from rogue_n_roll.game_objects.items import create_item
+from rogue_n_roll.game_objects.monster import Monster
+from rogue_n_roll.map import tile_types
+from rogue_n_roll.map.batch import GeneratedLevel, GenerationJob, generate_level
+from rogue_n_roll.map.game_map import GameMap
+from rogue_n_roll.map.map_generator import RectangularRoom
+
+Position = Tuple[int, int]
+
+
+@dataclass
+class Floor:
+    """Этаж подземелья: карта, очередь ходов его монстров и положение лестниц."""
+
+    depth: int
+    game_map: GameMap
+    scheduler: TurnScheduler
+    up_stairs: Optional[Position]
+    down_stairs: Position
+
+    @classmethod
+    def from_map(cls, depth: int, game_map: GameMap, scheduler: TurnScheduler) -> "Floor":
+        """Восстанавливает этаж по карте, находя лестницы среди тайлов."""
+        return cls(
+            depth,
+            game_map,
+            scheduler,
+            find_tile(game_map.tiles, tile_types.up_stairs),
+            find_tile(game_map.tiles, tile_types.down_stairs),
+        )
+
+
+def find_tile(tiles: np.ndarray, tile: np.ndarray) -> Optional[Position]:
+    """Возвращает координаты (x, y) первого тайла заданного типа."""
+    found = np.argwhere(tiles == tile)
+    if not len(found):
+        return None
+    y, x = found[0]
+    return int(x), int(y)
+
+
+def place_stairs(
+    game_map: GameMap, rooms: Sequence[RectangularRoom], depth: int
+) -> Tuple[Optional[Position], Position]:
+    """Размещает лестницы: вверх - в центре первой комнаты, вниз - в углу последней.
+
+    Монстры появляются в центрах комнат, поэтому лестница вниз ставится
+    в угол, чтобы на ней никто не стоял.
+    """
+    up_stairs = None
+    if depth > 0:
+        up_stairs = rooms[0].center
+        game_map.tiles[up_stairs[1], up_stairs[0]] = tile_types.up_stairs
+    down_stairs = (rooms[-1].x1 + 1, rooms[-1].y1 + 1)
+    game_map.tiles[down_stairs[1], down_stairs[0]] = tile_types.down_stairs
+    game_map.mark_tiles_changed()
+    return up_stairs, down_stairs
+
+
+def populate(
+    game_map: GameMap, rooms: Sequence[RectangularRoom], scheduler: TurnScheduler, rng: random.Random
+) -> None:
+    """Расставляет монстров в центрах комнат, кроме первой, и ставит их в очередь ходов.
+
+    Типы монстров выбираются по весам из файлов данных.
+    """
+    monster_types = content().monsters
+    for room in rooms[1:]:
+        if not game_map.get_blocking_entity_at(*room.center):
+            monster = Monster.spawn(choose_type(rng, monster_types).type_id, *room.center)
+            game_map.add_entity(monster)
+            scheduler.reschedule(monster)
+
+
+def floor_seed(seed: int, depth: int) -> int:
+    """Возвращает сид этажа. Этаж зависит только от сида игры и глубины."""
+    return random.Random(f"{seed}:{depth}").getrandbits(64)
+
+
+class Dungeon:
+    """Этажи подземелья с фоновой генерацией и ограниченным кэшем.
+
+    Следующий этаж генерируется заранее в исполнителе (по умолчанию в одном
+    рабочем потоке; подойдет и пул процессов). В фоне строятся только тайлы
+    и планы размещения в виде массивов, а сущности создаются в основном
+    потоке при переходе, поэтому общее хранилище сущностей не нужно
+    синхронизировать с генерацией. Недавно посещенные этажи хранятся в
+    LRU-кэше, так что возвращение на них мгновенно.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        map_width: int,
+        map_height: int,
+        max_cached_floors: int = 4,
+        executor: Optional[Executor] = None,
+    ):
+        self.seed = seed
+        self.map_width = map_width
+        self.map_height = map_height
+        self.max_cached_floors = max_cached_floors
+        self.floors: "OrderedDict[int, Floor]" = OrderedDict()
+        self._pending: Dict[int, Future] = {}
+        self._executor = executor
+        self._owns_executor = executor is None
+        # Статистика переходов: сколько этажей были готовы заранее
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+
+    def _job(self, depth: int) -> GenerationJob:
+        return GenerationJob(floor_seed(self.seed, depth), self.map_width, self.map_height)
+
+    def add(self, floor: Floor) -> None:
+        """Помещает готовый этаж в кэш."""
+        self.floors[floor.depth] = floor
+        self.floors.move_to_end(floor.depth)
+        self._evict(keep=floor.depth)
+
+    def prefetch(self, depth: int) -> None:
+        """Запускает фоновую генерацию этажа, если его еще нет."""
+        if depth in self.floors or depth in self._pending:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dungeon")
+        self._pending[depth] = self._executor.submit(generate_level, self._job(depth))
+
+    def prepare(self, depths: Iterable[int]) -> List[Future]:
+        """Запускает генерацию недостающих этажей и возвращает еще не завершенные.
+
+        Дождавшись этих Future (например, через asyncio.wrap_future), можно
+        вызывать get() для этих этажей без блокирующего ожидания.
+        """
+        unfinished = []
+        for depth in depths:
+            self.prefetch(depth)
+            future = self._pending.get(depth)
+            if future is not None and not future.done():
+                unfinished.append(future)
+        return unfinished
+
+    def get(self, depth: int) -> Floor:
+        """Возвращает этаж, при необходимости дожидаясь или выполняя его генерацию."""
+        floor = self.floors.get(depth)
+        if floor is not None:
+            self.floors.move_to_end(depth)
+            self.prefetch_hits += 1
+            return floor
+
+        future = self._pending.pop(depth, None)
+        if future is not None and future.done():
+            self.prefetch_hits += 1
+        else:
+            self.prefetch_misses += 1
+        level = future.result() if future is not None else generate_level(self._job(depth))
+        floor = self._build(depth, level)
+        self.add(floor)
+        return floor
+
+    def _build(self, depth: int, level: GeneratedLevel) -> Floor:
+        """Создает этаж из результата генерации: карту, лестницы, предметы и монстров."""
+        game_map = GameMap(self.map_width, self.map_height)
+        game_map.tiles = level.tiles
+        rooms = [RectangularRoom(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in level.rooms.tolist()]
+        up_stairs, down_stairs = place_stairs(game_map, rooms, depth)
+        for x, y, kind in level.items.tolist():
+            game_map.add_item(create_item(kind, x, y))
+        scheduler = TurnScheduler()
+        populate(game_map, rooms, scheduler, random.Random(f"{self.seed}:{depth}:monsters"))
+        return Floor(depth, game_map, scheduler, up_stairs, down_stairs)
+
+    def _evict(self, keep: int) -> None:
+        """Выбрасывает самые давно посещенные этажи сверх лимита."""
+        while len(self.floors) > self.max_cached_floors:
+            depth = next(iter(self.floors))
+            if depth == keep:
+                self.floors.move_to_end(depth)
+                continue
+            del self.floors[depth]
+
+    def shutdown(self) -> None:
+        """Останавливает собственный исполнитель фоновой генерации."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
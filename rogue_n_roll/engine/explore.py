@@ -0,0 +1,55 @@
+from typing import Optional, Tuple, TYPE_CHECKING
+import numpy as np
+from rogue_n_roll.engine.ai import DIRECTIONS
+
+if TYPE_CHECKING:
+    from rogue_n_roll.map.game_map import GameMap
+
+
+def frontier_mask(game_map: "GameMap") -> np.ndarray:
+    """Возвращает маску границы исследованного: известные проходимые клетки,
+    соседние с неисследованными."""
+    known = game_map.explored & game_map.tiles["walkable"]
+    unexplored = np.pad(~game_map.explored, 1, constant_values=False)
+    touches_unexplored = (
+        unexplored[:-2, 1:-1] | unexplored[2:, 1:-1] | unexplored[1:-1, :-2] | unexplored[1:-1, 2:]
+    )
+    return known & touches_unexplored
+
+
+def explore_field(game_map: "GameMap") -> np.ndarray:
+    """Строит карту расстояний Дейкстры до ближайшей клетки границы.
+
+    Путь прокладывается только по исследованным проходимым клеткам: игрок
+    не знает, что скрыто за пределами исследованного.
+    """
+    import tcod.path
+
+    cost = (game_map.explored & game_map.tiles["walkable"]).astype(np.int8)
+    distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+    distance[frontier_mask(game_map)] = 0
+    tcod.path.dijkstra2d(distance, cost, cardinal=1, diagonal=None, out=distance)
+    return distance
+
+
+def next_explore_step(
+    game_map: "GameMap", x: int, y: int, distance: Optional[np.ndarray] = None
+) -> Optional[Tuple[int, int]]:
+    """Возвращает шаг (dx, dy) к ближайшей неисследованной области или None,
+    если исследовать больше нечего.
+
+    distance - уже построенная explore_field, если карта и исследованные
+    клетки с тех пор не менялись.
+    """
+    if distance is None:
+        distance = explore_field(game_map)
+    current = distance[y, x]
+    # На самой границе игрок не стоит: соседние клетки всегда в поле зрения
+    if current == 0 or current == np.iinfo(np.int32).max:
+        return None
+    best = None
+    for dx, dy in DIRECTIONS.tolist():
+        if game_map.in_bounds(x + dx, y + dy) and distance[y + dy, x + dx] < current:
+            current = distance[y + dy, x + dx]
+            best = (dx, dy)
+    return best
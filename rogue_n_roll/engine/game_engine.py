@@ -1,17 +1,109 @@
-from typing import Optional, Set, Tuple, List
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from importlib import resources
+from typing import Iterable, Optional, Set, Tuple, List, TYPE_CHECKING
 import tcod
 import tcod.event
 import os
+import random
+import time
 import numpy as np
 from rogue_n_roll.game_objects.player import Player
-from rogue_n_roll.game_objects.monster import Monster
+from rogue_n_roll.game_objects.entity_store import default_store
 from rogue_n_roll.map.game_map import GameMap
 from rogue_n_roll.map.map_generator import MapGenerator
+from rogue_n_roll.engine.ai import AttackCallback, take_monster_turns
+from rogue_n_roll.engine.dungeon import Dungeon, Floor, place_stairs, populate
+from rogue_n_roll.engine.explore import explore_field, next_explore_step
+from rogue_n_roll.game_objects.entity_store import FLAG_HOSTILE
+from rogue_n_roll.engine.profiler import Profiler
+from rogue_n_roll.engine.scheduler import TurnScheduler
+from rogue_n_roll.engine.actions import Action, ActionLog, MOVE_DELTAS, Observation, RUN_DELTAS
 from rogue_n_roll.engine.colors import *
+from rogue_n_roll.ui.panels import HudPanel, InventoryPanel
+
+if TYPE_CHECKING:
+    from rogue_n_roll.ui.terminal import TerminalRenderer
+
+# Радиус поля зрения игрока
+FOV_RADIUS = 8
+
+# Клавиша панели профилировщика
+PROFILER_KEY = tcod.event.K_F3
+
+# Свободные строки HUD для панели профилировщика
+PROFILER_ROWS = (2, 6)
+
+# Шрифт из данных пакета и частота обновления экрана загрузки
+TILESET_RESOURCE = "dejavu10x10_gs_tc.png"
+LOADING_FRAME_TIME = 1 / 30
+LOADING_SPINNER = "|/-\\"
+
+# Оконные события, после которых кадр нужно перерисовать
+REDRAW_WINDOW_EVENTS = {"WindowExposed", "WindowResized", "WindowRestored", "WindowShown"}
+
+
+def load_tileset() -> tcod.tileset.Tileset:
+    """Загружает шрифт из данных пакета."""
+    with resources.as_file(resources.files("rogue_n_roll") / "resources" / TILESET_RESOURCE) as path:
+        return tcod.tileset.load_tilesheet(path, 32, 8, tcod.tileset.CHARMAP_TCOD)
+
+
+# Клавиши в основном режиме игры
+GAME_KEYS = {
+    tcod.event.K_ESCAPE: Action.QUIT,
+    tcod.event.K_UP: Action.MOVE_UP,
+    tcod.event.K_DOWN: Action.MOVE_DOWN,
+    tcod.event.K_LEFT: Action.MOVE_LEFT,
+    tcod.event.K_RIGHT: Action.MOVE_RIGHT,
+    tcod.event.K_i: Action.OPEN_INVENTORY,
+    tcod.event.K_g: Action.PICK_UP,
+    tcod.event.K_PERIOD: Action.DESCEND,  # ">"
+    tcod.event.K_COMMA: Action.ASCEND,  # "<"
+    tcod.event.K_o: Action.EXPLORE,
+}
+
+# Бег по Shift+стрелке
+RUN_KEYS = {
+    tcod.event.K_UP: Action.RUN_UP,
+    tcod.event.K_DOWN: Action.RUN_DOWN,
+    tcod.event.K_LEFT: Action.RUN_LEFT,
+    tcod.event.K_RIGHT: Action.RUN_RIGHT,
+}
+
+# Предельное число шагов одной команды бега или автоисследования
+MAX_AUTO_STEPS = 1000
+
+# Клавиши в режиме инвентаря
+INVENTORY_KEYS = {
+    tcod.event.K_ESCAPE: Action.CLOSE_INVENTORY,
+    tcod.event.K_UP: Action.SELECT_PREV,
+    tcod.event.K_DOWN: Action.SELECT_NEXT,
+    tcod.event.K_RETURN: Action.USE_SELECTED,
+    tcod.event.K_d: Action.DROP_SELECTED,
+}
 
 
 class GameEngine:
-    def __init__(self):
+    def __init__(
+        self,
+        headless: bool = False,
+        seed: Optional[int] = None,
+        generate_world: bool = True,
+        dungeon_executor: Optional[Executor] = None,
+    ):
+        """Создает игровой мир.
+
+        В безоконном режиме (headless) окно не создается, а игра управляется
+        через step(). Одинаковый seed дает одинаковый мир, а вместе с записью
+        действий - одинаковую партию. При generate_world=False мир не
+        создается: карту, игрока и очередь ходов задает вызывающий код
+        (например, загрузка сохранения). dungeon_executor - общий исполнитель
+        фоновой генерации этажей для многих движков в одном процессе.
+        """
+        self.headless = headless
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.action_log = ActionLog(self.seed)
         self.screen_width = 80
         self.screen_height = 50
         self.map_width = 80
@@ -20,13 +112,53 @@ class GameEngine:
         # Состояние интерфейса
         self.show_inventory = False
         self.selected_item_index = 0
+        self.turn = 0
+        # Панели интерфейса создаются при первой отрисовке
+        self.hud_panel: Optional[HudPanel] = None
+        self.inventory_panel: Optional[InventoryPanel] = None
+        # Профилировщик кадров и его панель, переключается клавишей PROFILER_KEY
+        self.profiler = Profiler()
+        self.show_profiler = False
+        # Файл для экспорта трассы профилировщика по завершении игрового цикла
+        self.trace_path: Optional[str] = None
+        # Вывести отчет о времени запуска после первого кадра
+        self.startup_profile = False
+        # Отчет о запуске ждет выхода из игры, чтобы не попасть на экран терминала
+        self._startup_report: Optional[str] = None
+
+        # Версия состояния растет при каждом изменении, влияющем на кадр;
+        # кадр перерисовывается, только если версия изменилась
+        self.state_version = 0
+        self._rendered_version = -1
+        # Ограничение частоты кадров (None - без ограничения)
+        self.max_fps: Optional[float] = None
+        # Наблюдатель за ударами в бою (например, для сбора статистики)
+        self.on_attack: Optional[AttackCallback] = None
 
         # Создаем консоль
         self.console = tcod.console.Console(self.screen_width, self.screen_height, order="F")
         self.context = None
+        # Вывод в терминал вместо окна (см. TerminalRenderer)
+        self.terminal: Optional["TerminalRenderer"] = None
+        # Фоновое автосохранение, вызывается после каждого хода
+        self.autosaver = None
 
+        # Очередь ходов; игрок ходит первым, поэтому в очередь он попадает после действия
+        self.scheduler = TurnScheduler()
+
+        # Этажи подземелья; следующий этаж готовится в фоне
+        self.dungeon = Dungeon(self.seed, self.map_width, self.map_height, executor=dungeon_executor)
+        self.depth = 0
+
+        self.game_map: Optional[GameMap] = None
+        self.player: Optional[Player] = None
+        if generate_world:
+            self._create_world()
+
+    def _create_world(self) -> None:
+        """Генерирует карту, игрока и монстров."""
         # Создаем карту
-        map_generator = MapGenerator(self.map_width, self.map_height)
+        map_generator = MapGenerator(self.map_width, self.map_height, rng=self.rng)
         self.game_map, rooms = map_generator.generate_map()
 
         # Создаем игрока в центре первой комнаты
@@ -35,24 +167,70 @@ class GameEngine:
         self.game_map.add_entity(self.player)
 
         # Добавляем монстров в другие комнаты
-        for room in rooms[1:]:
-            if not self.game_map.get_blocking_entity_at(*room.center):
-                if len(self.game_map.entities) % 3 == 0:
-                    monster = Monster.create_troll(*room.center)
-                elif len(self.game_map.entities) % 2 == 0:
-                    monster = Monster.create_orc(*room.center)
-                else:
-                    monster = Monster.create_rat(*room.center)
-                self.game_map.add_entity(monster)
+        populate(self.game_map, rooms, self.scheduler, self.rng)
+
+        up_stairs, down_stairs = place_stairs(self.game_map, rooms, self.depth)
+        self.dungeon.add(Floor(self.depth, self.game_map, self.scheduler, up_stairs, down_stairs))
+        self.dungeon.prefetch(self.depth + 1)
+
+    def change_floor(self, depth: int) -> None:
+        """Переводит игрока на другой этаж.
+
+        При спуске игрок появляется на лестнице вверх, при подъеме - на
+        лестнице вниз. Монстры покинутого этажа замирают до возвращения.
+        """
+        self.game_map.remove_entity(self.player)
+        self.scheduler.remove(self.player)
+
+        floor = self.dungeon.get(depth)
+        x, y = floor.up_stairs if depth > self.depth else floor.down_stairs
+        if floor.game_map.get_blocking_entity_at(x, y):
+            x, y = self._free_cell_near(floor.game_map, x, y)
+        self.player.x, self.player.y = x, y
+
+        self.depth = depth
+        self.game_map = floor.game_map
+        self.scheduler = floor.scheduler
+        self.game_map.add_entity(self.player)
+        self.dungeon.prefetch(depth + 1)
+
+    @staticmethod
+    def _free_cell_near(game_map: GameMap, x: int, y: int) -> Tuple[int, int]:
+        """Находит ближайшую к (x, y) свободную проходимую клетку."""
+        for radius in range(1, max(game_map.width, game_map.height)):
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    if max(abs(dx), abs(dy)) == radius and game_map.is_walkable(x + dx, y + dy):
+                        return x + dx, y + dy
+        return x, y
+
+    def _create_world_in_background(self) -> bool:
+        """Генерирует мир в рабочем потоке, показывая экран загрузки.
+
+        Возвращает False, если окно закрыли до окончания генерации.
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="worldgen") as executor:
+            future = executor.submit(self._create_world)
+            frame = 0
+            quit_requested = False
+            while not future.done():
+                self.render_loading(frame)
+                frame += 1
+                for event in self.wait_events(0):
+                    quit_requested = quit_requested or isinstance(event, tcod.event.Quit)
+                wait([future], timeout=LOADING_FRAME_TIME)
+            future.result()  # Пробрасываем ошибку генерации, если она была
+        return not quit_requested
 
     def initialize(self) -> None:
         """Инициализирует игру."""
-        tileset = tcod.tileset.load_tilesheet(
-            "resources/dejavu10x10_gs_tc.png",
-            32,
-            8,
-            tcod.tileset.CHARMAP_TCOD
-        )
+        if self.terminal is not None:
+            # Терминал заменяет окно: кадры выводятся через его present()
+            self.terminal.open()
+            self.context = self.terminal
+            return
+        with self.profiler.span("startup.tileset"):
+            tileset = load_tileset()
 
         self.context = tcod.context.new(
             columns=self.console.width,
@@ -62,303 +240,413 @@ class GameEngine:
             vsync=True,
         )
 
-    def render_inventory(self) -> None:
-        """Отрисовывает инвентарь."""
-        inventory_width = 40
-        inventory_height = 30
-        x = (self.screen_width - inventory_width) // 2
-        y = (self.screen_height - inventory_height) // 2
-
-        # Рисуем фон
-        for i in range(inventory_height):
-            for j in range(inventory_width):
-                self.console.print(
-                    x=x + j,
-                    y=y + i,
-                    string=" ",
-                    bg=UI_BACKGROUND
-                )
-
-        # Рисуем рамку
-        for i in range(inventory_width):
-            self.console.print(x=x + i, y=y, string="═", fg=UI_KEYS, bg=UI_BACKGROUND)
-            self.console.print(x=x + i, y=y + inventory_height - 1, string="═", fg=UI_KEYS, bg=UI_BACKGROUND)
-        for i in range(inventory_height):
-            self.console.print(x=x, y=y + i, string="║", fg=UI_KEYS, bg=UI_BACKGROUND)
-            self.console.print(x=x + inventory_width - 1, y=y + i, string="║", fg=UI_KEYS, bg=UI_BACKGROUND)
-        
-        # Углы рамки
-        self.console.print(x=x, y=y, string="╔", fg=UI_KEYS, bg=UI_BACKGROUND)
-        self.console.print(x=x + inventory_width - 1, y=y, string="╗", fg=UI_KEYS, bg=UI_BACKGROUND)
-        self.console.print(x=x, y=y + inventory_height - 1, string="╚", fg=UI_KEYS, bg=UI_BACKGROUND)
-        self.console.print(x=x + inventory_width - 1, y=y + inventory_height - 1, string="╝", fg=UI_KEYS, bg=UI_BACKGROUND)
-
-        # Заголовок
+    def render_loading(self, frame: int = 0) -> None:
+        """Отрисовывает экран загрузки."""
+        self.console.clear(bg=UI_BACKGROUND)
+        text = f"Генерация подземелья {LOADING_SPINNER[frame % len(LOADING_SPINNER)]}"
         self.console.print(
-            x=x + (inventory_width - len("INVENTORY")) // 2,
-            y=y + 1,
-            string="INVENTORY",
+            x=(self.screen_width - len(text)) // 2,
+            y=self.screen_height // 2,
+            string=text,
             fg=UI_TEXT,
-            bg=UI_BACKGROUND
-        )
-
-        # Список предметов
-        for i, item in enumerate(self.player.inventory.items):
-            color = UI_KEYS if i == self.selected_item_index else UI_REGULAR_TEXT
-            self.console.print(
-                x=x + 2,
-                y=y + 3 + i,
-                string=f"{chr(97 + i)}) {item.name}",
-                fg=color,
-                bg=UI_BACKGROUND
-            )
-
-        # Подсказки
-        help_text = "[↑/↓] SELECT   [ENTER] USE   [D] DROP   [ESC] CLOSE"
-        self.console.print(
-            x=x + (inventory_width - len(help_text)) // 2,
-            y=y + inventory_height - 2,
-            string=help_text,
-            fg=UI_REGULAR_TEXT,
-            bg=UI_BACKGROUND
-        )
-
-    def render(self) -> None:
-        """Отрисовывает игровое состояние."""
-        self.console.clear()
-
-        # Обновляем FOV
-        self.game_map.update_fov(self.player.x, self.player.y, radius=8)
-
-        # Отрисовываем карту
-        for y in range(self.game_map.height):
-            for x in range(self.game_map.width):
-                if self.game_map.visible[y, x]:
-                    # Если клетка видима, рисуем ее актуальным цветом
-                    if self.game_map.tiles[y, x]:
-                        self.console.print(x=x, y=y, string=".", fg=FLOOR_COLOR)
-                    else:
-                        self.console.print(x=x, y=y, string="#", fg=WALL_COLOR)
-                elif self.game_map.explored[y, x]:
-                    # Если клетка исследована, но не видима, рисуем ее приглушенным цветом
-                    if self.game_map.tiles[y, x]:
-                        self.console.print(x=x, y=y, string=".", fg=FLOOR_COLOR_DARK)
-                    else:
-                        self.console.print(x=x, y=y, string="#", fg=WALL_COLOR_DARK)
-
-        # Отрисовываем предметы
-        for item in self.game_map.items:
-            if self.game_map.visible[item.y, item.x]:
-                item.draw(self.console)
-
-        # Отрисовываем сущности
-        for entity in self.game_map.entities:
-            if self.game_map.visible[entity.y, entity.x]:
-                entity.draw(self.console)
-
-        # Создаем фон для HUD
-        for y in range(self.map_height, self.screen_height):
-            for x in range(self.screen_width):
-                self.console.print(x=x, y=y, string=" ", bg=UI_BACKGROUND)
-
-        # Отрисовываем рамку для HUD
-        for x in range(self.screen_width):
-            self.console.print(
-                x=x,
-                y=self.map_height,
-                string="═",
-                fg=UI_KEYS,
-                bg=UI_BACKGROUND,
-            )
-
-        # Отрисовываем статистику игрока
-        hp_color = (
-            HEALTH_GOOD if self.player.stats.current_hp > self.player.stats.max_hp * 0.7
-            else HEALTH_WARNING if self.player.stats.current_hp > self.player.stats.max_hp * 0.3
-            else HEALTH_CRITICAL
-        )
-        
-        # Статистика с подписями
-        self.console.print(
-            x=2,
-            y=self.map_height + 1,
-            string="HEALTH:",
-            fg=UI_TEXT,
-            bg=UI_BACKGROUND,
-        )
-        self.console.print(
-            x=12,
-            y=self.map_height + 1,
-            string=f"{self.player.stats.current_hp}/{self.player.stats.max_hp}",
-            fg=hp_color,
             bg=UI_BACKGROUND,
         )
+        if self.context is not None:
+            self.context.present(self.console)
 
-        self.console.print(
-            x=25,
-            y=self.map_height + 1,
-            string="DAMAGE:",
-            fg=UI_TEXT,
-            bg=UI_BACKGROUND,
-        )
-        self.console.print(
-            x=32,
-            y=self.map_height + 1,
-            string=str(self.player.stats.attack_power),
-            fg=UI_KEYS,
-            bg=UI_BACKGROUND,
+    def render_inventory(self) -> None:
+        """Отрисовывает инвентарь."""
+        if self.inventory_panel is None:
+            self.inventory_panel = InventoryPanel()
+        panel = self.inventory_panel
+        panel.render(
+            self.console,
+            (self.screen_width - panel.width) // 2,
+            (self.screen_height - panel.height) // 2,
+            self.player.inventory.items,
+            self.selected_item_index,
         )
 
-        self.console.print(
-            x=40,
-            y=self.map_height + 1,
-            string="DEFENSE:",
-            fg=UI_TEXT,
-            bg=UI_BACKGROUND,
-        )
-        self.console.print(
-            x=48,
-            y=self.map_height + 1,
-            string=str(self.player.stats.defense),
-            fg=UI_KEYS,
-            bg=UI_BACKGROUND,
-        )
+    def render_if_dirty(self) -> bool:
+        """Отрисовывает кадр, если состояние изменилось с прошлой отрисовки.
 
-        # Отрисовываем подсказки по управлению с цветными клавишами
-        help_text = [
-            ("CONTROL: ", UI_TEXT),
-            ("[↑↓←→]", UI_KEYS),
-            (" MOVEMENT   ", UI_REGULAR_TEXT),
-            ("[I]", UI_KEYS),
-            (" INVENTORY   ", UI_REGULAR_TEXT),
-            ("[G]", UI_KEYS),
-            (" PICK UP   ", UI_REGULAR_TEXT),
-            ("[ESC]", UI_KEYS),
-            (" EXIT", UI_REGULAR_TEXT),
-        ]
-
-        x_pos = 2
-        for text, color in help_text:
-            self.console.print(
-                x=x_pos,
-                y=self.map_height + 3,
-                string=text,
-                fg=color,
-                bg=UI_BACKGROUND,
-            )
-            x_pos += len(text)
-
-        # Отрисовываем легенду с цветными символами
-        legend_parts = [
-            ("ENTITIES: ", UI_TEXT),
-            ("[@]", PLAYER_COLOR),
-            (" PLAYER   ", UI_REGULAR_TEXT),
-            ("[r]", RAT_COLOR),
-            (" RAT   ", UI_REGULAR_TEXT),
-            ("[O]", ORC_COLOR),
-            (" ORC   ", UI_REGULAR_TEXT),
-            ("[T]", TROLL_COLOR),
-            (" TROLL", UI_REGULAR_TEXT),
-        ]
-
-        x_pos = 2
-        for text, color in legend_parts:
+        Возвращает True, если кадр перерисован.
+        """
+        if self.state_version == self._rendered_version:
+            return False
+        self.render()
+        self._rendered_version = self.state_version
+        return True
+
+    def render(self) -> None:
+        """Отрисовывает игровое состояние."""
+        profiler = self.profiler
+        with profiler.span("render"):
+            self.console.clear()
+
+            with profiler.span("fov"):
+                self.game_map.update_fov(self.player.x, self.player.y, radius=FOV_RADIUS)
+
+            with profiler.span("map"):
+                self.game_map.render(self.console)
+
+            with profiler.span("entities"):
+                # Отрисовываем предметы
+                for item in self.game_map.items:
+                    if self.game_map.visible[item.y, item.x]:
+                        item.draw(self.console)
+                # Отрисовываем сущности
+                self.game_map.render_entities(self.console)
+
+            with profiler.span("hud"):
+                self.render_hud()
+                if self.show_profiler:
+                    self.render_profiler()
+
+            # Отрисовываем инвентарь поверх всего, если он открыт
+            if self.show_inventory:
+                with profiler.span("inventory"):
+                    self.render_inventory()
+
+        if self.context is not None:
+            with profiler.span("present"):
+                self.context.present(self.console)
+
+    def render_profiler(self) -> None:
+        """Отрисовывает время кадра и разбивку по фазам в свободных строках HUD."""
+        # Строки 0, 1, 3, 4 и 5 панели заняты разделителем, характеристиками, подсказками и легендой
+        for row, line in zip(PROFILER_ROWS, self.profiler.overlay_lines()):
             self.console.print(
-                x=x_pos,
-                y=self.map_height + 5,
-                string=text,
-                fg=color,
+                x=2,
+                y=self.map_height + row,
+                string=line[: self.screen_width - 4],
+                fg=UI_REGULAR_TEXT,
                 bg=UI_BACKGROUND,
             )
-            x_pos += len(text)
-
-        # Отрисовываем инвентарь поверх всего, если он открыт
-        if self.show_inventory:
-            self.render_inventory()
 
-        self.context.present(self.console)
+    def render_hud(self) -> None:
+        """Отрисовывает панель характеристик и подсказок."""
+        if self.hud_panel is None:
+            self.hud_panel = HudPanel(self.screen_width, self.screen_height - self.map_height)
+        self.hud_panel.render(self.console, 0, self.map_height, self.player.stats, self.depth)
 
-    def handle_inventory_input(self, event: tcod.event.Event) -> bool:
-        """Обрабатывает ввод в режиме инвентаря."""
-        if isinstance(event, tcod.event.KeyDown):
-            if event.sym == tcod.event.K_ESCAPE:
-                self.show_inventory = False
-            elif event.sym == tcod.event.K_UP:
-                self.selected_item_index = max(0, self.selected_item_index - 1)
-            elif event.sym == tcod.event.K_DOWN:
-                self.selected_item_index = min(len(self.player.inventory.items) - 1, self.selected_item_index + 1)
-            elif event.sym == tcod.event.K_RETURN:
-                if 0 <= self.selected_item_index < len(self.player.inventory.items):
-                    item = self.player.inventory.items[self.selected_item_index]
-                    self.player.use_item(item)
-                    self.show_inventory = False
-            elif event.sym == tcod.event.K_d:
-                if 0 <= self.selected_item_index < len(self.player.inventory.items):
-                    item = self.player.inventory.items[self.selected_item_index]
-                    self.player.drop_item(item)
-                    self.show_inventory = False
+    def handle_input(self, event: tcod.event.Event) -> bool:
+        """Обрабатывает пользовательский ввод. Возвращает True для выхода из игры."""
+        if isinstance(event, tcod.event.KeyDown) and event.sym == PROFILER_KEY:
+            # Отладочная клавиша не является действием игрока и не попадает в запись партии
+            self.show_profiler = not self.show_profiler
+            self.profiler.enabled = self.show_profiler or self.trace_path is not None
+            self.state_version += 1
+            return False
+        if isinstance(event, tcod.event.WindowEvent) and event.type in REDRAW_WINDOW_EVENTS:
+            self.state_version += 1
+            return False
+        action = self.event_to_action(event)
+        if action == Action.NONE:
+            return False
+        return self.advance(action)
+
+    def handle_events(self, events: Iterable[tcod.event.Event]) -> bool:
+        """Обрабатывает пачку накопившихся событий. Возвращает True для выхода из игры.
+
+        Все действия пачки применяются по порядку, а кадр рисуется один раз
+        после нее. Автоповторы удерживаемой клавиши схлопываются до одного на
+        пачку: медленный кадр не накапливает очередь шагов, которые игрок
+        продолжал бы делать после отпускания клавиши.
+        """
+        repeated: Set[int] = set()
+        for event in events:
+            if isinstance(event, tcod.event.KeyDown) and event.repeat:
+                if event.sym in repeated:
+                    continue
+                repeated.add(event.sym)
+            if self.handle_input(event):
+                return True
+            if not self.player.is_alive():
+                return False
         return False
 
-    def handle_input(self, event: tcod.event.Event) -> bool:
-        """Обрабатывает пользовательский ввод."""
+    def event_to_action(self, event: tcod.event.Event) -> Action:
+        """Преобразует событие ввода в действие с учетом режима интерфейса."""
         if isinstance(event, tcod.event.Quit):
-            return True
+            return Action.QUIT
+        if not isinstance(event, tcod.event.KeyDown):
+            return Action.NONE
 
         if self.show_inventory:
-            return self.handle_inventory_input(event)
-
-        if isinstance(event, tcod.event.KeyDown):
-            if event.sym == tcod.event.K_ESCAPE:
-                return True
-
-            # Движение
-            if event.sym == tcod.event.K_UP:
-                self._try_move_player(0, -1)
-            elif event.sym == tcod.event.K_DOWN:
-                self._try_move_player(0, 1)
-            elif event.sym == tcod.event.K_LEFT:
-                self._try_move_player(-1, 0)
-            elif event.sym == tcod.event.K_RIGHT:
-                self._try_move_player(1, 0)
-            elif event.sym == tcod.event.K_i:
-                self.show_inventory = True
-                self.selected_item_index = 0
-            elif event.sym == tcod.event.K_g:
-                # Подбираем предметы с земли
-                items = self.game_map.get_items_at(self.player.x, self.player.y)
-                for item in items:
-                    if self.player.pick_up_item(item):
-                        break  # Подбираем только один предмет за раз
-
+            return INVENTORY_KEYS.get(event.sym, Action.NONE)
+        if event.mod & tcod.event.Modifier.SHIFT and event.sym in RUN_KEYS:
+            return RUN_KEYS[event.sym]
+        return GAME_KEYS.get(event.sym, Action.NONE)
+
+    def perform(self, action: Action) -> bool:
+        """Выполняет действие игрока и, если он потратил ход, ход монстров.
+
+        Возвращает True для выхода из игры.
+        """
+        return self._perform(action)[0]
+
+    def _perform(self, action: Action) -> Tuple[bool, int]:
+        """Выполняет действие. Возвращает признак выхода и число ходов, занятых командой.
+
+        Команда занимает один ход, а бег и автоисследование - по ходу на шаг;
+        бег или автоисследование без единого шага хода не занимают.
+        """
+        if action == Action.QUIT:
+            return True, 1
+        if action == Action.EXPLORE or action in RUN_DELTAS:
+            return False, self._auto_move(action)
+        if self._apply_player_action(action):
+            with self.profiler.span("monsters"):
+                self._handle_monster_turns()
+        return False, 1
+
+    def visible_hostiles(self) -> Set[int]:
+        """Возвращает слоты живых враждебных монстров в поле зрения игрока."""
+        store = default_store()
+        slots = self.game_map.entity_slots()
+        alive = ((store.flags[slots] & FLAG_HOSTILE) != 0) & (store.hp[slots] > 0)
+        slots = slots[alive]
+        seen = self.game_map.visible[store.y[slots], store.x[slots]]
+        return set(slots[seen].tolist())
+
+    def _auto_move(self, action: Action) -> int:
+        """Выполняет бег или автоисследование: много ходов за одну команду.
+
+        Каждый шаг - полноценный ход с ходом монстров и пересчетом поля
+        зрения, но без отрисовки. Движение прекращается, когда в поле зрения
+        появляется новый монстр, игрок получает урон, наступает на предмет или
+        лестницу, упирается в препятствие или исследовать больше нечего.
+        Автоисследование не начинается при монстрах в поле зрения.
+        Карта расстояний автоисследования строится один раз и пересчитывается,
+        только когда меняются тайлы или открываются новые клетки.
+        Возвращает количество сделанных шагов.
+        """
+        seen = self.visible_hostiles()
+        if action == Action.EXPLORE and seen:
+            return 0
+        player = self.player
+        hp = player.stats.current_hp
+        floor = self.dungeon.floors.get(self.depth)
+        stairs = {floor.up_stairs, floor.down_stairs} if floor is not None else set()
+        steps = 0
+        field, field_key = None, None
+        while steps < MAX_AUTO_STEPS:
+            if action == Action.EXPLORE:
+                key = (self.game_map.tiles_version, int(np.count_nonzero(self.game_map.explored)))
+                if key != field_key:
+                    field, field_key = explore_field(self.game_map), key
+                step = next_explore_step(self.game_map, player.x, player.y, field)
+                if step is None:
+                    break
+            else:
+                step = RUN_DELTAS[action]
+            if not player.move(*step):
+                break
+            steps += 1
+            with self.profiler.span("monsters"):
+                self._handle_monster_turns()
+            self.game_map.update_fov(player.x, player.y, radius=FOV_RADIUS)
+            if (
+                not player.is_alive()
+                or player.stats.current_hp < hp
+                or self.visible_hostiles() - seen
+                or self.game_map.get_items_at(player.x, player.y)
+                or (player.x, player.y) in stairs
+            ):
+                break
+        return steps
+
+    def _apply_player_action(self, action: Action) -> bool:
+        """Применяет действие игрока. Возвращает True, если игрок потратил ход."""
+        if action in MOVE_DELTAS:
+            return self._try_move_player(*MOVE_DELTAS[action])
+        if action in (Action.DESCEND, Action.ASCEND):
+            floor = self.dungeon.floors.get(self.depth)
+            stairs = floor.down_stairs if action == Action.DESCEND else floor.up_stairs
+            if stairs != (self.player.x, self.player.y):
+                return False
+            self.change_floor(self.depth + 1 if action == Action.DESCEND else self.depth - 1)
+            return True
+        if action == Action.PICK_UP:
+            # Подбираем предметы с земли
+            items = self.game_map.get_items_at(self.player.x, self.player.y)
+            for item in items:
+                if self.player.pick_up_item(item):
+                    return True  # Подбираем только один предмет за раз
+            return False
+        if action == Action.OPEN_INVENTORY:
+            self.show_inventory = True
+            self.selected_item_index = 0
+        elif action == Action.CLOSE_INVENTORY:
+            self.show_inventory = False
+        elif action == Action.SELECT_PREV:
+            self.selected_item_index = max(0, self.selected_item_index - 1)
+        elif action == Action.SELECT_NEXT:
+            self.selected_item_index = min(len(self.player.inventory.items) - 1, self.selected_item_index + 1)
+        elif action in (Action.USE_SELECTED, Action.DROP_SELECTED):
+            if 0 <= self.selected_item_index < len(self.player.inventory.items):
+                item = self.player.inventory.items[self.selected_item_index]
+                self.show_inventory = False
+                if action == Action.USE_SELECTED:
+                    return self.player.use_item(item)
+                return self.player.drop_item(item)
         return False
 
-    def _try_move_player(self, dx: int, dy: int) -> None:
-        """Пытается переместить игрока."""
+    def _handle_monster_turns(self) -> None:
+        """Продвигает очередь ходов до следующего хода игрока.
+
+        Монстры, действующие в один момент времени, обрабатываются одной
+        фазой с общей картой расстояний.
+        """
+        self.scheduler.reschedule(self.player)
+        while self.player.is_alive():
+            batch = self.scheduler.next_batch()
+            monsters = [actor for actor in batch if actor is not self.player]
+            if monsters:
+                take_monster_turns(self.game_map, self.player, monsters, on_attack=self.on_attack)
+                for monster in monsters:
+                    if monster.is_alive() and monster.game_map is self.game_map:
+                        self.scheduler.reschedule(monster)
+            if len(monsters) < len(batch) or not batch:
+                return
+
+    def advance(self, action: Action) -> bool:
+        """Выполняет и записывает действие, завершая ход. Возвращает True для выхода.
+
+        Бег или автоисследование, не сделавшие ни шага, ничего не меняют:
+        они не занимают ход и не попадают в запись партии.
+        """
+        quit_requested, turns = self._perform(action)
+        if not turns:
+            return quit_requested
+        self.action_log.append(action)
+        self.turn += turns
+        self.state_version += 1
+        self.game_map.update_fov(self.player.x, self.player.y, radius=FOV_RADIUS)
+        if self.autosaver is not None:
+            self.autosaver.on_turn()
+        return quit_requested
+
+    def step(self, action: Action) -> Observation:
+        """Выполняет один ход без отрисовки и возвращает наблюдение."""
+        return self.observe(done=self.advance(action))
+
+    def observe(self, done: bool = False) -> Observation:
+        """Обновляет поле зрения и собирает состояние игры в массивы NumPy."""
+        self.game_map.update_fov(self.player.x, self.player.y, radius=FOV_RADIUS)
+
+        store = default_store()
+        slots = self.game_map.entity_slots()
+        positions = np.stack((store.x[slots], store.y[slots]), axis=1)
+        hp = store.hp[slots]
+
+        return Observation(
+            turn=self.turn,
+            walkable=self.game_map.tiles["walkable"].copy(),
+            visible=self.game_map.visible.copy(),
+            explored=self.game_map.explored.copy(),
+            entity_positions=positions,
+            entity_hp=hp,
+            player_position=(self.player.x, self.player.y),
+            player_hp=self.player.stats.current_hp,
+            done=done or not self.player.is_alive(),
+        )
+
+    def _try_move_player(self, dx: int, dy: int) -> bool:
+        """Пытается переместить игрока. Возвращает True, если игрок потратил ход."""
         dest_x = self.player.x + dx
         dest_y = self.player.y + dy
 
         if not self.game_map.in_bounds(dest_x, dest_y):
-            return
+            return False
 
         target = self.game_map.get_blocking_entity_at(dest_x, dest_y)
         if target:
-            self.player.attack(target)
+            damage = self.player.attack(target)
+            if self.on_attack is not None:
+                self.on_attack(self.player, target, damage)
             if not target.is_alive():
                 self.game_map.remove_entity(target)
-        elif self.game_map.is_walkable(dest_x, dest_y):
-            self.player.move(dx, dy)
+                self.scheduler.remove(target)
+            return True
+        if self.game_map.is_walkable(dest_x, dest_y):
+            return self.player.move(dx, dy)
+        return False
 
     def game_loop(self) -> None:
         """Основной игровой цикл."""
-        self.initialize()
-
+        if self.headless:
+            raise RuntimeError("game_loop недоступен в безоконном режиме, используйте step()")
+        with self.profiler.span("startup.window"):
+            self.initialize()
+        try:
+            if self.game_map is None:
+                with self.profiler.span("startup.world"):
+                    if not self._create_world_in_background():
+                        return
+            self._run_frames()
+        finally:
+            if self.terminal is not None:
+                self.terminal.close()
+            if self._startup_report is not None:
+                print(self._startup_report)
+                self._startup_report = None
+            if self.trace_path is not None:
+                self.profiler.export_chrome_trace(self.trace_path)
+
+    def wait_events(self, timeout: Optional[float]) -> List[tcod.event.Event]:
+        """Ждет событий ввода из окна или терминала не дольше timeout секунд (None - без ограничения)."""
+        if self.terminal is not None:
+            return self.terminal.wait(timeout)
+        if timeout == 0:
+            return list(tcod.event.get())
+        return list(tcod.event.wait(timeout))
+
+    def enable_trace(self, path: str) -> None:
+        """Включает профилировщик и экспорт трассы в формате Chrome trace в файл path."""
+        self.trace_path = path
+        self.profiler.enabled = True
+
+    def _report_startup(self) -> None:
+        """Запоминает, на что ушло время до первого кадра, и выключает лишние замеры.
+
+        Отчет печатается в game_loop после восстановления терминала.
+        """
+        self.startup_profile = False
+        self._startup_report = "Время запуска до первого кадра:\n" + self.profiler.report()
+        self.profiler.enabled = self.show_profiler or self.trace_path is not None
+
+    def _run_frames(self) -> None:
+        """Обрабатывает кадры до выхода из игры или смерти игрока.
+
+        Кадр - обработка пачки событий и отрисовка. Ожидание ввода в кадр не
+        входит: участок "wait" попадает в трассу, но не во время кадра.
+        """
+        profiler = self.profiler
+        min_frame_time = 1 / self.max_fps if self.max_fps else 0.0
+        last_render = float("-inf")
+        events: List[tcod.event.Event] = []
         while True:
-            self.render()
-
-            for event in tcod.event.wait():
-                if self.handle_input(event):
+            profiler.begin_frame()
+            with profiler.span("input"):
+                if self.handle_events(events):
                     return  # Выход из игры
-
             # Проверяем состояние игрока
             if not self.player.is_alive():
-                return  # Игра окончена 
\ No newline at end of file
+                return  # Игра окончена
+
+            timeout = None  # Без изменений ждем событий сколько угодно, не нагружая процессор
+            if self.state_version != self._rendered_version:
+                remaining = last_render + min_frame_time - time.perf_counter()
+                if remaining <= 0:
+                    self.render_if_dirty()
+                    last_render = time.perf_counter()
+                    if self.startup_profile:
+                        self._report_startup()
+                else:
+                    timeout = remaining  # Кадр отложен ограничением частоты
+            profiler.end_frame()
+
+            with profiler.span("wait"):
+                events = self.wait_events(timeout) 
\ No newline at end of file
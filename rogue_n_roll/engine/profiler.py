@@ -0,0 +1,133 @@
+from collections import deque
+from contextlib import nullcontext
+from typing import ContextManager, Deque, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+# Пустой контекст, который возвращается при выключенном профилировщике
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """Замер одного участка кода."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._record(self.name, self.start, time.perf_counter_ns() - self.start)
+
+
+class Profiler:
+    """Профилировщик кадров на основе именованных участков (spans).
+
+    Пока профилировщик выключен, span() возвращает общий пустой контекст,
+    поэтому замеры в игровом цикле почти ничего не стоят. Во включенном
+    состоянии каждый участок записывается как событие для экспорта в формат
+    Chrome trace, а длительности суммируются по фазам текущего кадра.
+    """
+
+    def __init__(self, enabled: bool = False, history: int = 60, max_events: int = 100_000):
+        self.enabled = enabled
+        # Последние кадры: (длительность кадра в мс, длительности фаз в мс)
+        self.frames: Deque[Tuple[float, Dict[str, float]]] = deque(maxlen=history)
+        # События: (имя, начало в нс, длительность в нс, поток)
+        self.events: Deque[Tuple[str, int, int, int]] = deque(maxlen=max_events)
+        self._phases: Dict[str, float] = {}
+        self._frame_start: Optional[int] = None
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str) -> ContextManager:
+        """Возвращает контекст для замера участка name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def _record(self, name: str, start: int, duration: int) -> None:
+        self.events.append((name, start, duration, threading.get_ident()))
+        self._phases[name] = self._phases.get(name, 0.0) + duration / 1e6
+
+    def begin_frame(self) -> None:
+        """Отмечает начало кадра."""
+        if self.enabled:
+            self._frame_start = time.perf_counter_ns()
+            self._phases = {}
+
+    def end_frame(self) -> None:
+        """Отмечает конец кадра и сохраняет его разбивку по фазам."""
+        if not self.enabled or self._frame_start is None:
+            return
+        duration = time.perf_counter_ns() - self._frame_start
+        self._record("frame", self._frame_start, duration)
+        phases = self._phases
+        frame_ms = phases.pop("frame")
+        self.frames.append((frame_ms, phases))
+        self._phases = {}
+        self._frame_start = None
+
+    def summary(self) -> Tuple[float, float, Dict[str, float]]:
+        """Возвращает последнее и максимальное время кадра и средние длительности фаз."""
+        if not self.frames:
+            return 0.0, 0.0, {}
+        totals: Dict[str, float] = {}
+        for _, phases in self.frames:
+            for name, value in phases.items():
+                totals[name] = totals.get(name, 0.0) + value
+        averages = {name: value / len(self.frames) for name, value in totals.items()}
+        return self.frames[-1][0], max(frame for frame, _ in self.frames), averages
+
+    def overlay_lines(self) -> List[str]:
+        """Формирует строки для отображения на экране."""
+        last, worst, phases = self.summary()
+        lines = [f"FRAME {last:6.2f} ms  MAX {worst:6.2f} ms  ({len(self.frames)} fr)"]
+        lines.append("  ".join(f"{name} {value:.2f}" for name, value in phases.items()))
+        return lines
+
+    def totals(self) -> Dict[str, float]:
+        """Возвращает суммарные длительности участков в мс в порядке первого появления."""
+        totals: Dict[str, float] = {}
+        for name, _, duration, _ in self.events:
+            totals[name] = totals.get(name, 0.0) + duration / 1e6
+        return totals
+
+    def elapsed(self) -> float:
+        """Возвращает время в мс с создания профилировщика."""
+        return (time.perf_counter_ns() - self._origin) / 1e6
+
+    def report(self) -> str:
+        """Формирует текстовый отчет о суммарном времени участков."""
+        lines = [f"{name:<24} {value:9.2f} ms" for name, value in self.totals().items()]
+        lines.append(f"{'total':<24} {self.elapsed():9.2f} ms")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict:
+        """Возвращает события в формате Chrome trace (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1000,
+                    "dur": duration / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, duration, tid in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Сохраняет события в файл JSON формата Chrome trace."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_chrome_trace(), file)
@@ -0,0 +1,62 @@
+import argparse
+from typing import Callable, Iterable, Optional
+from rogue_n_roll.engine.actions import Action, ActionLog
+from rogue_n_roll.engine.game_engine import GameEngine
+
+CheckpointCallback = Callable[[GameEngine], None]
+
+
+def replay(
+    log: ActionLog,
+    checkpoints: Iterable[int] = (),
+    on_checkpoint: Optional[CheckpointCallback] = None,
+) -> GameEngine:
+    """Проигрывает запись партии в безоконном режиме с максимальной скоростью.
+
+    Мир создается заново из сида записи, а действия применяются без отрисовки.
+    После ходов с номерами из checkpoints вызывается on_checkpoint (если
+    действие заняло несколько ходов - после него, по разу на номер).
+    Возвращает движок в конечном состоянии.
+    """
+    engine = GameEngine(headless=True, seed=log.seed)
+    pending = sorted(set(checkpoints))
+    next_checkpoint = 0
+    for action in log.actions:
+        if engine.advance(Action(action)):
+            break
+        # Бег и автоисследование занимают несколько ходов за одно действие
+        while next_checkpoint < len(pending) and engine.turn >= pending[next_checkpoint]:
+            next_checkpoint += 1
+            if on_checkpoint is not None:
+                on_checkpoint(engine)
+    return engine
+
+
+def render_text(engine: GameEngine) -> str:
+    """Отрисовывает состояние движка во внеэкранную консоль и возвращает ее текст."""
+    engine.render()
+    return str(engine.console)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Проигрывание записи партии Rogue'n'Roll")
+    parser.add_argument("log", help="файл записи партии")
+    parser.add_argument(
+        "--checkpoint",
+        type=int,
+        action="append",
+        default=[],
+        help="номер хода, на котором нужно показать состояние (можно повторять)",
+    )
+    args = parser.parse_args()
+
+    def show(engine: GameEngine) -> None:
+        print(f"Ход {engine.turn}")
+        print(render_text(engine))
+
+    engine = replay(ActionLog.load(args.log), args.checkpoint, show)
+    show(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import struct
+import zipfile
+import numpy as np
+from rogue_n_roll.engine.actions import ActionLog
+from rogue_n_roll.engine.dungeon import Floor
+from rogue_n_roll.engine.game_engine import GameEngine
+from rogue_n_roll.engine.scheduler import TurnScheduler
+from rogue_n_roll.game_objects.entity import Entity
+from rogue_n_roll.game_objects.entity_store import MODIFIABLE_STATS, default_store
+from rogue_n_roll.game_objects.items import create_item
+from rogue_n_roll.game_objects.monster import Monster
+from rogue_n_roll.game_objects.player import Player
+from rogue_n_roll.game_objects.stats import Stats
+from rogue_n_roll.map.game_map import GameMap
+from rogue_n_roll.map import tile_types
+
+SAVE_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+# Типы сущностей; индекс в кортеже служит кодом типа в сохранении
+ENTITY_TYPES = (Player, Monster)
+
+# Упакованные сущности: все поля EntityStore плюс тип и время следующего хода
+entity_dt = np.dtype(
+    [
+        ("kind", np.uint8),
+        ("x", np.int32),
+        ("y", np.int32),
+        ("ch", np.int32),
+        ("fg", "3B"),
+        ("hp", np.int32),
+        ("max_hp", np.int32),
+        ("attack", np.int32),
+        ("defense", np.int32),
+        ("speed", np.int32),
+        ("modifiers", np.int32, (len(MODIFIABLE_STATS),)),
+        ("flags", np.uint8),
+        ("next_turn", np.int64),  # -1, если сущность не в очереди ходов
+    ]
+)
+
+# Предметы на карте и в инвентарях: kind - id типа в реестре контента,
+# owner - индекс сущности или -1 для карты
+item_dt = np.dtype([("kind", np.uint8), ("x", np.int32), ("y", np.int32), ("owner", np.int32)])
+
+Snapshot = Dict[str, np.ndarray]
+
+
+def _floor_prefix(depth: int) -> str:
+    return f"floor{depth}_"
+
+
+def _pack_floor(floor: Floor) -> Snapshot:
+    """Собирает состояние этажа: карту, сущности, предметы, очередь ходов и лестницы."""
+    store = default_store()
+    game_map = floor.game_map
+    entities = list(game_map.entities)
+    slots = np.fromiter((entity.slot for entity in entities), dtype=np.int64, count=len(entities))
+    kinds = {entity_type: kind for kind, entity_type in enumerate(ENTITY_TYPES)}
+
+    packed = np.zeros(len(entities), dtype=entity_dt)
+    packed["kind"] = [kinds[type(entity)] for entity in entities]
+    for field, array in (
+        ("x", store.x), ("y", store.y), ("ch", store.ch), ("fg", store.fg), ("hp", store.hp),
+        ("max_hp", store.max_hp), ("attack", store.attack), ("defense", store.defense),
+        ("speed", store.speed), ("modifiers", store.modifiers), ("flags", store.flags),
+    ):
+        packed[field] = array[slots]
+    scheduler = floor.scheduler
+    next_turns = (scheduler.next_turn(entity) for entity in entities)
+    packed["next_turn"] = [-1 if next_turn is None else next_turn for next_turn in next_turns]
+    names = np.array([entity.name for entity in entities], dtype=str)
+
+    items = [(item.type_id, item.x, item.y, -1) for item in game_map.items]
+    for owner, entity in enumerate(entities):
+        if entity._inventory is not None:
+            items.extend((item.type_id, item.x, item.y, owner) for item in entity.inventory.items)
+
+    up_stairs = floor.up_stairs if floor.up_stairs is not None else (-1, -1)
+    prefix = _floor_prefix(floor.depth)
+    return {
+        prefix + "info": np.array(
+            [game_map.width, game_map.height, scheduler.time, *up_stairs, *floor.down_stairs], dtype=np.int64
+        ),
+        prefix + "tiles": game_map.tiles.copy(),
+        prefix + "explored": game_map.explored.copy(),
+        prefix + "entities": packed,
+        prefix + "names": names,
+        prefix + "items": np.array(items, dtype=item_dt),
+    }
+
+
+def snapshot(engine: GameEngine) -> Snapshot:
+    """Собирает состояние игры в словарь массивов.
+
+    Сохраняются все этажи из кэша подземелья, а не только текущий, поэтому
+    после загрузки посещенные этажи остаются такими, какими их оставил игрок.
+    Массивы копируются, поэтому снимок можно записывать в другом потоке,
+    пока игра продолжается.
+    """
+    floors = list(engine.dungeon.floors.values())
+    rng_version, rng_state, rng_gauss = engine.rng.getstate()
+    state = {
+        "header": np.array(
+            [
+                SAVE_VERSION,
+                engine.seed,
+                engine.turn,
+                list(engine.game_map.entities).index(engine.player),
+                engine.depth,
+            ],
+            dtype=np.int64,
+        ),
+        "rng_state": np.array((rng_version,) + rng_state, dtype=np.int64),
+        # Глубины этажей в порядке LRU-кэша подземелья
+        "floors": np.array([floor.depth for floor in floors], dtype=np.int64),
+        "actions": engine.action_log.as_array().copy(),
+    }
+    for floor in floors:
+        state.update(_pack_floor(floor))
+    return state
+
+
+def write_snapshot(state: Snapshot, path: str) -> None:
+    """Атомарно записывает снимок в файл без сжатия."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.savez(file, **state)
+    os.replace(temp_path, path)
+
+
+def save_game(engine: GameEngine, path: str) -> None:
+    """Сохраняет игру в файл."""
+    write_snapshot(snapshot(engine), path)
+
+
+def _load_array(path: str, archive: zipfile.ZipFile, name: str, direct: bool) -> np.ndarray:
+    """Читает массив из архива .npz.
+
+    Несжатые члены архива читаются прямо из файла одним вызовом, минуя
+    потоковое чтение zipfile. Массивы не отображаются в память: файл
+    сохранения не остается занятым, и автосохранение может заменить его
+    (в Windows отображенный в память файл заменить нельзя).
+    """
+    info = archive.getinfo(name + ".npy")
+    if not direct or info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member)
+
+    with open(path, "rb") as file:
+        file.seek(info.header_offset)
+        local_header = file.read(30)
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        if dtype.hasobject:
+            with archive.open(info) as member:
+                return np.lib.format.read_array(member)
+        count = int(np.prod(shape))
+        array = np.fromfile(file, dtype=dtype, count=count) if count else np.empty(0, dtype=dtype)
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def _unpack_floor(state: Snapshot, depth: int) -> Tuple[Floor, List[Entity]]:
+    """Восстанавливает этаж из снимка. Возвращает этаж и его сущности в порядке сохранения."""
+    prefix = _floor_prefix(depth)
+    width, height, time, up_x, up_y, down_x, down_y = (int(value) for value in state[prefix + "info"])
+    tiles = state[prefix + "tiles"]
+    if tiles.dtype != tile_types.tile_dt:
+        raise ValueError(f"Неверный тип тайлов этажа {depth} в сохранении: {tiles.dtype}")
+    game_map = GameMap(width, height)
+    game_map.tiles = tiles
+    game_map.explored = np.array(state[prefix + "explored"])
+
+    entities: List[Entity] = []
+    for record, name in zip(state[prefix + "entities"], state[prefix + "names"]):
+        stats = Stats(
+            max_hp=int(record["max_hp"]),
+            current_hp=int(record["hp"]),
+            attack_power=int(record["attack"]),
+            defense=int(record["defense"]),
+            speed=int(record["speed"]),
+            modifiers={
+                stat_name: int(value)
+                for stat_name, value in zip(MODIFIABLE_STATS, record["modifiers"])
+                if value
+            },
+        )
+        entity_type = ENTITY_TYPES[record["kind"]]
+        if entity_type is Player:
+            entity = Player(int(record["x"]), int(record["y"]), name=str(name))
+        else:
+            entity = Monster(int(record["x"]), int(record["y"]), "?", (0, 0, 0), str(name), 1, 0, 0)
+        entity.stats.load(stats)
+        entity.char = chr(record["ch"])
+        entity.color = tuple(int(value) for value in record["fg"])
+        default_store().flags[entity.slot] = record["flags"]
+        game_map.add_entity(entity)
+        entities.append(entity)
+
+    scheduler = TurnScheduler()
+    scheduler.time = time
+    for entity, record in zip(entities, state[prefix + "entities"]):
+        if record["next_turn"] >= 0:
+            scheduler.schedule(entity, int(record["next_turn"]) - time)
+
+    for record in state[prefix + "items"]:
+        item = create_item(int(record["kind"]), int(record["x"]), int(record["y"]))
+        if record["owner"] < 0:
+            game_map.add_item(item)
+        else:
+            entities[record["owner"]].inventory.add_item(item)
+
+    up_stairs = (up_x, up_y) if up_x >= 0 else None
+    return Floor(depth, game_map, scheduler, up_stairs, (down_x, down_y)), entities
+
+
+def load_game(path: str, headless: bool = False, direct: bool = True) -> GameEngine:
+    """Загружает игру из файла вместе со всеми сохраненными этажами."""
+    with zipfile.ZipFile(path) as archive:
+        state = {
+            name[: -len(".npy")]: _load_array(path, archive, name[: -len(".npy")], direct)
+            for name in archive.namelist()
+        }
+
+    header = [int(value) for value in state["header"]]
+    if header[0] != SAVE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия сохранения: {header[0]}")
+    _, seed, turn, player_index, depth = header
+
+    engine = GameEngine(headless=headless, seed=seed, generate_world=False)
+    engine.turn = turn
+    rng_state = [int(value) for value in state["rng_state"]]
+    engine.rng.setstate((rng_state[0], tuple(rng_state[1:]), None))
+    engine.action_log = ActionLog(seed, state["actions"].tobytes())
+
+    # Этажи добавляются в порядке LRU, чтобы кэш подземелья остался прежним
+    for floor_depth in (int(value) for value in state["floors"]):
+        floor, entities = _unpack_floor(state, floor_depth)
+        engine.dungeon.add(floor)
+        if floor_depth == depth:
+            engine.depth = depth
+            engine.game_map = floor.game_map
+            engine.scheduler = floor.scheduler
+            engine.player = entities[player_index]
+    if engine.player is None:
+        raise ValueError(f"В сохранении нет текущего этажа {depth}")
+    engine.dungeon.prefetch(depth + 1)
+    return engine
+
+
+class AutoSaver:
+    """Фоновое автосохранение.
+
+    Снимок состояния собирается в основном потоке (это копирование
+    нескольких массивов), а сериализация и запись на диск выполняются в
+    отдельном потоке. Если предыдущая запись еще не закончилась, очередное
+    автосохранение пропускается, чтобы не задерживать кадр.
+    """
+
+    def __init__(self, engine: GameEngine, path: str, every_turns: int = 50):
+        self.engine = engine
+        self.path = path
+        self.every_turns = every_turns
+        self.saves_written = 0
+        self.saves_skipped = 0
+        self.saves_failed = 0
+        # Последняя ошибка записи; игра продолжается, но ошибка не теряется
+        self.last_error: Optional[BaseException] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._pending: Optional[Future] = None
+        # Ход, на котором выполняется следующее автосохранение
+        self._next_turn = (engine.turn // every_turns + 1) * every_turns
+
+    def on_turn(self) -> None:
+        """Вызывается движком после каждого хода."""
+        # Бег и автоисследование продвигают счетчик сразу на несколько ходов
+        if self.engine.turn >= self._next_turn:
+            self._next_turn = (self.engine.turn // self.every_turns + 1) * self.every_turns
+            self.save_async()
+
+    def save_async(self) -> bool:
+        """Запускает фоновую запись. Возвращает False, если запись пропущена."""
+        if self._pending is not None and not self._pending.done():
+            self.saves_skipped += 1
+            return False
+        self._pending = self._executor.submit(write_snapshot, snapshot(self.engine), self.path)
+        self._pending.add_done_callback(self._on_done)
+        return True
+
+    def _on_done(self, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            self.saves_written += 1
+            return
+        self.saves_failed += 1
+        self.last_error = error
+        logger.error("Автосохранение в %s не удалось", self.path, exc_info=error)
+
+    def close(self) -> None:
+        """Дожидается завершения записи и останавливает поток."""
+        self._executor.shutdown(wait=True)
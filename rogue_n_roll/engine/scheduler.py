@@ -0,0 +1,96 @@
+from typing import Dict, List, Optional, TYPE_CHECKING
+import heapq
+import itertools
+from rogue_n_roll.game_objects.stats import NORMAL_SPEED
+
+if TYPE_CHECKING:
+    from rogue_n_roll.game_objects.entity import Entity
+
+# Время одного действия сущности с нормальной скоростью
+ACTION_COST = 100
+
+
+def action_delay(speed: int) -> int:
+    """Возвращает время до следующего действия сущности с заданной скоростью."""
+    return max(1, ACTION_COST * NORMAL_SPEED // max(1, speed))
+
+
+class TurnScheduler:
+    """Очередь ходов на куче, упорядоченная по времени следующего действия.
+
+    Каждое действие сдвигает время сущности на action_delay(speed), поэтому
+    быстрые сущности ходят чаще медленных. Удаление ленивое: запись
+    помечается недействительной и выбрасывается, когда доходит до вершины
+    кучи. Все операции стоят O(log n).
+    """
+
+    def __init__(self):
+        self.time = 0
+        self._heap: List[list] = []
+        self._entries: Dict["Entity", list] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, actor: "Entity") -> bool:
+        return actor in self._entries
+
+    def next_turn(self, actor: "Entity") -> Optional[int]:
+        """Возвращает время следующего действия сущности или None, если ее нет в очереди."""
+        entry = self._entries.get(actor)
+        return entry[0] if entry is not None else None
+
+    def schedule(self, actor: "Entity", delay: int = 0) -> None:
+        """Ставит сущность в очередь через delay единиц времени."""
+        self.remove(actor)
+        # Порядковый номер сохраняет порядок добавления при равном времени
+        entry = [self.time + delay, next(self._counter), actor]
+        self._entries[actor] = entry
+        heapq.heappush(self._heap, entry)
+
+    def reschedule(self, actor: "Entity") -> None:
+        """Ставит сущность в очередь после потраченного действия."""
+        self.schedule(actor, action_delay(actor.stats.speed))
+
+    def remove(self, actor: "Entity") -> None:
+        """Убирает сущность из очереди."""
+        entry = self._entries.pop(actor, None)
+        if entry is not None:
+            entry[2] = None
+
+    def _discard_stale(self) -> None:
+        """Выбрасывает с вершины кучи удаленные и погибшие сущности."""
+        heap = self._heap
+        while heap:
+            actor = heap[0][2]
+            if actor is not None and actor.is_alive():
+                return
+            heapq.heappop(heap)
+            if actor is not None:
+                del self._entries[actor]
+
+    def peek_time(self) -> int:
+        """Возвращает время ближайшего действия или текущее время при пустой очереди."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else self.time
+
+    def next_batch(self) -> List["Entity"]:
+        """Извлекает всех, кто действует в ближайший момент времени, и переводит часы.
+
+        Извлеченные сущности нужно вернуть в очередь через reschedule.
+        """
+        self._discard_stale()
+        if not self._heap:
+            return []
+        self.time = self._heap[0][0]
+        batch = []
+        while self._heap and self._heap[0][0] == self.time:
+            entry = heapq.heappop(self._heap)
+            actor = entry[2]
+            if actor is None:
+                continue
+            del self._entries[actor]
+            if actor.is_alive():
+                batch.append(actor)
+        return batch
@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import resources
+from typing import Dict, Optional, Sequence, Tuple, TypeVar, Union
+import hashlib
+import json
+import os
+import pathlib
+import random
+import numpy as np
+
+# Версия формата кэша; при изменении схемы старые кэши перестают совпадать
+CONTENT_VERSION = 2
+CONTENT_FILES = ("items.json", "monsters.json")
+
+# Каталог кэша можно задать переменной окружения
+CACHE_ENV = "ROGUE_N_ROLL_CACHE"
+# Каталог файлов данных вместо данных пакета (например, для модов)
+CONTENT_ENV = "ROGUE_N_ROLL_CONTENT"
+
+Color = Tuple[int, int, int]
+TypeKey = Union[int, str]
+
+item_record_dt = np.dtype(
+    [
+        ("key", "U32"),
+        ("char", "U1"),
+        ("color", np.uint8, (3,)),
+        ("name", "U64"),
+        ("description", "U128"),
+        ("effect", "U16"),
+        ("power", np.int32),
+        ("range", np.int32),
+        ("weight", np.int32),
+    ]
+)
+monster_record_dt = np.dtype(
+    [
+        ("key", "U32"),
+        ("char", "U1"),
+        ("color", np.uint8, (3,)),
+        ("name", "U64"),
+        ("max_hp", np.int32),
+        ("attack_power", np.int32),
+        ("defense", np.int32),
+        ("speed", np.int32),
+        ("weight", np.int32),
+    ]
+)
+
+# Необязательные поля записей и их значения по умолчанию
+_DEFAULTS = {"description": "", "power": 0, "range": 0, "speed": 100, "weight": 1}
+
+
+@dataclass(frozen=True)
+class ItemType:
+    """Шаблон предмета: данные, общие для всех предметов этого типа."""
+
+    type_id: int
+    key: str
+    char: str
+    color: Color
+    name: str
+    description: str
+    effect: str  # Действие при использовании (см. items.ITEM_EFFECTS)
+    power: int
+    range: int
+    weight: int  # Относительный вес при генерации уровня; 0 - не появляется сам
+
+
+@dataclass(frozen=True)
+class MonsterType:
+    """Шаблон монстра: внешний вид и начальные характеристики."""
+
+    type_id: int
+    key: str
+    char: str
+    color: Color
+    name: str
+    max_hp: int
+    attack_power: int
+    defense: int
+    speed: int
+    weight: int  # Относительный вес при заселении этажа; 0 - не появляется сам
+
+
+ContentType = TypeVar("ContentType", ItemType, MonsterType)
+
+
+class ContentRegistry:
+    """Реестр типов предметов и монстров. Id типа - его индекс в файле данных."""
+
+    def __init__(self, items: Sequence[ItemType], monsters: Sequence[MonsterType]):
+        self.items = tuple(items)
+        self.monsters = tuple(monsters)
+        self._items_by_key = {item.key: item for item in self.items}
+        self._monsters_by_key = {monster.key: monster for monster in self.monsters}
+
+    def item(self, key: TypeKey) -> ItemType:
+        """Возвращает тип предмета по id или ключу."""
+        return self.items[key] if isinstance(key, int) else self._items_by_key[key]
+
+    def monster(self, key: TypeKey) -> MonsterType:
+        """Возвращает тип монстра по id или ключу."""
+        return self.monsters[key] if isinstance(key, int) else self._monsters_by_key[key]
+
+
+def choose_type(rng: random.Random, types: Sequence[ContentType]) -> ContentType:
+    """Выбирает тип для генерации уровня с учетом весов из файлов данных."""
+    return rng.choices(types, weights=[entry.weight for entry in types])[0]
+
+
+def _records(name: str, text: bytes, dtype: np.dtype) -> np.ndarray:
+    """Разбирает файл данных в массив записей, проверяя поля и ключи."""
+    entries = json.loads(text)
+    rows = []
+    for entry in entries:
+        entry = {**_DEFAULTS, **entry}
+        missing = [field for field in dtype.names if field not in entry]
+        if missing:
+            raise ValueError(f"{name}: у записи {entry.get('key')!r} нет полей {missing}")
+        if len(entry["char"]) != 1:
+            raise ValueError(f"{name}: символ записи {entry['key']!r} должен быть одним знаком")
+        if entry["weight"] < 0:
+            raise ValueError(f"{name}: вес записи {entry['key']!r} не может быть отрицательным")
+        rows.append(tuple(entry[field] for field in dtype.names))
+    records = np.array(rows, dtype=dtype)
+    if len(np.unique(records["key"])) != len(records):
+        raise ValueError(f"{name}: ключи записей повторяются")
+    if not records["weight"].any():
+        raise ValueError(f"{name}: хотя бы одна запись должна иметь ненулевой вес")
+    return records
+
+
+def compile_content(sources: Dict[str, bytes]) -> Dict[str, np.ndarray]:
+    """Компилирует файлы данных в массивы для кэша."""
+    return {
+        "items": _records("items.json", sources["items.json"], item_record_dt),
+        "monsters": _records("monsters.json", sources["monsters.json"], monster_record_dt),
+    }
+
+
+def registry_from_arrays(arrays: Dict[str, np.ndarray]) -> ContentRegistry:
+    """Строит реестр из скомпилированных массивов."""
+
+    def color(record) -> Color:
+        red, green, blue = record["color"].tolist()
+        return red, green, blue
+
+    items = [
+        ItemType(
+            type_id,
+            str(record["key"]),
+            str(record["char"]),
+            color(record),
+            str(record["name"]),
+            str(record["description"]),
+            str(record["effect"]),
+            int(record["power"]),
+            int(record["range"]),
+            int(record["weight"]),
+        )
+        for type_id, record in enumerate(arrays["items"])
+    ]
+    monsters = [
+        MonsterType(
+            type_id,
+            str(record["key"]),
+            str(record["char"]),
+            color(record),
+            str(record["name"]),
+            int(record["max_hp"]),
+            int(record["attack_power"]),
+            int(record["defense"]),
+            int(record["speed"]),
+            int(record["weight"]),
+        )
+        for type_id, record in enumerate(arrays["monsters"])
+    ]
+    return ContentRegistry(items, monsters)
+
+
+def _read_sources(directory) -> Dict[str, bytes]:
+    return {name: (directory / name).read_bytes() for name in CONTENT_FILES}
+
+
+def source_hash(sources: Dict[str, bytes]) -> str:
+    """Хэш версии формата и содержимого файлов данных, как у проверяемых по хэшу .pyc."""
+    digest = hashlib.sha256(str(CONTENT_VERSION).encode())
+    for name in CONTENT_FILES:
+        digest.update(name.encode())
+        digest.update(sources[name])
+    return digest.hexdigest()[:16]
+
+
+def default_cache_dir() -> str:
+    """Каталог кэша: из переменной окружения или пользовательский кэш."""
+    if os.environ.get(CACHE_ENV):
+        return os.environ[CACHE_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rogue_n_roll")
+
+
+def _write_cache(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """Атомарно записывает кэш. Ошибки записи не мешают игре: кэш лишь ускоряет запуск."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_content(data_dir: Optional[str] = None, cache_dir: Optional[str] = None) -> ContentRegistry:
+    """Загружает реестр контента.
+
+    Файлы данных (JSON) разбираются и проверяются один раз, результат
+    сохраняется в кэш в виде массивов NumPy (.npz). Имя кэша зависит от
+    хэша содержимого файлов данных, поэтому при их изменении кэш
+    пересобирается автоматически. data_dir - каталог файлов данных (по умолчанию данные пакета).
+    """
+    if data_dir is not None:
+        directory = pathlib.Path(data_dir)
+    else:
+        directory = resources.files("rogue_n_roll") / "resources" / "content"
+    sources = _read_sources(directory)
+    path = os.path.join(cache_dir or default_cache_dir(), f"content-{source_hash(sources)}.npz")
+    try:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in ("items", "monsters")}
+    except (OSError, KeyError, ValueError):
+        arrays = compile_content(sources)
+        _write_cache(path, arrays)
+    return registry_from_arrays(arrays)
+
+
+@lru_cache(maxsize=None)
+def content() -> ContentRegistry:
+    """Возвращает общий реестр контента, загружая его при первом обращении.
+
+    Каталог файлов данных можно заменить переменной окружения CONTENT_ENV.
+    """
+    return load_content(os.environ.get(CONTENT_ENV) or None)
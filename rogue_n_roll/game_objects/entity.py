@@ -1,7 +1,10 @@
 from typing import Optional, Tuple, TYPE_CHECKING
+import math
 from rogue_n_roll.game_objects.game_object import GameObject
-from rogue_n_roll.game_objects.stats import Stats
+from rogue_n_roll.game_objects.stats import Stats, StatsView
 from rogue_n_roll.game_objects.inventory import Inventory
+from rogue_n_roll.game_objects.entity_store import FLAG_BLOCKING, FLAG_HOSTILE, default_store
+from rogue_n_roll.engine.combat import ATTACK_INDEX, DEFENSE_INDEX, attack_damage
 
 if TYPE_CHECKING:
     from rogue_n_roll.map.game_map import GameMap
@@ -9,6 +12,14 @@ if TYPE_CHECKING:
 
 
 class Entity(GameObject):
+    """Сущность - представление над слотом в общем EntityStore.
+
+    Позиция, символ, цвет, флаги и характеристики хранятся в массивах
+    хранилища; в объекте остаются только ссылки и редко используемые поля.
+    """
+
+    __slots__ = ("_store", "slot", "_stats", "_inventory")
+
     def __init__(
         self,
         x: int,
@@ -19,19 +30,105 @@ class Entity(GameObject):
         stats: Optional[Stats] = None,
         is_blocking: bool = True,
     ):
+        self._store = default_store()
+        self.slot = self._store.allocate()
+        self._stats = StatsView(self._store, self.slot)
+        self._stats.load(stats or Stats())
+        self._inventory: Optional[Inventory] = None
         super().__init__(x, y, char, color, name, is_blocking=is_blocking)
-        self.stats = stats or Stats()
-        self.inventory = Inventory()
 
-    def move(self, dx: int, dy: int) -> None:
-        """Перемещает сущность."""
+    def __del__(self) -> None:
+        store = getattr(self, "_store", None)
+        if store is not None:
+            store.free(self.slot)
+
+    @property
+    def x(self) -> int:
+        return int(self._store.x[self.slot])
+
+    @x.setter
+    def x(self, value: int) -> None:
+        self._store.x[self.slot] = value
+
+    @property
+    def y(self) -> int:
+        return int(self._store.y[self.slot])
+
+    @y.setter
+    def y(self, value: int) -> None:
+        self._store.y[self.slot] = value
+
+    @property
+    def char(self) -> str:
+        return chr(self._store.ch[self.slot])
+
+    @char.setter
+    def char(self, value: str) -> None:
+        self._store.ch[self.slot] = ord(value)
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        red, green, blue = self._store.fg[self.slot]
+        return int(red), int(green), int(blue)
+
+    @color.setter
+    def color(self, value: Tuple[int, int, int]) -> None:
+        self._store.fg[self.slot] = value
+
+    @property
+    def is_blocking(self) -> bool:
+        return bool(self._store.flags[self.slot] & FLAG_BLOCKING)
+
+    @is_blocking.setter
+    def is_blocking(self, value: bool) -> None:
+        if value:
+            self._store.flags[self.slot] |= FLAG_BLOCKING
+        else:
+            self._store.flags[self.slot] &= ~FLAG_BLOCKING
+
+    @property
+    def is_hostile(self) -> bool:
+        return bool(self._store.flags[self.slot] & FLAG_HOSTILE)
+
+    @is_hostile.setter
+    def is_hostile(self, value: bool) -> None:
+        if value:
+            self._store.flags[self.slot] |= FLAG_HOSTILE
+        else:
+            self._store.flags[self.slot] &= ~FLAG_HOSTILE
+
+    @property
+    def stats(self) -> StatsView:
+        """Характеристики сущности."""
+        return self._stats
+
+    @property
+    def inventory(self) -> Inventory:
+        """Инвентарь сущности, создается при первом обращении."""
+        if self._inventory is None:
+            self._inventory = Inventory()
+        return self._inventory
+
+    def move(self, dx: int, dy: int) -> bool:
+        """Перемещает сущность. Возвращает True, если перемещение удалось."""
+        if self.game_map is not None:
+            return self.game_map.move_entity(self, dx, dy)
         self.x += dx
         self.y += dy
+        return True
+
+    def attack(self, target: "Entity") -> int:
+        """Атакует другую сущность. Возвращает потерянное целью здоровье.
 
-    def attack(self, target: "Entity") -> None:
-        """Атакует другую сущность."""
-        damage = max(0, self.stats.attack_power - target.stats.defense)
-        target.stats.take_damage(damage)
+        Эффективные атака и защита читаются прямо из хранилища; формула урона
+        общая с пакетным разрешением боя в engine.combat.
+        """
+        store = self._store
+        attack = int(store.attack[self.slot] + store.modifiers[self.slot, ATTACK_INDEX])
+        defense = int(store.defense[target.slot] + store.modifiers[target.slot, DEFENSE_INDEX])
+        hp = int(store.hp[target.slot])
+        target.stats.take_damage(attack_damage(attack, defense))
+        return hp - int(store.hp[target.slot])
 
     def is_alive(self) -> bool:
         """Проверяет, жива ли сущность."""
@@ -55,7 +152,7 @@ class Entity(GameObject):
 
     def distance_to(self, other: GameObject) -> float:
         """Вычисляет расстояние до другого объекта."""
-        return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
+        return math.hypot(self.x - other.x, self.y - other.y)
 
     def move_towards(self, target_x: int, target_y: int) -> None:
         """Перемещает сущность в направлении целевой точки."""
@@ -74,4 +171,4 @@ class Entity(GameObject):
 
     def heal(self, amount: int) -> None:
         """Восстанавливает здоровье сущности."""
-        self.stats.heal(amount) 
\ No newline at end of file
+        self.stats.heal(amount)
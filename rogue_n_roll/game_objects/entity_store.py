@@ -0,0 +1,148 @@
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import threading
+import numpy as np
+
+if TYPE_CHECKING:
+    import tcod.console
+
+# Флаги сущности
+FLAG_ACTIVE = 1  # Слот занят
+FLAG_BLOCKING = 2  # Сущность блокирует клетку
+FLAG_HOSTILE = 4  # Сущность враждебна игроку
+
+# Характеристики, к которым применяются модификаторы, и их столбцы в modifiers
+MODIFIABLE_STATS = ("max_hp", "attack_power", "defense", "speed")
+MODIFIER_INDEX = {name: index for index, name in enumerate(MODIFIABLE_STATS)}
+
+
+class EntityStore:
+    """Хранилище сущностей в виде параллельных массивов NumPy (structure of arrays).
+
+    Каждой сущности выделяется слот - индекс во всех массивах. Освобожденные
+    слоты переиспользуются через список свободных слотов. Объекты Entity
+    являются лишь представлениями над своим слотом.
+
+    Слоты освобождаются из Entity.__del__, который сборщик мусора может
+    вызвать в любом месте, в том числе внутри allocate() под блокировкой.
+    Поэтому free() не берет блокировку: слот попадает в список ожидающих,
+    а allocate() переносит ожидающие слоты в свободные.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = 0
+        self.size = 0  # Граница занятых когда-либо слотов
+        self._free: List[int] = []
+        # Слоты, освобожденные без блокировки; list.append атомарен
+        self._pending: List[int] = []
+        self._lock = threading.Lock()
+
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.ch = np.zeros(0, dtype=np.int32)
+        self.fg = np.zeros((0, 3), dtype=np.uint8)
+        self.hp = np.zeros(0, dtype=np.int32)
+        self.max_hp = np.zeros(0, dtype=np.int32)
+        self.attack = np.zeros(0, dtype=np.int32)
+        self.defense = np.zeros(0, dtype=np.int32)
+        self.speed = np.zeros(0, dtype=np.int32)
+        self.modifiers = np.zeros((0, len(MODIFIABLE_STATS)), dtype=np.int32)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self._grow(capacity)
+
+    _ARRAYS = (
+        "x", "y", "ch", "fg", "hp", "max_hp", "attack", "defense", "speed", "modifiers", "flags",
+    )
+
+    def _grow(self, capacity: int) -> None:
+        """Увеличивает емкость всех массивов."""
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def allocate(self) -> int:
+        """Выделяет слот под новую сущность."""
+        with self._lock:
+            self._drain_pending()
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self.size == self.capacity:
+                    self._grow(self.capacity * 2)
+                slot = self.size
+                self.size += 1
+            self.flags[slot] = FLAG_ACTIVE
+            self.modifiers[slot] = 0
+            return slot
+
+    def free(self, slot: int) -> None:
+        """Освобождает слот для повторного использования. Не блокирует и безопасен в __del__."""
+        # Слот сразу перестает считаться занятым; если запись попала в старые
+        # массивы во время _grow, ее повторит _drain_pending
+        self.flags[slot] = 0
+        self._pending.append(slot)
+
+    def _drain_pending(self) -> None:
+        """Переносит ожидающие слоты в свободные. Вызывается под блокировкой."""
+        # Слоты, добавленные сборщиком мусора во время переноса, остаются за срезом
+        count = len(self._pending)
+        slots = self._pending[:count]
+        del self._pending[:count]
+        for slot in slots:
+            self.flags[slot] = 0
+        self._free.extend(slots)
+
+    def __len__(self) -> int:
+        return self.size - len(self._free) - len(self._pending)
+
+    def effective(self, stat_name: str, slots: np.ndarray) -> np.ndarray:
+        """Возвращает значения характеристики с учетом модификаторов."""
+        base = getattr(self, _STAT_ARRAYS[stat_name])[slots]
+        return base + self.modifiers[slots, MODIFIER_INDEX[stat_name]]
+
+    def draw(
+        self,
+        console: "tcod.console.Console",
+        slots: np.ndarray,
+        visible: np.ndarray,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """Рисует видимые сущности из slots одной записью в консоль.
+
+        origin - клетка карты (x, y) в левом верхнем углу консоли; visible
+        индексируется координатами карты.
+        """
+        xs = self.x[slots]
+        ys = self.y[slots]
+        ox, oy = origin
+        cxs, cys = xs - ox, ys - oy
+        shown = (
+            (xs >= 0) & (ys >= 0) & (xs < visible.shape[1]) & (ys < visible.shape[0])
+            & (cxs >= 0) & (cys >= 0) & (cxs < console.width) & (cys < console.height)
+        )
+        shown[shown] = visible[ys[shown], xs[shown]]
+        slots, cxs, cys = slots[shown], cxs[shown], cys[shown]
+        console.rgb["ch"][cxs, cys] = self.ch[slots]
+        console.rgb["fg"][cxs, cys] = self.fg[slots]
+
+
+# Соответствие имен характеристик Stats массивам хранилища
+_STAT_ARRAYS = {
+    "max_hp": "max_hp",
+    "current_hp": "hp",
+    "attack_power": "attack",
+    "defense": "defense",
+    "speed": "speed",
+}
+
+_default_store: Optional[EntityStore] = None
+
+
+def default_store() -> EntityStore:
+    """Возвращает общее хранилище сущностей игры."""
+    global _default_store
+    if _default_store is None:
+        _default_store = EntityStore()
+    return _default_store
@@ -1,8 +1,15 @@
-from typing import Optional
-import tcod.console
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tcod.console
+    from rogue_n_roll.map.game_map import GameMap
 
 
 class GameObject:
+    # Координаты, символ и цвет хранятся в наследниках: в атрибутах экземпляра
+    # у предметов и в EntityStore у сущностей
+    __slots__ = ("name", "is_walkable", "game_map")
+
     def __init__(
         self,
         x: int,
@@ -20,8 +27,9 @@ class GameObject:
         self.name = name
         self.is_blocking = is_blocking
         self.is_walkable = is_walkable
+        self.game_map: Optional["GameMap"] = None
 
-    def draw(self, console: tcod.console.Console) -> None:
+    def draw(self, console: "tcod.console.Console") -> None:
         """Отрисовывает объект на консоли."""
         console.print(x=self.x, y=self.y, string=self.char, fg=self.color)
 
@@ -1,23 +1,51 @@
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import ClassVar, Optional, Tuple, TYPE_CHECKING
 from rogue_n_roll.game_objects.game_object import GameObject
+from rogue_n_roll.game_objects.content import ItemType, content
 
 if TYPE_CHECKING:
     from rogue_n_roll.game_objects.entity import Entity
 
 
 class Item(GameObject):
-    def __init__(
-        self,
-        x: int,
-        y: int,
-        char: str,
-        color: Tuple[int, int, int],
-        name: str,
-        description: str,
-        is_blocking: bool = False,
-    ):
-        super().__init__(x, y, char, color, name, is_blocking=is_blocking)
-        self.description = description
+    """Предмет - легковес: ссылка на общий шаблон типа из реестра контента
+    и собственное состояние (позиция и карта).
+
+    Символ, цвет, название и описание берутся из шаблона и в предмете не
+    хранятся.
+    """
+
+    __slots__ = ("x", "y", "template")
+
+    # Ключ типа в реестре контента для предметов, создаваемых без шаблона
+    KEY: ClassVar[Optional[str]] = None
+    is_blocking = False
+
+    def __init__(self, x: int, y: int, template: Optional[ItemType] = None):
+        self.x = x
+        self.y = y
+        self.template = template if template is not None else content().item(self.KEY)
+        self.is_walkable = True
+        self.game_map = None
+
+    @property
+    def type_id(self) -> int:
+        return self.template.type_id
+
+    @property
+    def char(self) -> str:
+        return self.template.char
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return self.template.color
+
+    @property
+    def name(self) -> str:
+        return self.template.name
+
+    @property
+    def description(self) -> str:
+        return self.template.description
 
     def use(self, user: "Entity") -> bool:
         """Использует предмет. Возвращает True, если предмет нужно удалить из инвентаря."""
@@ -38,4 +66,4 @@ class Item(GameObject):
             self.y = user.y
             user.game_map.add_item(self)
             return True
-        return False 
\ No newline at end of file
+        return False
@@ -1,93 +1,74 @@
-from typing import Tuple, TYPE_CHECKING
+from typing import Dict, Type, TYPE_CHECKING
 from rogue_n_roll.game_objects.item import Item
-from rogue_n_roll.engine.colors import POTION_COLOR, SWORD_COLOR, SHIELD_COLOR, SCROLL_COLOR
+from rogue_n_roll.game_objects.content import TypeKey, content
 
 if TYPE_CHECKING:
     from rogue_n_roll.game_objects.entity import Entity
 
 
 class HealthPotion(Item):
-    def __init__(self, x: int, y: int):
-        super().__init__(
-            x=x,
-            y=y,
-            char="!",
-            color=POTION_COLOR,
-            name="Health Potion",
-            description="Restores 4 health points",
-        )
+    __slots__ = ()
+    KEY = "health_potion"
 
     def use(self, user: "Entity") -> bool:
         """Использует зелье здоровья."""
         if user.stats.current_hp < user.stats.max_hp:
-            user.stats.heal(4)
+            user.stats.heal(self.template.power)
             return True
         return False
 
 
 class Sword(Item):
-    def __init__(self, x: int, y: int):
-        super().__init__(
-            x=x,
-            y=y,
-            char="/",
-            color=SWORD_COLOR,
-            name="Sword",
-            description="Increases attack power by 2",
-        )
+    __slots__ = ()
+    KEY = "sword"
 
     def use(self, user: "Entity") -> bool:
         """Экипирует меч."""
-        user.stats.attack_power += 2
+        user.stats.attack_power += self.template.power
         return True
 
 
 class Shield(Item):
-    def __init__(self, x: int, y: int):
-        super().__init__(
-            x=x,
-            y=y,
-            char="]",
-            color=SHIELD_COLOR,
-            name="Shield",
-            description="Increases defense by 1",
-        )
+    __slots__ = ()
+    KEY = "shield"
 
     def use(self, user: "Entity") -> bool:
         """Экипирует щит."""
-        user.stats.defense += 1
+        user.stats.defense += self.template.power
         return True
 
 
 class ScrollOfLightning(Item):
-    def __init__(self, x: int, y: int):
-        super().__init__(
-            x=x,
-            y=y,
-            char="?",
-            color=SCROLL_COLOR,
-            name="Lightning Scroll",
-            description="Deals 6 damage to nearest enemy",
-        )
+    __slots__ = ()
+    KEY = "scroll_of_lightning"
 
     def use(self, user: "Entity") -> bool:
         """Использует свиток молнии."""
         if not user.game_map:
             return False
 
-        # Находим ближайшего врага
-        closest_enemy = None
-        closest_distance = float("inf")
+        # Ближайший живой противник в пределах дальности свитка
+        target = user.game_map.nearest(
+            user.x, user.y, lambda entity: entity is not user and entity.is_alive(), max_radius=self.template.range
+        )
+        if target is not None:
+            target.stats.take_damage(self.template.power)
+            return True
+
+        return False
 
-        for entity in user.game_map.entities:
-            if entity != user and entity.is_alive():
-                distance = ((entity.x - user.x) ** 2 + (entity.y - user.y) ** 2) ** 0.5
-                if distance < closest_distance:
-                    closest_enemy = entity
-                    closest_distance = distance
 
-        if closest_enemy and closest_distance <= 5:  # Максимальная дальность 5 клеток
-            closest_enemy.stats.take_damage(6)
-            return True
+# Классы предметов по действию шаблона: новые типы с известным действием
+# добавляются только в файлы данных
+ITEM_EFFECTS: Dict[str, Type[Item]] = {
+    "heal": HealthPotion,
+    "attack_bonus": Sword,
+    "defense_bonus": Shield,
+    "lightning": ScrollOfLightning,
+}
+
 
-        return False 
\ No newline at end of file
+def create_item(key: TypeKey, x: int, y: int) -> Item:
+    """Создает предмет по id или ключу типа в реестре контента."""
+    template = content().item(key)
+    return ITEM_EFFECTS[template.effect](x, y, template)
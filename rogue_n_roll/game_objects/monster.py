@@ -1,9 +1,12 @@
 from typing import Optional, Tuple
+from rogue_n_roll.game_objects.content import TypeKey, content
 from rogue_n_roll.game_objects.entity import Entity
-from rogue_n_roll.game_objects.stats import Stats
+from rogue_n_roll.game_objects.stats import NORMAL_SPEED, Stats
 
 
 class Monster(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         x: int,
@@ -14,12 +17,14 @@ class Monster(Entity):
         max_hp: int,
         attack_power: int,
         defense: int,
+        speed: int = NORMAL_SPEED,
     ):
         stats = Stats(
             max_hp=max_hp,
             current_hp=max_hp,
             attack_power=attack_power,
             defense=defense,
+            speed=speed,
         )
         super().__init__(
             x=x,
@@ -30,51 +35,32 @@ class Monster(Entity):
             stats=stats,
             is_blocking=True,
         )
+        self.is_hostile = True
 
-    def attack(self, target: Entity) -> None:
-        """Атакует цель."""
-        damage = max(0, self.stats.get_effective_stat("attack_power") - target.stats.get_effective_stat("defense"))
-        if damage > 0:
-            target.take_damage(damage)
-        else:
-            # Минимальный урон всегда 1
-            target.take_damage(1)
-
-    @staticmethod
-    def create_rat(x: int, y: int) -> "Monster":
-        return Monster(
+    @classmethod
+    def spawn(cls, key: TypeKey, x: int, y: int) -> "Monster":
+        """Создает монстра по id или ключу типа в реестре контента."""
+        template = content().monster(key)
+        return cls(
             x=x,
             y=y,
-            char="r",
-            color=(150, 150, 150),  # Серый цвет для крыс
-            name="Крыса",
-            max_hp=5,
-            attack_power=2,
-            defense=0,
+            char=template.char,
+            color=template.color,
+            name=template.name,
+            max_hp=template.max_hp,
+            attack_power=template.attack_power,
+            defense=template.defense,
+            speed=template.speed,
         )
 
+    @staticmethod
+    def create_rat(x: int, y: int) -> "Monster":
+        return Monster.spawn("rat", x, y)
+
     @staticmethod
     def create_orc(x: int, y: int) -> "Monster":
-        return Monster(
-            x=x,
-            y=y,
-            char="O",  # Заглавная O для лучшей видимости
-            color=(0, 255, 0),  # Ярко-зеленый для орков
-            name="Орк",
-            max_hp=10,
-            attack_power=4,
-            defense=1,
-        )
+        return Monster.spawn("orc", x, y)
 
     @staticmethod
     def create_troll(x: int, y: int) -> "Monster":
-        return Monster(
-            x=x,
-            y=y,
-            char="T",
-            color=(255, 0, 0),  # Красный для троллей
-            name="Тролль",
-            max_hp=20,
-            attack_power=6,
-            defense=2,
-        ) 
\ No newline at end of file
+        return Monster.spawn("troll", x, y)
@@ -4,6 +4,8 @@ from rogue_n_roll.game_objects.stats import Stats
 
 
 class Player(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         x: int,
@@ -27,12 +29,3 @@ class Player(Entity):
             stats=stats,
             is_blocking=True,
         )
-
-    def attack(self, target: Entity) -> None:
-        """Атакует цель."""
-        damage = max(0, self.stats.get_effective_stat("attack_power") - target.stats.get_effective_stat("defense"))
-        if damage > 0:
-            target.take_damage(damage)
-        else:
-            # Минимальный урон всегда 1
-            target.take_damage(1) 
\ No newline at end of file
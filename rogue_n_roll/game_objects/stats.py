@@ -1,5 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Optional, TYPE_CHECKING
+from rogue_n_roll.game_objects.entity_store import MODIFIER_INDEX
+
+if TYPE_CHECKING:
+    from rogue_n_roll.game_objects.entity_store import EntityStore
+
+# Нормальная скорость: сущность со скоростью 200 ходит вдвое чаще, с 50 - вдвое реже
+NORMAL_SPEED = 100
 
 
 @dataclass
@@ -8,7 +15,7 @@ class Stats:
     current_hp: int
     attack_power: int
     defense: int
-    speed: int = 1
+    speed: int = NORMAL_SPEED
     modifiers: Dict[str, int] = None
 
     def __post_init__(self):
@@ -42,4 +49,116 @@ class Stats:
         if stat_name in self.modifiers:
             self.modifiers[stat_name] = max(0, self.modifiers[stat_name] - value)
             if self.modifiers[stat_name] == 0:
-                del self.modifiers[stat_name] 
\ No newline at end of file
+                del self.modifiers[stat_name] 
+
+class StatsView:
+    """Характеристики сущности, хранящиеся в EntityStore.
+
+    Повторяет интерфейс Stats, но читает и пишет значения в массивы
+    хранилища по слоту сущности.
+    """
+
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: "EntityStore", slot: int):
+        self._store = store
+        self._slot = slot
+
+    def load(self, stats: Stats) -> None:
+        """Записывает в хранилище значения из Stats."""
+        store, slot = self._store, self._slot
+        store.max_hp[slot] = stats.max_hp
+        store.hp[slot] = stats.current_hp
+        store.attack[slot] = stats.attack_power
+        store.defense[slot] = stats.defense
+        store.speed[slot] = stats.speed
+        store.modifiers[slot] = 0
+        for stat_name, value in stats.modifiers.items():
+            self.add_modifier(stat_name, value)
+
+    def to_stats(self) -> Stats:
+        """Возвращает копию характеристик в виде Stats."""
+        return Stats(
+            max_hp=self.max_hp,
+            current_hp=self.current_hp,
+            attack_power=self.attack_power,
+            defense=self.defense,
+            speed=self.speed,
+            modifiers=self.modifiers,
+        )
+
+    @property
+    def max_hp(self) -> int:
+        return int(self._store.max_hp[self._slot])
+
+    @max_hp.setter
+    def max_hp(self, value: int) -> None:
+        self._store.max_hp[self._slot] = value
+
+    @property
+    def current_hp(self) -> int:
+        return int(self._store.hp[self._slot])
+
+    @current_hp.setter
+    def current_hp(self, value: int) -> None:
+        self._store.hp[self._slot] = value
+
+    @property
+    def attack_power(self) -> int:
+        return int(self._store.attack[self._slot])
+
+    @attack_power.setter
+    def attack_power(self, value: int) -> None:
+        self._store.attack[self._slot] = value
+
+    @property
+    def defense(self) -> int:
+        return int(self._store.defense[self._slot])
+
+    @defense.setter
+    def defense(self, value: int) -> None:
+        self._store.defense[self._slot] = value
+
+    @property
+    def speed(self) -> int:
+        return int(self._store.speed[self._slot])
+
+    @speed.setter
+    def speed(self, value: int) -> None:
+        self._store.speed[self._slot] = value
+
+    @property
+    def modifiers(self) -> Dict[str, int]:
+        """Возвращает копию ненулевых модификаторов."""
+        row = self._store.modifiers[self._slot]
+        return {name: int(row[index]) for name, index in MODIFIER_INDEX.items() if row[index]}
+
+    def get_effective_stat(self, stat_name: str) -> int:
+        """Возвращает значение характеристики с учетом модификаторов."""
+        base_value = getattr(self, stat_name, 0)
+        index = MODIFIER_INDEX.get(stat_name)
+        if index is None:
+            return base_value
+        return base_value + int(self._store.modifiers[self._slot, index])
+
+    def take_damage(self, amount: int) -> None:
+        """Наносит урон, уменьшая текущее здоровье."""
+        self.current_hp = max(0, self.current_hp - amount)
+
+    def heal(self, amount: int) -> None:
+        """Восстанавливает здоровье."""
+        self.current_hp = min(self.max_hp, self.current_hp + amount)
+
+    def is_alive(self) -> bool:
+        """Проверяет, жива ли сущность."""
+        return bool(self._store.hp[self._slot] > 0)
+
+    def add_modifier(self, stat_name: str, value: int) -> None:
+        """Добавляет модификатор к характеристике."""
+        self._store.modifiers[self._slot, MODIFIER_INDEX[stat_name]] += value
+
+    def remove_modifier(self, stat_name: str, value: int) -> None:
+        """Удаляет модификатор характеристики."""
+        index = MODIFIER_INDEX[stat_name]
+        row = self._store.modifiers[self._slot]
+        row[index] = max(0, row[index] - value)
@@ -1,17 +1,66 @@
 #!/usr/bin/env python3
+import argparse
+import os
 import traceback
-import tcod
-from rogue_n_roll.engine.game_engine import GameEngine
+from rogue_n_roll.engine.profiler import Profiler
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Rogue'n'Roll")
+    parser.add_argument("--seed", type=int, default=None, help="сид генерации мира")
+    parser.add_argument("--record", default=None, help="файл для записи партии")
+    parser.add_argument("--save", default=None, help="файл сохранения: продолжить игру и автосохраняться")
+    parser.add_argument("--trace", default=None, help="файл для трассы профилировщика (формат Chrome trace)")
+    parser.add_argument("--max-fps", type=float, default=None, help="ограничение частоты кадров")
+    parser.add_argument(
+        "--terminal", action="store_true", help="играть в текущем терминале (ANSI) вместо окна, например по SSH"
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true", help="вывести, на что ушло время до первого кадра"
+    )
+    args = parser.parse_args()
+
+    profiler = Profiler(enabled=args.startup_profile)
+    # Тяжелые модули (tcod, NumPy) загружаются только после разбора аргументов
+    with profiler.span("startup.imports"):
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.save import AutoSaver, load_game, save_game
+
+    engine = None
     try:
-        engine = GameEngine()
+        with profiler.span("startup.engine"):
+            if args.save and os.path.exists(args.save):
+                engine = load_game(args.save)
+            else:
+                # Мир генерируется в фоне, пока открывается окно
+                engine = GameEngine(seed=args.seed, generate_world=False)
+        engine.profiler = profiler
+        engine.startup_profile = args.startup_profile
+        engine.max_fps = args.max_fps
+        if args.terminal:
+            from rogue_n_roll.ui.terminal import TerminalRenderer
+
+            engine.terminal = TerminalRenderer()
+        if args.save:
+            engine.autosaver = AutoSaver(engine, args.save)
+        if args.trace:
+            engine.enable_trace(args.trace)
         engine.game_loop()
     except Exception as e:
         traceback.print_exc()
         input("\nНажмите Enter для выхода...")
+    finally:
+        if engine is not None and args.record:
+            engine.action_log.save(args.record)
+        if engine is not None and engine.autosaver is not None:
+            engine.autosaver.close()
+            # Игрока нет, если окно закрыли до окончания генерации мира
+            if engine.player is not None and engine.player.is_alive():
+                save_game(engine, args.save)
+            elif engine.player is not None and os.path.exists(args.save):
+                # Смерть окончательна: сохранение удаляется
+                os.remove(args.save)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+import random
+import numpy as np
+from rogue_n_roll.map.map_generator import MapGenerator
+
+# Размещение предмета: координаты и id типа в реестре контента
+item_placement_dt = np.dtype([("x", np.int32), ("y", np.int32), ("kind", np.uint8)])
+
+
+@dataclass(frozen=True)
+class GenerationJob:
+    """Параметры генерации одного подземелья."""
+
+    seed: int
+    map_width: int = 80
+    map_height: int = 43
+    room_min_size: int = 6
+    room_max_size: int = 10
+    max_rooms: int = 30
+
+
+@dataclass
+class GeneratedLevel:
+    """Результат генерации в виде массивов, удобных для передачи между процессами."""
+
+    job: GenerationJob
+    tiles: np.ndarray  # (height, width) tile_dt
+    rooms: np.ndarray  # (n, 4) int32: x1, y1, x2, y2
+    items: np.ndarray  # (m,) item_placement_dt
+
+
+def generate_level(job: GenerationJob) -> GeneratedLevel:
+    """Генерирует одно подземелье. Результат зависит только от параметров задания."""
+    generator = MapGenerator(
+        job.map_width,
+        job.map_height,
+        room_min_size=job.room_min_size,
+        room_max_size=job.room_max_size,
+        max_rooms=job.max_rooms,
+        rng=random.Random(job.seed),
+    )
+    game_map, rooms = generator.generate_map()
+
+    room_array = np.array(
+        [(room.x1, room.y1, room.x2, room.y2) for room in rooms], dtype=np.int32
+    ).reshape(-1, 4)
+    item_array = np.array(
+        [(item.x, item.y, item.type_id) for item in game_map.items],
+        dtype=item_placement_dt,
+    )
+    return GeneratedLevel(job=job, tiles=game_map.tiles, rooms=room_array, items=item_array)
+
+
+def generate_batch(
+    jobs: Iterable[GenerationJob],
+    max_workers: Optional[int] = None,
+    chunksize: int = 8,
+) -> List[GeneratedLevel]:
+    """Генерирует подземелья параллельно в пуле процессов.
+
+    Порядок результатов совпадает с порядком заданий, а каждый результат
+    побитово совпадает с последовательным вызовом generate_level.
+    При max_workers=1 пул не создается.
+    """
+    jobs = list(jobs)
+    if max_workers == 1 or len(jobs) <= 1:
+        return [generate_level(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(generate_level, jobs, chunksize=chunksize))
+
+
+def stack_tiles(levels: Sequence[GeneratedLevel]) -> np.ndarray:
+    """Собирает тайлы подземелий одного размера в массив (n, height, width)."""
+    return np.stack([level.tiles for level in levels])
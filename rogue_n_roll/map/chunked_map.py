@@ -0,0 +1,416 @@
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple, Union, TYPE_CHECKING
+import os
+import random
+import tempfile
+import weakref
+import numpy as np
+from rogue_n_roll.map import tile_types
+from rogue_n_roll.game_objects.entity_store import default_store
+from rogue_n_roll.map.game_map import GameMap
+from rogue_n_roll.map.map_generator import MapGenerator, RectangularRoom
+
+if TYPE_CHECKING:
+    import tcod.console
+
+CHUNK_SIZE = 64
+
+Index = Union[int, slice]
+
+
+def chunk_dtype(chunk_size: int) -> np.dtype:
+    """Тип записи чанка в файле подкачки."""
+    return np.dtype(
+        [
+            ("tiles", tile_types.tile_dt, (chunk_size, chunk_size)),
+            ("explored", bool, (chunk_size, chunk_size)),
+        ]
+    )
+
+
+class ChunkGenerator(MapGenerator):
+    """Генератор чанков большой карты.
+
+    Каждый чанк генерируется как отдельное маленькое подземелье с собственным
+    сидом, зависящим только от сида мира и координат чанка. Первая комната
+    соединяется туннелями с серединами всех сторон чанка, поэтому соседние
+    чанки всегда связаны между собой.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        chunk_size: int = CHUNK_SIZE,
+        room_min_size: int = 6,
+        room_max_size: int = 10,
+        max_rooms: int = 8,
+    ):
+        super().__init__(chunk_size, chunk_size, room_min_size, room_max_size, max_rooms)
+        self.seed = seed
+
+    def generate_chunk(self, cx: int, cy: int) -> np.ndarray:
+        """Генерирует тайлы чанка (cx, cy)."""
+        self.rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        game_map, rooms = self.generate_map()
+
+        hub_x, hub_y = rooms[0].center if rooms else (self.map_width // 2, self.map_height // 2)
+        mid_x, mid_y = self.map_width // 2, self.map_height // 2
+        for edge_x, edge_y in (
+            (mid_x, 0),
+            (mid_x, self.map_height - 1),
+            (0, mid_y),
+            (self.map_width - 1, mid_y),
+        ):
+            self._create_horizontal_tunnel(game_map, hub_x, edge_x, hub_y)
+            self._create_vertical_tunnel(game_map, hub_y, edge_y, edge_x)
+        return game_map.tiles
+
+    def _place_items(self, room: RectangularRoom) -> None:
+        """Чанки содержат только тайлы."""
+
+
+class _Chunk:
+    """Загруженный в память чанк."""
+
+    __slots__ = ("record", "dirty")
+
+    def __init__(self, record: np.ndarray, dirty: bool):
+        self.record = record  # Скалярная запись chunk_dtype
+        self.dirty = dirty
+
+
+class ChunkedLayer:
+    """Слой чанковой карты с индексацией как у массива (height, width).
+
+    Поддерживаются индексы [y, x] из целых чисел и срезов без шага, а также
+    выбор поля структурного типа: tiles["walkable"][y, x].
+    """
+
+    def __init__(self, game_map: "ChunkedGameMap", layer: str, field: Optional[str] = None):
+        self._map = game_map
+        self._layer = layer
+        self._field = field
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._map.height, self._map.width
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return ChunkedLayer(self._map, self._layer, key)
+        (y0, y1, y_scalar), (x0, x1, x_scalar) = self._normalize(key)
+        if y_scalar and x_scalar:
+            cx, lx = divmod(x0, self._map.chunk_size)
+            cy, ly = divmod(y0, self._map.chunk_size)
+            return self._view(self._map._chunk(cx, cy))[ly, lx]
+
+        dtype = self._map._chunk_dt[self._layer].base
+        if self._field:
+            dtype = dtype[self._field]
+        result = np.empty((y1 - y0, x1 - x0), dtype=dtype)
+        for chunk, dst, src in self._map._blocks(x0, y0, x1, y1):
+            result[dst] = self._view(chunk)[src]
+        if x_scalar:
+            result = result[:, 0]
+        if y_scalar:
+            result = result[0]
+        return result
+
+    def __setitem__(self, key, value) -> None:
+        (y0, y1, _), (x0, x1, _) = self._normalize(key)
+        value = np.asarray(value)
+        full = np.broadcast_to(value, (y1 - y0, x1 - x0)) if value.ndim < 2 else value.reshape(y1 - y0, x1 - x0)
+        for chunk, dst, src in self._map._blocks(x0, y0, x1, y1):
+            self._view(chunk)[src] = full[dst]
+            chunk.dirty = True
+        if self._layer == "tiles":
+            self._map.mark_tiles_changed()
+
+    def _view(self, chunk: _Chunk) -> np.ndarray:
+        data = chunk.record[self._layer]
+        return data[self._field] if self._field else data
+
+    def _normalize(self, key) -> Tuple[Tuple[int, int, bool], Tuple[int, int, bool]]:
+        if key is Ellipsis:
+            key = (slice(None), slice(None))
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise IndexError("Чанковый слой индексируется парой [y, x]")
+        return self._axis(key[0], self._map.height), self._axis(key[1], self._map.width)
+
+    @staticmethod
+    def _axis(index: Index, size: int) -> Tuple[int, int, bool]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            if step != 1:
+                raise IndexError("Срезы с шагом не поддерживаются")
+            return start, max(start, stop), False
+        index = int(index)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Индекс вне карты")
+        return index, index + 1, True
+
+
+class WindowLayer:
+    """Маска, отличная от False только в окне вокруг последнего расчета FOV."""
+
+    def __init__(self, height: int, width: int):
+        self.shape = (height, width)
+        self.origin = (0, 0)  # (x, y) левого верхнего угла окна
+        self.window = np.zeros((0, 0), dtype=bool)
+
+    def __getitem__(self, key):
+        y_index, x_index = key
+        ox, oy = self.origin
+        if isinstance(y_index, np.ndarray) or isinstance(x_index, np.ndarray):
+            # Выборка по массивам координат, как visible[ys, xs] у GameMap
+            ys, xs = np.broadcast_arrays(np.asarray(y_index) - oy, np.asarray(x_index) - ox)
+            inside = (ys >= 0) & (ys < self.window.shape[0]) & (xs >= 0) & (xs < self.window.shape[1])
+            result = np.zeros(ys.shape, dtype=bool)
+            result[inside] = self.window[ys[inside], xs[inside]]
+            return result
+        if isinstance(y_index, slice) or isinstance(x_index, slice):
+            ys = range(*(y_index if isinstance(y_index, slice) else slice(y_index, y_index + 1)).indices(self.shape[0]))
+            xs = range(*(x_index if isinstance(x_index, slice) else slice(x_index, x_index + 1)).indices(self.shape[1]))
+            result = np.zeros((len(ys), len(xs)), dtype=bool)
+            if len(ys) and len(xs):
+                wy0, wy1 = max(ys.start, oy), min(ys.stop, oy + self.window.shape[0])
+                wx0, wx1 = max(xs.start, ox), min(xs.stop, ox + self.window.shape[1])
+                if wy0 < wy1 and wx0 < wx1:
+                    result[wy0 - ys.start : wy1 - ys.start, wx0 - xs.start : wx1 - xs.start] = self.window[
+                        wy0 - oy : wy1 - oy, wx0 - ox : wx1 - ox
+                    ]
+            if not isinstance(x_index, slice):
+                result = result[:, 0]
+            if not isinstance(y_index, slice):
+                result = result[0]
+            return result
+        wy, wx = y_index - oy, x_index - ox
+        if 0 <= wy < self.window.shape[0] and 0 <= wx < self.window.shape[1]:
+            return bool(self.window[wy, wx])
+        return False
+
+
+def _remove_storage(path: str) -> None:
+    """Удаляет временный файл подкачки, если он еще существует."""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class ChunkedGameMap(GameMap):
+    """Карта огромного размера, генерируемая и хранимая чанками.
+
+    Чанки создаются ChunkGenerator при первом обращении. В памяти держится
+    не более max_resident_chunks чанков; давно не использованные вытесняются
+    в файл np.memmap и загружаются обратно при следующем обращении.
+    Интерфейс совпадает с GameMap: tiles, explored и visible индексируются
+    как массивы [y, x], а проверки проходимости и занятости работают так же.
+
+    Слоты файла подкачки действительны только в пределах сессии, поэтому
+    существующий storage_path перезаписывается лишь при overwrite=True.
+    Временный файл (storage_path=None) удаляется в close(), при выходе из
+    блока with или при сборке карты сборщиком мусора.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        seed: int,
+        chunk_size: int = CHUNK_SIZE,
+        max_resident_chunks: int = 64,
+        storage_path: Optional[str] = None,
+        generator: Optional[ChunkGenerator] = None,
+        overwrite: bool = False,
+    ):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.max_resident_chunks = max_resident_chunks
+        self.generator = generator or ChunkGenerator(seed, chunk_size)
+        self.tiles_version = 0
+
+        self._chunk_dt = chunk_dtype(chunk_size)
+        self._resident: "OrderedDict[Tuple[int, int], _Chunk]" = OrderedDict()
+        self._slots: Dict[Tuple[int, int], int] = {}
+        if storage_path is None:
+            fd, storage_path = tempfile.mkstemp(prefix="rogue_n_roll_chunks_", suffix=".bin")
+            os.close(fd)
+            self._cleanup = weakref.finalize(self, _remove_storage, storage_path)
+        else:
+            # "xb" отказывается открывать существующий файл: FileExistsError
+            open(storage_path, "wb" if overwrite else "xb").close()
+            self._cleanup = None
+        self.storage_path = storage_path
+        self._storage: Optional[np.memmap] = None
+        self._capacity = 0
+
+        self.chunks_generated = 0
+        self.chunks_evicted = 0
+        self.chunks_loaded = 0
+
+        self._tiles_layer = ChunkedLayer(self, "tiles")
+        self.explored = ChunkedLayer(self, "explored")
+        self.visible = WindowLayer(height, width)
+        # Разреженный индекс занятости вместо плотного blocker_grid
+        self._blocker_cells: Dict[Tuple[int, int], int] = {}
+        self._init_objects()
+
+    @property
+    def tiles(self) -> ChunkedLayer:
+        """Слой тайлов карты."""
+        return self._tiles_layer
+
+    @tiles.setter
+    def tiles(self, value) -> None:
+        raise AttributeError("Тайлы чанковой карты изменяются только по индексам")
+
+    @property
+    def resident_chunks(self) -> int:
+        return len(self._resident)
+
+    def close(self) -> None:
+        """Закрывает файл подкачки и удаляет его, если он временный."""
+        self._storage = None
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self) -> "ChunkedGameMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _chunk(self, cx: int, cy: int) -> _Chunk:
+        """Возвращает чанк, загружая или генерируя его при необходимости."""
+        key = (cx, cy)
+        chunk = self._resident.get(key)
+        if chunk is not None:
+            self._resident.move_to_end(key)
+            return chunk
+
+        slot = self._slots.get(key)
+        if slot is not None:
+            chunk = _Chunk(np.array(self._storage[slot]), dirty=False)
+            self.chunks_loaded += 1
+        else:
+            record = np.zeros((), dtype=self._chunk_dt)
+            record["tiles"] = self.generator.generate_chunk(cx, cy)
+            chunk = _Chunk(record, dirty=True)
+            self.chunks_generated += 1
+
+        self._resident[key] = chunk
+        while len(self._resident) > self.max_resident_chunks:
+            self._evict(*self._resident.popitem(last=False))
+        return chunk
+
+    def _evict(self, key: Tuple[int, int], chunk: _Chunk) -> None:
+        """Выгружает чанк в файл подкачки, если он изменялся."""
+        self.chunks_evicted += 1
+        if not chunk.dirty:
+            return
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            self._ensure_capacity(slot + 1)
+            self._slots[key] = slot
+        self._storage[slot] = chunk.record
+
+    def _ensure_capacity(self, slots: int) -> None:
+        """Увеличивает файл подкачки вдвое, когда в нем заканчиваются слоты."""
+        if slots <= self._capacity:
+            return
+        capacity = max(slots, self._capacity * 2, 16)
+        if self._storage is not None:
+            self._storage.flush()
+        self._storage = None
+        with open(self.storage_path, "r+b") as file:
+            file.truncate(capacity * self._chunk_dt.itemsize)
+        self._storage = np.memmap(self.storage_path, dtype=self._chunk_dt, mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def _blocks(
+        self, x0: int, y0: int, x1: int, y1: int
+    ) -> Iterator[Tuple[_Chunk, Tuple[slice, slice], Tuple[slice, slice]]]:
+        """Разбивает прямоугольник на части чанков.
+
+        Выдает чанк, срезы в прямоугольнике и срезы внутри чанка.
+        """
+        size = self.chunk_size
+        for cy in range(y0 // size, (y1 - 1) // size + 1 if y1 > y0 else y0 // size):
+            sy0 = max(y0, cy * size)
+            sy1 = min(y1, (cy + 1) * size)
+            for cx in range(x0 // size, (x1 - 1) // size + 1 if x1 > x0 else x0 // size):
+                sx0 = max(x0, cx * size)
+                sx1 = min(x1, (cx + 1) * size)
+                yield (
+                    self._chunk(cx, cy),
+                    (slice(sy0 - y0, sy1 - y0), slice(sx0 - x0, sx1 - x0)),
+                    (slice(sy0 - cy * size, sy1 - cy * size), slice(sx0 - cx * size, sx1 - cx * size)),
+                )
+
+    def _blocker_at(self, x: int, y: int) -> int:
+        return self._blocker_cells.get((x, y), -1)
+
+    def _set_blocker(self, x: int, y: int, blocker_id: int) -> None:
+        if blocker_id < 0:
+            self._blocker_cells.pop((x, y), None)
+        else:
+            self._blocker_cells[(x, y)] = blocker_id
+
+    def blocked_mask(self, region: Optional[Tuple[slice, slice]] = None) -> np.ndarray:
+        """Возвращает маску занятых клеток в области region (пара срезов по y, по x)."""
+        if region is None:
+            raise ValueError("Для чанковой карты нужно указать область")
+        mask = ~self.tiles["walkable"][region]
+        y0, _, _ = region[0].indices(self.height)
+        x0, _, _ = region[1].indices(self.width)
+        for (x, y) in self._blocker_cells:
+            local_y, local_x = y - y0, x - x0
+            if 0 <= local_y < mask.shape[0] and 0 <= local_x < mask.shape[1]:
+                mask[local_y, local_x] = True
+        return mask
+
+    def update_fov(self, player_x: int, player_y: int, radius: int) -> None:
+        """Вычисляет поле зрения в окне вокруг игрока."""
+        key = (player_x, player_y, radius, self.tiles_version)
+        if key == self._fov_key:
+            self.fov_cache_hits += 1
+            return
+        self._fov_key = key
+        self.fov_cache_misses += 1
+
+        x0, y0 = max(0, player_x - radius), max(0, player_y - radius)
+        x1, y1 = min(self.width, player_x + radius + 1), min(self.height, player_y + radius + 1)
+        region = (slice(y0, y1), slice(x0, x1))
+        import tcod.map
+        from tcod import libtcodpy
+
+        visible = tcod.map.compute_fov(
+            transparency=self.tiles["transparent"][region],
+            pov=(player_y - y0, player_x - x0),
+            radius=radius,
+            light_walls=True,
+            algorithm=libtcodpy.FOV_SYMMETRIC_SHADOWCAST,
+        )
+        self.visible.origin = (x0, y0)
+        self.visible.window = visible
+        self.explored[region] = self.explored[region] | visible
+
+    def render_entities(self, console: "tcod.console.Console", origin: Tuple[int, int] = (0, 0)) -> None:
+        """Рисует видимые сущности в тех же координатах консоли, что и render(console, origin)."""
+        default_store().draw(console, self.entity_slots(), self.visible, origin)
+
+    def render(self, console: "tcod.console.Console", origin: Tuple[int, int] = (0, 0)) -> None:
+        """Отрисовывает часть карты размером с консоль, начиная с origin (x, y)."""
+        ox, oy = origin
+        width = max(0, min(self.width - ox, console.width))
+        height = max(0, min(self.height - oy, console.height))
+        region = (slice(oy, oy + height), slice(ox, ox + width))
+        tiles = self.tiles[region]
+        console.rgb[0:width, 0:height] = np.select(
+            condlist=[self.visible[region], self.explored[region]],
+            choicelist=[tiles["light"], tiles["dark"]],
+            default=tile_types.SHROUD,
+        ).T
@@ -1,22 +1,84 @@
-from typing import List, Optional, Set, Tuple, TYPE_CHECKING
+from collections import OrderedDict
+import itertools
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
 import numpy as np
-import tcod
-from tcod import libtcodpy
+from rogue_n_roll.map import tile_types
+from rogue_n_roll.game_objects.entity_store import default_store
 
 if TYPE_CHECKING:
+    import tcod.console
     from ..game_objects.entity import Entity
     from ..game_objects.item import Item
 
+# Сторона ячейки пространственного индекса сущностей (в клетках карты)
+SPATIAL_BUCKET = 8
+
+EntityFilter = Callable[["Entity"], bool]
+
+
+def _bucket_of(x: int, y: int) -> Tuple[int, int]:
+    """Ячейка пространственного индекса, содержащая клетку (x, y)."""
+    return x // SPATIAL_BUCKET, y // SPATIAL_BUCKET
+
 
 class GameMap:
+    # Количество запоминаемых результатов FOV для движения туда-обратно
+    fov_cache_size = 16
+
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.tiles = np.full((height, width), fill_value=False, dtype=bool)  # True означает проходимый тайл
+        # Версия тайлов: производные данные (прозрачность, FOV) пересчитываются при ее смене
+        self.tiles_version = 0
+        self._tiles = np.full((height, width), fill_value=tile_types.wall, dtype=tile_types.tile_dt)
         self.explored = np.full((height, width), fill_value=False, dtype=bool)
         self.visible = np.full((height, width), fill_value=False, dtype=bool)
-        self.entities: List[Entity] = []
-        self.items: List[Item] = []
+        # Индекс занятости: id блокирующей сущности в клетке или -1
+        self.blocker_grid = np.full((height, width), fill_value=-1, dtype=np.int32)
+        self._init_objects()
+
+    def _init_objects(self) -> None:
+        """Создает контейнеры объектов карты и производные данные."""
+        # Упорядоченные множества: O(1) на добавление, проверку и удаление
+        self.entities: Dict["Entity", None] = {}
+        # Отсортированные слоты EntityStore сущностей карты; None - пересобрать
+        self._entity_slots: Optional[np.ndarray] = None
+        self.items: Dict["Item", None] = {}
+
+        # Блокирующие сущности по слоту в EntityStore
+        self._blockers: Dict[int, "Entity"] = {}
+        # Предметы, сгруппированные по клеткам
+        self._item_buckets: Dict[Tuple[int, int], List["Item"]] = {}
+        # Пространственный индекс: сущности по ячейкам SPATIAL_BUCKET x SPATIAL_BUCKET,
+        # ячейка каждой сущности и порядок добавления для равных расстояний
+        self._entity_buckets: Dict[Tuple[int, int], Dict["Entity", None]] = {}
+        self._entity_bucket: Dict["Entity", Tuple[int, int]] = {}
+        self._entity_order: Dict["Entity", int] = {}
+        self._entity_counter = itertools.count()
+
+        # Кэш поля зрения
+        self._transparency: Optional[np.ndarray] = None
+        self._fov_key: Optional[Tuple[int, int, int, int]] = None
+        self._fov_cache: "OrderedDict[Tuple[int, int, int], np.ndarray]" = OrderedDict()
+        self.fov_cache_hits = 0
+        self.fov_cache_misses = 0
+
+    @property
+    def tiles(self) -> np.ndarray:
+        """Массив тайлов карты."""
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, value: np.ndarray) -> None:
+        self._tiles = value
+        self.mark_tiles_changed()
+
+    def mark_tiles_changed(self) -> None:
+        """Сообщает об изменении тайлов на месте и сбрасывает производные данные."""
+        self.tiles_version += 1
+        self._transparency = None
+        self._fov_key = None
+        self._fov_cache.clear()
 
     def in_bounds(self, x: int, y: int) -> bool:
         """Проверяет, находятся ли координаты в пределах карты."""
@@ -26,56 +88,295 @@ class GameMap:
         """Проверяет, можно ли пройти через указанную клетку."""
         if not self.in_bounds(x, y):
             return False
-        if not self.tiles[y, x]:  # Обратите внимание на порядок индексов [y, x]
+        if not self.tiles["walkable"][y, x]:  # Обратите внимание на порядок индексов [y, x]
             return False
-        return not any(entity.is_blocking and entity.x == x and entity.y == y for entity in self.entities)
+        return self._blocker_at(x, y) < 0
 
     def get_blocking_entity_at(self, x: int, y: int) -> Optional["Entity"]:
         """Возвращает блокирующую сущность в указанной позиции."""
-        for entity in self.entities:
-            if entity.is_blocking and entity.x == x and entity.y == y:
-                return entity
-        return None
+        if not self.in_bounds(x, y):
+            return None
+        blocker_id = self._blocker_at(x, y)
+        if blocker_id < 0:
+            return None
+        return self._blockers[blocker_id]
 
     def get_items_at(self, x: int, y: int) -> List["Item"]:
         """Возвращает список предметов в указанной позиции."""
-        return [item for item in self.items if item.x == x and item.y == y]
+        return list(self._item_buckets.get((x, y), ()))
+
+    def blocked_mask(self, region: Optional[Tuple[slice, slice]] = None) -> np.ndarray:
+        """Возвращает маску клеток, занятых стенами или блокирующими сущностями.
+
+        region - пара срезов (по y, по x); по умолчанию вся карта.
+        """
+        if region is None:
+            region = (slice(None), slice(None))
+        return ~self.tiles["walkable"][region] | (self.blocker_grid[region] >= 0)
 
     def update_fov(self, player_x: int, player_y: int, radius: int) -> None:
-        """Обновляет поле зрения."""
-        # Создаем карту прозрачности: True для проходимых клеток, False для стен
-        transparency = np.array(self.tiles, dtype=bool)
-        
-        # Вычисляем поле зрения
-        self.visible = tcod.map.compute_fov(
-            transparency=transparency,
-            pov=(player_y, player_x),
-            radius=radius,
-            light_walls=True,
-            algorithm=libtcodpy.FOV_SYMMETRIC_SHADOWCAST,
-        )
-        
+        """Обновляет поле зрения.
+
+        Пересчет выполняется только при смене позиции, радиуса или версии
+        тайлов; недавние результаты берутся из LRU-кэша.
+        """
+        key = (player_x, player_y, radius, self.tiles_version)
+        if key == self._fov_key:
+            self.fov_cache_hits += 1
+            return
+        self._fov_key = key
+
+        cache_key = (player_x, player_y, radius)
+        cached = self._fov_cache.get(cache_key)
+        if cached is not None:
+            self._fov_cache.move_to_end(cache_key)
+            self.fov_cache_hits += 1
+            self.visible = cached.copy()
+        else:
+            self.fov_cache_misses += 1
+            if self._transparency is None:
+                self._transparency = np.ascontiguousarray(self.tiles["transparent"])
+            # tcod импортируется при первом расчете, а не при загрузке модуля:
+            # генерация карт в рабочих процессах обходится без него
+            import tcod.map
+            from tcod import libtcodpy
+
+            # Вычисляем поле зрения
+            visible = tcod.map.compute_fov(
+                transparency=self._transparency,
+                pov=(player_y, player_x),
+                radius=radius,
+                light_walls=True,
+                algorithm=libtcodpy.FOV_SYMMETRIC_SHADOWCAST,
+            )
+            self._fov_cache[cache_key] = visible
+            if len(self._fov_cache) > self.fov_cache_size:
+                self._fov_cache.popitem(last=False)
+            self.visible = visible.copy()
+
         # Обновляем исследованные клетки
         self.explored |= self.visible
 
+    def render(self, console: "tcod.console.Console") -> None:
+        """Отрисовывает карту на консоли одной векторной операцией.
+
+        Видимые клетки рисуются светлой графикой, исследованные - темной,
+        остальные закрываются SHROUD. Рисуется только часть карты, помещающаяся
+        в консоль, поэтому стоимость не зависит от размера карты.
+        Консоль должна иметь порядок "F".
+        """
+        width = min(self.width, console.width)
+        height = min(self.height, console.height)
+        console.rgb[0:width, 0:height] = np.select(
+            condlist=[self.visible[:height, :width], self.explored[:height, :width]],
+            choicelist=[self.tiles["light"][:height, :width], self.tiles["dark"][:height, :width]],
+            default=tile_types.SHROUD,
+        ).T
+
+    def render_entities(self, console: "tcod.console.Console") -> None:
+        """Рисует видимые сущности карты одной записью в консоль."""
+        default_store().draw(console, self.entity_slots(), self.visible)
+
+    def entity_slots(self) -> np.ndarray:
+        """Возвращает слоты EntityStore сущностей карты по возрастанию.
+
+        Массив строится по индексу карты и кэшируется до добавления или
+        удаления сущности, поэтому не зависит от размера общего хранилища.
+        """
+        if self._entity_slots is None:
+            self._entity_slots = np.array(sorted(entity.slot for entity in self.entities), dtype=np.intp)
+            self._entity_slots.flags.writeable = False
+        return self._entity_slots
+
     def add_entity(self, entity: "Entity") -> None:
         """Добавляет сущность на карту."""
-        self.entities.append(entity)
+        if entity not in self.entities:
+            self._entity_order[entity] = next(self._entity_counter)
+            self._entity_slots = None
+        self.entities[entity] = None
+        self._index_entity(entity)
         entity.game_map = self
+        if entity.is_blocking:
+            self._blockers[entity.slot] = entity
+            self._occupy(entity, entity.slot)
 
     def remove_entity(self, entity: "Entity") -> None:
         """Удаляет сущность с карты."""
         if entity in self.entities:
-            self.entities.remove(entity)
+            del self.entities[entity]
+            del self._entity_order[entity]
+            self._unindex_entity(entity)
             entity.game_map = None
+            self._entity_slots = None
+            if self._blockers.get(entity.slot) is entity:
+                del self._blockers[entity.slot]
+                self._vacate(entity, entity.slot)
+
+    def move_entity(self, entity: "Entity", dx: int, dy: int) -> bool:
+        """Перемещает сущность по карте, поддерживая индекс занятости.
+
+        Возвращает False, если клетка назначения непроходима.
+        """
+        if not self.is_walkable(entity.x + dx, entity.y + dy):
+            return False
+        blocking = self._blockers.get(entity.slot) is entity
+        if blocking:
+            self._vacate(entity, entity.slot)
+        entity.x += dx
+        entity.y += dy
+        if blocking:
+            self._occupy(entity, entity.slot)
+        if _bucket_of(entity.x, entity.y) != self._entity_bucket[entity]:
+            self._index_entity(entity)
+        return True
+
+    def nearest(
+        self, x: int, y: int, predicate: Optional[EntityFilter] = None, max_radius: Optional[int] = None
+    ) -> Optional["Entity"]:
+        """Возвращает ближайшую к (x, y) сущность, подходящую под predicate.
+
+        Расстояние евклидово; max_radius ограничивает его сверху. Из равноудаленных
+        выбирается добавленная на карту раньше. Ячейки индекса просматриваются
+        кольцами от (x, y), и поиск останавливается, как только следующее
+        кольцо не может содержать сущность ближе найденной.
+        """
+        cx, cy = _bucket_of(x, y)
+        last_x, last_y = _bucket_of(self.width - 1, self.height - 1)
+        max_ring = max(cx, cy, last_x - cx, last_y - cy)
+        limit = max_radius * max_radius if max_radius is not None else None
+        best: Optional[Tuple[int, int]] = None
+        best_entity: Optional["Entity"] = None
+        ring = 0
+        while ring <= max_ring:
+            # Ближайшая клетка кольца ring не ближе (ring - 1) * SPATIAL_BUCKET + 1
+            bound = max(0, (ring - 1) * SPATIAL_BUCKET + 1)
+            if best is not None and best[0] < bound * bound:
+                break
+            if max_radius is not None and bound > max_radius:
+                break
+            if 8 * ring > len(self._entity_buckets):
+                # Кольцо больше числа занятых ячеек: дешевле досмотреть их все сразу
+                keys: Iterable[Tuple[int, int]] = [
+                    key for key in self._entity_buckets if max(abs(key[0] - cx), abs(key[1] - cy)) >= ring
+                ]
+                ring = max_ring
+            else:
+                keys = self._ring(cx, cy, ring)
+            for key in keys:
+                for entity in self._entity_buckets.get(key, ()):
+                    distance = (entity.x - x) ** 2 + (entity.y - y) ** 2
+                    if limit is not None and distance > limit:
+                        continue
+                    rank = (distance, self._entity_order[entity])
+                    if (best is None or rank < best) and (predicate is None or predicate(entity)):
+                        best, best_entity = rank, entity
+            ring += 1
+        return best_entity
+
+    def within_radius(
+        self, x: int, y: int, radius: int, predicate: Optional[EntityFilter] = None
+    ) -> List["Entity"]:
+        """Возвращает сущности на евклидовом расстоянии не больше radius, от ближних к дальним."""
+        limit = radius * radius
+        found = []
+        for entity in self._entities_near(x, y, radius):
+            distance = (entity.x - x) ** 2 + (entity.y - y) ** 2
+            if distance <= limit and (predicate is None or predicate(entity)):
+                found.append((distance, self._entity_order[entity], entity))
+        found.sort(key=lambda entry: entry[:2])
+        return [entity for _, _, entity in found]
+
+    def within_fov(self, predicate: Optional[EntityFilter] = None) -> List["Entity"]:
+        """Возвращает сущности в текущем поле зрения, от ближних к его центру к дальним.
+
+        Просматриваются только ячейки индекса в радиусе последнего расчета FOV;
+        до первого update_fov список пуст.
+        """
+        if self._fov_key is None:
+            return []
+        px, py, radius = self._fov_key[:3]
+        # Радиус 0 в tcod означает неограниченную дальность
+        entities = self._entities_near(px, py, radius) if radius > 0 else self.entities
+        found = []
+        for entity in entities:
+            if self.visible[entity.y, entity.x] and (predicate is None or predicate(entity)):
+                distance = (entity.x - px) ** 2 + (entity.y - py) ** 2
+                found.append((distance, self._entity_order[entity], entity))
+        found.sort(key=lambda entry: entry[:2])
+        return [entity for _, _, entity in found]
+
+    def _entities_near(self, x: int, y: int, radius: int) -> Iterable["Entity"]:
+        """Перебирает сущности ячеек индекса, пересекающих квадрат со стороной 2 * radius + 1."""
+        x0, y0 = _bucket_of(max(0, x - radius), max(0, y - radius))
+        x1, y1 = _bucket_of(min(self.width - 1, x + radius), min(self.height - 1, y + radius))
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._entity_buckets):
+            keys: Iterable[Tuple[int, int]] = [
+                key for key in self._entity_buckets if x0 <= key[0] <= x1 and y0 <= key[1] <= y1
+            ]
+        else:
+            keys = ((bx, by) for by in range(y0, y1 + 1) for bx in range(x0, x1 + 1))
+        for key in keys:
+            yield from self._entity_buckets.get(key, ())
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Перебирает ячейки на расстоянии ring (по Чебышеву) от ячейки (cx, cy)."""
+        if ring == 0:
+            yield cx, cy
+            return
+        for bx in range(cx - ring, cx + ring + 1):
+            yield bx, cy - ring
+            yield bx, cy + ring
+        for by in range(cy - ring + 1, cy + ring):
+            yield cx - ring, by
+            yield cx + ring, by
+
+    def _index_entity(self, entity: "Entity") -> None:
+        """Помещает сущность в ячейку индекса по ее текущим координатам."""
+        self._unindex_entity(entity)
+        key = _bucket_of(entity.x, entity.y)
+        self._entity_buckets.setdefault(key, {})[entity] = None
+        self._entity_bucket[entity] = key
+
+    def _unindex_entity(self, entity: "Entity") -> None:
+        """Убирает сущность из ее ячейки индекса."""
+        key = self._entity_bucket.pop(entity, None)
+        if key is not None:
+            bucket = self._entity_buckets[key]
+            del bucket[entity]
+            if not bucket:
+                del self._entity_buckets[key]
+
+    def _blocker_at(self, x: int, y: int) -> int:
+        """Возвращает id блокирующей сущности в клетке или -1."""
+        return int(self.blocker_grid[y, x])
+
+    def _set_blocker(self, x: int, y: int, blocker_id: int) -> None:
+        """Записывает id блокирующей сущности в клетку (-1 освобождает ее)."""
+        self.blocker_grid[y, x] = blocker_id
+
+    def _occupy(self, entity: "Entity", blocker_id: int) -> None:
+        """Отмечает клетку сущности как занятую."""
+        if self.in_bounds(entity.x, entity.y):
+            self._set_blocker(entity.x, entity.y, blocker_id)
+
+    def _vacate(self, entity: "Entity", blocker_id: int) -> None:
+        """Освобождает клетку сущности, если она не занята другой сущностью."""
+        if self.in_bounds(entity.x, entity.y) and self._blocker_at(entity.x, entity.y) == blocker_id:
+            self._set_blocker(entity.x, entity.y, -1)
 
     def add_item(self, item: "Item") -> None:
         """Добавляет предмет на карту."""
-        self.items.append(item)
+        self.items[item] = None
         item.game_map = self
+        self._item_buckets.setdefault((item.x, item.y), []).append(item)
 
     def remove_item(self, item: "Item") -> None:
         """Удаляет предмет с карты."""
         if item in self.items:
-            self.items.remove(item)
-            item.game_map = None 
\ No newline at end of file
+            del self.items[item]
+            item.game_map = None
+            bucket = self._item_buckets[(item.x, item.y)]
+            bucket.remove(item)
+            if not bucket:
+                del self._item_buckets[(item.x, item.y)]
@@ -1,9 +1,12 @@
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
 import random
-import tcod
+import time
 import numpy as np
 from .game_map import GameMap
-from rogue_n_roll.game_objects.items import HealthPotion, Sword, Shield, ScrollOfLightning
+from . import tile_types
+from rogue_n_roll.game_objects.content import choose_type, content
+from rogue_n_roll.game_objects.items import create_item
 
 
 class RectangularRoom:
@@ -34,6 +37,19 @@ class RectangularRoom:
         )
 
 
+@dataclass
+class PlacementStats:
+    """Статистика размещения комнат за последний вызов generate_map."""
+
+    rooms: int = 0
+    attempts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rooms_per_second(self) -> float:
+        return self.rooms / self.seconds if self.seconds > 0 else 0.0
+
+
 class MapGenerator:
     def __init__(
         self,
@@ -42,55 +58,52 @@ class MapGenerator:
         room_min_size: int = 6,
         room_max_size: int = 10,
         max_rooms: int = 30,
+        rng: Optional[random.Random] = None,
     ):
         self.map_width = map_width
         self.map_height = map_height
         self.room_min_size = room_min_size
         self.room_max_size = room_max_size
         self.max_rooms = max_rooms
+        # Все случайные решения генератора берутся из этого источника
+        self.rng = rng or random.Random()
+        # Последняя сгенерированная карта
         self.game_map = GameMap(map_width, map_height)
+        self.placement_stats = PlacementStats()
 
     def _create_room(self, game_map: GameMap, room: RectangularRoom) -> None:
         """Создает проходимую комнату."""
-        game_map.tiles[room.inner] = True
+        game_map.tiles[room.inner] = tile_types.floor
 
     def _create_horizontal_tunnel(
         self, game_map: GameMap, x1: int, x2: int, y: int
     ) -> None:
         """Создает горизонтальный туннель."""
         x1, x2 = min(x1, x2), max(x1, x2)
-        game_map.tiles[y, x1 : x2 + 1] = True
+        game_map.tiles[y, x1 : x2 + 1] = tile_types.floor
 
     def _create_vertical_tunnel(
         self, game_map: GameMap, y1: int, y2: int, x: int
     ) -> None:
         """Создает вертикальный туннель."""
         y1, y2 = min(y1, y2), max(y1, y2)
-        game_map.tiles[y1 : y2 + 1, x] = True
+        game_map.tiles[y1 : y2 + 1, x] = tile_types.floor
 
     def generate_map(self) -> Tuple[GameMap, List[RectangularRoom]]:
         """Генерирует новую карту подземелья."""
+        self.game_map = GameMap(self.map_width, self.map_height)
+        self.placement_stats = PlacementStats()
         rooms: List[RectangularRoom] = []
+        start = time.perf_counter()
 
-        for _ in range(self.max_rooms):
-            room_width = random.randint(self.room_min_size, self.room_max_size)
-            room_height = random.randint(self.room_min_size, self.room_max_size)
-
-            x = random.randint(0, self.map_width - room_width - 1)
-            y = random.randint(0, self.map_height - room_height - 1)
-
-            new_room = RectangularRoom(x, y, room_width, room_height)
-
-            if any(new_room.intersects(other_room) for other_room in rooms):
-                continue
-
+        for new_room in self._place_rooms(rooms):
             self._create_room(self.game_map, new_room)
 
             if rooms:
-                prev_x, prev_y = rooms[-1].center
+                prev_x, prev_y = self._connection_target(rooms, new_room).center
                 new_x, new_y = new_room.center
 
-                if random.random() < 0.5:
+                if self.rng.random() < 0.5:
                     self._create_horizontal_tunnel(self.game_map, prev_x, new_x, prev_y)
                     self._create_vertical_tunnel(self.game_map, prev_y, new_y, new_x)
                 else:
@@ -102,24 +115,182 @@ class MapGenerator:
 
             rooms.append(new_room)
 
+        self.placement_stats.rooms = len(rooms)
+        self.placement_stats.seconds = time.perf_counter() - start
+        self.game_map.mark_tiles_changed()
         return self.game_map, rooms
 
+    def _connection_target(
+        self, rooms: List[RectangularRoom], new_room: RectangularRoom
+    ) -> RectangularRoom:
+        """Выбирает комнату, с которой соединяется новая комната туннелем."""
+        return rooms[-1]
+
+    def _random_room_size(self) -> Tuple[int, int]:
+        """Выбирает случайный размер комнаты."""
+        room_width = self.rng.randint(self.room_min_size, self.room_max_size)
+        room_height = self.rng.randint(self.room_min_size, self.room_max_size)
+        return room_width, room_height
+
+    def _place_rooms(self, rooms: List[RectangularRoom]) -> Iterator[RectangularRoom]:
+        """Выдает комнаты, не пересекающиеся с уже принятыми в rooms.
+
+        Каждая кандидатура проверяется против всех принятых комнат.
+        """
+        for _ in range(self.max_rooms):
+            self.placement_stats.attempts += 1
+            room_width, room_height = self._random_room_size()
+
+            x = self.rng.randint(0, self.map_width - room_width - 1)
+            y = self.rng.randint(0, self.map_height - room_height - 1)
+
+            new_room = RectangularRoom(x, y, room_width, room_height)
+
+            if any(new_room.intersects(other_room) for other_room in rooms):
+                continue
+
+            yield new_room
+
     def _place_items(self, room: RectangularRoom) -> None:
         """Размещает предметы в комнате."""
         # Шанс появления предметов
-        if random.random() < 0.7:  # 70% шанс появления предмета в комнате
+        if self.rng.random() < 0.7:  # 70% шанс появления предмета в комнате
             # Выбираем случайную позицию в комнате
-            x = random.randint(room.x1 + 1, room.x2 - 1)
-            y = random.randint(room.y1 + 1, room.y2 - 1)
-
-            # Выбираем случайный предмет
-            item_class = random.choice([
-                HealthPotion,
-                Sword,
-                Shield,
-                ScrollOfLightning
-            ])
-
-            # Создаем и добавляем предмет
-            item = item_class(x, y)
-            self.game_map.add_item(item) 
\ No newline at end of file
+            x = self.rng.randint(room.x1 + 1, room.x2 - 1)
+            y = self.rng.randint(room.y1 + 1, room.y2 - 1)
+
+            # Выбираем тип предмета по весам из файлов данных
+            item_type = choose_type(self.rng, content().items)
+            self.game_map.add_item(create_item(item_type.type_id, x, y))
+
+
+class DenseMapGenerator(MapGenerator):
+    """Генератор для очень больших карт с размещением комнат по маске занятости.
+
+    Занятость комнат хранится в массиве NumPy, по которому строится таблица
+    сумм (summed-area table). Она позволяет за O(1) проверить прямоугольник
+    и одной векторной операцией найти все свободные позиции для комнаты
+    заданного размера. Комнаты размещаются раундами: за раунд выбирается до
+    batch_size позиций, таблица пересчитывается один раз после раунда.
+    Генерация останавливается, когда комнаты покрывают долю карты
+    room_density, принято max_rooms комнат или свободных позиций не осталось.
+    """
+
+    def __init__(
+        self,
+        map_width: int,
+        map_height: int,
+        room_min_size: int = 6,
+        room_max_size: int = 10,
+        max_rooms: int = 30,
+        rng: Optional[random.Random] = None,
+        room_density: float = 0.5,
+        batch_size: int = 64,
+        max_failed_rounds: int = 8,
+    ):
+        super().__init__(map_width, map_height, room_min_size, room_max_size, max_rooms, rng)
+        self.room_density = room_density
+        self.batch_size = batch_size
+        self.max_failed_rounds = max_failed_rounds
+
+    @staticmethod
+    def _summed_area(occupancy: np.ndarray) -> np.ndarray:
+        """Строит таблицу сумм с нулевой первой строкой и столбцом."""
+        table = np.zeros((occupancy.shape[0] + 1, occupancy.shape[1] + 1), dtype=np.int32)
+        np.cumsum(occupancy, axis=0, dtype=np.int32, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    def _free_positions(self, table: np.ndarray, room_width: int, room_height: int) -> np.ndarray:
+        """Возвращает маску левых верхних углов, где комната не задевает занятые клетки.
+
+        Комната занимает клетки [x1, x2] x [y1, y2] включительно, как в
+        RectangularRoom.intersects.
+        """
+        span_x = room_width + 1
+        span_y = room_height + 1
+        rows = self.map_height - span_y + 1
+        cols = self.map_width - span_x + 1
+        if rows <= 0 or cols <= 0:
+            return np.zeros((0, 0), dtype=bool)
+        window = (
+            table[span_y : span_y + rows, span_x : span_x + cols]
+            - table[0:rows, span_x : span_x + cols]
+            - table[span_y : span_y + rows, 0:cols]
+            + table[0:rows, 0:cols]
+        )
+        return window == 0
+
+    def _connection_target(
+        self, rooms: List[RectangularRoom], new_room: RectangularRoom
+    ) -> RectangularRoom:
+        """Соединяет новую комнату с ближайшей из принятых.
+
+        На большой карте соседние по порядку комнаты разбросаны по всей
+        площади, поэтому поиск идет по корзинам центров комнат.
+        """
+        cx, cy = new_room.center
+        bx, by = cx // self._bucket_size, cy // self._bucket_size
+        best: Optional[RectangularRoom] = None
+        best_distance = 0
+        ring = 0
+        max_ring = max(self.map_width, self.map_height) // self._bucket_size + 1
+        while ring <= max_ring:
+            for x in range(bx - ring, bx + ring + 1):
+                for y in range(by - ring, by + ring + 1):
+                    if max(abs(x - bx), abs(y - by)) != ring:
+                        continue
+                    for rx, ry, room in self._buckets.get((x, y), ()):
+                        if room is new_room:
+                            continue
+                        distance = (rx - cx) ** 2 + (ry - cy) ** 2
+                        if best is None or distance < best_distance:
+                            best, best_distance = room, distance
+            # Комнаты в следующих кольцах не ближе ring * bucket_size клеток
+            if best is not None and best_distance <= (ring * self._bucket_size) ** 2:
+                break
+            ring += 1
+        return best if best is not None else rooms[-1]
+
+    def _index_room(self, room: RectangularRoom) -> None:
+        """Добавляет центр комнаты в корзины для поиска ближайшей."""
+        cx, cy = room.center
+        self._buckets.setdefault((cx // self._bucket_size, cy // self._bucket_size), []).append((cx, cy, room))
+
+    def _place_rooms(self, rooms: List[RectangularRoom]) -> Iterator[RectangularRoom]:
+        self._bucket_size = self.room_max_size * 4
+        self._buckets = {}
+        occupancy = np.zeros((self.map_height, self.map_width), dtype=np.uint8)
+        target_area = self.room_density * self.map_width * self.map_height
+        covered_area = 0
+        failed_rounds = 0
+
+        while len(rooms) < self.max_rooms and covered_area < target_area:
+            table = self._summed_area(occupancy)
+            room_width, room_height = self._random_room_size()
+            free = self._free_positions(table, room_width, room_height)
+            candidates = np.flatnonzero(free)
+            if candidates.size == 0:
+                failed_rounds += 1
+                if failed_rounds >= self.max_failed_rounds:
+                    return
+                continue
+            failed_rounds = 0
+
+            # Комнаты, принятые в этом раунде, еще не учтены в таблице сумм
+            accepted: List[RectangularRoom] = []
+            picks = self.rng.sample(range(candidates.size), min(self.batch_size, candidates.size))
+            for pick in picks:
+                if len(rooms) >= self.max_rooms or covered_area >= target_area:
+                    return
+                self.placement_stats.attempts += 1
+                y, x = divmod(int(candidates[pick]), free.shape[1])
+                new_room = RectangularRoom(x, y, room_width, room_height)
+                if any(new_room.intersects(other_room) for other_room in accepted):
+                    continue
+
+                occupancy[new_room.y1 : new_room.y2 + 1, new_room.x1 : new_room.x2 + 1] = 1
+                covered_area += (room_width + 1) * (room_height + 1)
+                accepted.append(new_room)
+                self._index_room(new_room)
+                yield new_room
@@ -0,0 +1,69 @@
+from typing import Tuple
+import numpy as np
+from rogue_n_roll.engine.colors import (
+    FLOOR_COLOR,
+    FLOOR_COLOR_DARK,
+    WALL_COLOR,
+    WALL_COLOR_DARK,
+    WHITE,
+)
+
+# Графика тайла, совместимая с console.rgb
+graphic_dt = np.dtype(
+    [
+        ("ch", np.int32),  # Код символа
+        ("fg", "3B"),  # Цвет символа
+        ("bg", "3B"),  # Цвет фона
+    ]
+)
+
+# Структура тайла, хранящаяся в GameMap.tiles
+tile_dt = np.dtype(
+    [
+        ("walkable", bool),  # True, если через тайл можно пройти
+        ("transparent", bool),  # True, если тайл не блокирует поле зрения
+        ("dark", graphic_dt),  # Графика для исследованного, но невидимого тайла
+        ("light", graphic_dt),  # Графика для видимого тайла
+    ]
+)
+
+Graphic = Tuple[int, Tuple[int, int, int], Tuple[int, int, int]]
+
+BLACK = (0, 0, 0)
+
+
+def new_tile(*, walkable: bool, transparent: bool, dark: Graphic, light: Graphic) -> np.ndarray:
+    """Создает тайл с заданными свойствами."""
+    return np.array((walkable, transparent, dark, light), dtype=tile_dt)
+
+
+# Графика для неисследованных клеток
+SHROUD = np.array((ord(" "), (255, 255, 255), BLACK), dtype=graphic_dt)
+
+floor = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord("."), FLOOR_COLOR_DARK, BLACK),
+    light=(ord("."), FLOOR_COLOR, BLACK),
+)
+
+wall = new_tile(
+    walkable=False,
+    transparent=False,
+    dark=(ord("#"), WALL_COLOR_DARK, BLACK),
+    light=(ord("#"), WALL_COLOR, BLACK),
+)
+
+down_stairs = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord(">"), FLOOR_COLOR_DARK, BLACK),
+    light=(ord(">"), WHITE, BLACK),
+)
+
+up_stairs = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord("<"), FLOOR_COLOR_DARK, BLACK),
+    light=(ord("<"), WHITE, BLACK),
+)
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+import tcod.event
+from rogue_n_roll.engine.game_engine import GameEngine
+from rogue_n_roll.ui.ansi import ESCAPE_TIMEOUT, SCREEN_END, AnsiEncoder, KeyDecoder
+
+# Telnet: сервер сам отвечает за эхо (WILL ECHO) и работает без go-ahead
+# (WILL SUPPRESS-GO-AHEAD), что переводит клиент в посимвольный режим
+TELNET_CHARACTER_MODE = bytes((255, 251, 1, 255, 251, 3))
+
+# Размер одного чтения из сокета
+READ_SIZE = 1024
+
+
+class Session:
+    """Игровая сессия одного подключения: безоконный движок и кодировщики терминала.
+
+    Сессия не зависит от сети: handle() принимает байты ввода, а frame()
+    возвращает байты вывода, поэтому ее можно проверять без сокетов.
+    """
+
+    def __init__(self, session_id: int, engine: GameEngine):
+        self.session_id = session_id
+        self.engine = engine
+        self.encoder = AnsiEncoder()
+        self.decoder = KeyDecoder()
+        self.bytes_received = 0
+        self.finished = False
+
+    def pending_floors(self) -> List[Future]:
+        """Возвращает незавершенные генерации соседних этажей.
+
+        Следующая команда может перевести игрока на этаж выше или ниже; пока
+        их генерация идет, обработка ввода заблокировала бы Dungeon.get.
+        """
+        depth = self.engine.depth
+        return self.engine.dungeon.prepare(d for d in (depth - 1, depth + 1) if d >= 0)
+
+    def handle(self, data: bytes) -> bool:
+        """Применяет ввод клиента. Возвращает True, если сессия закончилась."""
+        self.bytes_received += len(data)
+        return self._apply(self.decoder.feed(data))
+
+    def handle_timeout(self) -> bool:
+        """Вызывается, если после ESC ввода не было ESCAPE_TIMEOUT: ESC считается клавишей."""
+        return self._apply(self.decoder.flush())
+
+    def _apply(self, events: List[tcod.event.Event]) -> bool:
+        if events and self.engine.handle_events(events):
+            self.finished = True
+        if not self.engine.player.is_alive():
+            self.finished = True
+        return self.finished
+
+    def frame(self) -> bytes:
+        """Возвращает изменения экрана с прошлого кадра или b"", если их нет."""
+        if not self.engine.render_if_dirty():
+            return b""
+        return self.encoder.encode(self.engine.console)
+
+    def goodbye(self) -> bytes:
+        """Возвращает завершающий вывод: курсор под кадром и сообщение об итоге."""
+        engine = self.engine
+        message = "Игра окончена" if not engine.player.is_alive() else "До встречи"
+        return f"\x1b[{engine.console.height + 1};1H{SCREEN_END}{message}\r\n".encode("utf-8")
+
+    @property
+    def bytes_sent(self) -> int:
+        return self.encoder.bytes_written
+
+    def bytes_per_turn(self) -> float:
+        """Средний объем вывода на ход без учета полных перерисовок экрана."""
+        turns = self.engine.turn
+        return (self.bytes_sent - self.encoder.full_frame_bytes) / turns if turns else 0.0
+
+    def memory_bytes(self) -> int:
+        """Оценивает память сессии по буферам NumPy: консоли, прошлый кадр и этажи с кэшем FOV."""
+        engine = self.engine
+        arrays: List[np.ndarray] = [engine.console.rgb]
+        if self.encoder.previous is not None:
+            arrays.append(self.encoder.previous)
+        for panel in (engine.hud_panel, engine.inventory_panel):
+            if panel is not None:
+                arrays.extend((panel.background.rgb, panel.console.rgb))
+        for floor in engine.dungeon.floors.values():
+            game_map = floor.game_map
+            arrays.extend(value for value in vars(game_map).values() if isinstance(value, np.ndarray))
+            arrays.extend(game_map._fov_cache.values())
+        return sum(array.nbytes for array in arrays)
+
+
+@dataclass
+class ServerStats:
+    """Сводка по активным сессиям сервера."""
+
+    sessions: int
+    total_sessions: int
+    turns: int
+    bytes_sent: int
+    bytes_per_turn: float  # Среднее по сессиям, сделавшим хотя бы один ход
+    memory_per_session: float  # Оценка по буферам NumPy
+
+    def format(self) -> str:
+        return (
+            f"сессий {self.sessions} (всего {self.total_sessions}), ходов {self.turns}, "
+            f"отправлено {self.bytes_sent} байт, {self.bytes_per_turn:.0f} байт/ход, "
+            f"~{self.memory_per_session / 1024:.0f} КБ на сессию"
+        )
+
+
+class GameServer:
+    """Многопользовательский сервер: отдельная игра на каждое TCP-подключение.
+
+    Подключиться можно через telnet или netcat (во втором случае терминал
+    нужно перевести в посимвольный режим: stty raw -echo). Все сессии живут
+    в одном потоке цикла asyncio; простаивающая сессия - это только ожидание
+    чтения из сокета, а после каждой пачки ввода клиенту уходят лишь
+    изменившиеся клетки экрана. Фоновая генерация этажей всех сессий идет
+    в одном общем исполнителе с потоком на ядро, а сессия дожидается
+    соседних этажей асинхронно, не останавливая цикл.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 4000,
+        max_sessions: int = 1000,
+        seed: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        # Сессия n получает сид seed + n; без сида миры случайные
+        self.seed = seed
+        self.sessions: Dict[int, Session] = {}
+        self.total_sessions = 0
+        self._ids = itertools.count()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def create_session(self) -> Session:
+        """Создает сессию с новым миром."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="dungeon")
+        session_id = next(self._ids)
+        seed = self.seed + session_id if self.seed is not None else None
+        engine = GameEngine(headless=True, seed=seed, dungeon_executor=self._executor)
+        session = Session(session_id, engine)
+        self.sessions[session_id] = session
+        self.total_sessions += 1
+        return session
+
+    def close_session(self, session: Session) -> None:
+        self.sessions.pop(session.session_id, None)
+        session.engine.dungeon.shutdown()
+
+    async def start(self) -> None:
+        """Начинает принимать подключения. Фактический порт - в self.port."""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Прекращает прием подключений и останавливает исполнитель генерации."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self.sessions) >= self.max_sessions:
+            writer.write("Сервер заполнен, попробуйте позже\r\n".encode("utf-8"))
+            await self._close_writer(writer)
+            return
+
+        session = self.create_session()
+        try:
+            writer.write(TELNET_CHARACTER_MODE + session.frame())
+            await writer.drain()
+            while not session.finished:
+                # После ESC ждем продолжения последовательности не дольше ESCAPE_TIMEOUT
+                timeout = ESCAPE_TIMEOUT if session.decoder.pending_escape else None
+                try:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), timeout)
+                except asyncio.TimeoutError:
+                    session.handle_timeout()
+                else:
+                    if not data:
+                        break  # Клиент отключился
+                    # Переход по лестнице не должен ждать генерации этажа в цикле asyncio
+                    for future in session.pending_floors():
+                        await asyncio.wrap_future(future)
+                    session.handle(data)
+                output = session.frame()
+                if session.finished:
+                    output += session.goodbye()
+                if output:
+                    writer.write(output)
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.close_session(session)
+            await self._close_writer(writer)
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter) -> None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    def stats(self) -> ServerStats:
+        """Собирает статистику по активным сессиям."""
+        sessions = list(self.sessions.values())
+        playing = [session for session in sessions if session.engine.turn]
+        return ServerStats(
+            sessions=len(sessions),
+            total_sessions=self.total_sessions,
+            turns=sum(session.engine.turn for session in sessions),
+            bytes_sent=sum(session.bytes_sent for session in sessions),
+            bytes_per_turn=(
+                sum(session.bytes_per_turn() for session in playing) / len(playing) if playing else 0.0
+            ),
+            memory_per_session=(
+                sum(session.memory_bytes() for session in sessions) / len(sessions) if sessions else 0.0
+            ),
+        )
+
+
+async def _report(server: GameServer, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        print(server.stats().format(), flush=True)
+
+
+async def _serve(server: GameServer, report_interval: float) -> None:
+    await server.start()
+    print(f"Сервер Rogue'n'Roll: telnet {server.host} {server.port}", flush=True)
+    reporter = asyncio.create_task(_report(server, report_interval)) if report_interval > 0 else None
+    try:
+        await server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Сервер Rogue'n'Roll для игры через telnet/netcat")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес для подключений")
+    parser.add_argument("--port", type=int, default=4000, help="порт (0 - любой свободный)")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="предел одновременных сессий")
+    parser.add_argument("--seed", type=int, default=None, help="сид первой сессии (дальше по порядку)")
+    parser.add_argument(
+        "--report-interval", type=float, default=10.0, help="период вывода статистики в секундах (0 - не выводить)"
+    )
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.host, args.port, args.max_sessions, args.seed)
+    try:
+        asyncio.run(_serve(server, args.report_interval))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
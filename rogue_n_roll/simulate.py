@@ -0,0 +1,278 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from rogue_n_roll.engine.actions import MOVE_DELTAS, Action
+from rogue_n_roll.engine.ai import distance_field
+from rogue_n_roll.engine.explore import next_explore_step
+from rogue_n_roll.engine.game_engine import GameEngine
+from rogue_n_roll.game_objects.content import content
+from rogue_n_roll.game_objects.entity import Entity
+from rogue_n_roll.game_objects.items import HealthPotion, ScrollOfLightning, Shield, Sword
+
+# Шаг (dx, dy) -> действие перемещения
+STEP_ACTIONS = {delta: action for action, delta in MOVE_DELTAS.items()}
+
+
+
+@dataclass
+class GameRecord:
+    """Итог одной партии."""
+
+    seed: int
+    outcome: str  # "win", "death" или "timeout"
+    turns: int
+    depth: int
+    killed_by: Optional[str] = None
+    damage_taken: Dict[str, int] = field(default_factory=dict)  # По типам монстров
+    kills: Dict[str, int] = field(default_factory=dict)
+    items_picked: Dict[str, int] = field(default_factory=dict)
+    items_used: Dict[str, int] = field(default_factory=dict)
+
+
+class ScriptedPolicy:
+    """Простая стратегия игрока для симуляций.
+
+    По порядку: лечится при низком здоровье, надевает снаряжение, бьет
+    видимых монстров (свитком, если он есть и враг в пределах досягаемости),
+    подбирает предметы, исследует этаж и спускается по лестнице.
+    """
+
+    def __init__(self, heal_threshold: float = 0.4):
+        self.heal_threshold = heal_threshold
+
+    def choose(self, engine: GameEngine) -> Tuple[Action, Optional[object]]:
+        """Возвращает действие и используемый предмет (если есть)."""
+        player = engine.player
+        inventory = player.inventory.items
+        stats = player.stats
+
+        def find(item_type):
+            for index, item in enumerate(inventory):
+                if isinstance(item, item_type):
+                    engine.selected_item_index = index
+                    return item
+            return None
+
+        if stats.current_hp < stats.max_hp * self.heal_threshold:
+            potion = find(HealthPotion)
+            if potion is not None:
+                return Action.USE_SELECTED, potion
+        for item_type in (Sword, Shield):
+            item = find(item_type)
+            if item is not None:
+                return Action.USE_SELECTED, item
+
+        hostiles = engine.visible_hostiles()
+        if hostiles:
+            entities = {entity.slot: entity for entity in engine.game_map.entities}
+            target = min((entities[slot] for slot in hostiles), key=player.distance_to)
+            lightning_range = content().item(ScrollOfLightning.KEY).range
+            if 1 < player.distance_to(target) <= lightning_range:
+                scroll = find(ScrollOfLightning)
+                if scroll is not None:
+                    return Action.USE_SELECTED, scroll
+            action = self._step_towards(engine, target.x, target.y)
+            if action is not None:
+                return action, None
+
+        if engine.game_map.get_items_at(player.x, player.y) and len(inventory) < player.inventory.capacity:
+            return Action.PICK_UP, None
+
+        step = next_explore_step(engine.game_map, player.x, player.y)
+        if step is not None:
+            return STEP_ACTIONS[step], None
+
+        stairs = engine.dungeon.floors[engine.depth].down_stairs
+        if (player.x, player.y) == stairs:
+            return Action.DESCEND, None
+        action = self._step_towards(engine, *stairs)
+        return (action, None) if action is not None else (Action.NONE, None)
+
+    @staticmethod
+    def _step_towards(engine: GameEngine, x: int, y: int) -> Optional[Action]:
+        """Шаг по карте расстояний к клетке (x, y)."""
+        game_map, player = engine.game_map, engine.player
+        distance, x0, y0 = distance_field(game_map, x, y, max(game_map.width, game_map.height))
+        px, py = player.x - x0, player.y - y0
+        current = distance[py, px]
+        best = None
+        for (dx, dy), action in STEP_ACTIONS.items():
+            nx, ny = px + dx, py + dy
+            if 0 <= nx < distance.shape[1] and 0 <= ny < distance.shape[0] and distance[ny, nx] < current:
+                current = distance[ny, nx]
+                best = action
+        return best
+
+
+def play_game(
+    seed: int, max_turns: int = 2000, target_depth: int = 3, policy: Optional[ScriptedPolicy] = None
+) -> GameRecord:
+    """Играет одну партию в безоконном режиме и возвращает ее итог."""
+    policy = policy or ScriptedPolicy()
+    engine = GameEngine(headless=True, seed=seed)
+    record = GameRecord(seed=seed, outcome="timeout", turns=0, depth=0)
+    damage_taken: Counter = Counter()
+    kills: Counter = Counter()
+    picked: Counter = Counter()
+    used: Counter = Counter()
+    last_attacker: List[Optional[str]] = [None]
+
+    def on_attack(attacker: Entity, target: Entity, damage: int) -> None:
+        if target is engine.player:
+            damage_taken[attacker.name] += damage
+            last_attacker[0] = attacker.name
+        elif not target.is_alive():
+            kills[target.name] += 1
+
+    engine.on_attack = on_attack
+    engine.game_map.update_fov(engine.player.x, engine.player.y, radius=8)
+    try:
+        while engine.turn < max_turns:
+            action, item = policy.choose(engine)
+            if action == Action.NONE:
+                break  # Идти больше некуда
+            inventory_size = len(engine.player.inventory.items)
+            engine.advance(action)
+            if item is not None and item not in engine.player.inventory.items:
+                used[item.name] += 1
+            elif action == Action.PICK_UP and len(engine.player.inventory.items) > inventory_size:
+                picked[engine.player.inventory.items[-1].name] += 1
+            if not engine.player.is_alive():
+                record.outcome = "death"
+                record.killed_by = last_attacker[0]
+                break
+            if engine.depth >= target_depth:
+                record.outcome = "win"
+                break
+    finally:
+        engine.dungeon.shutdown()
+
+    record.turns = engine.turn
+    record.depth = engine.depth
+    record.damage_taken = dict(damage_taken)
+    record.kills = dict(kills)
+    record.items_picked = dict(picked)
+    record.items_used = dict(used)
+    return record
+
+
+def _play_many(args: Tuple[List[int], int, int]) -> List[GameRecord]:
+    seeds, max_turns, target_depth = args
+    return [play_game(seed, max_turns, target_depth) for seed in seeds]
+
+
+def run_games(
+    seeds: Iterable[int],
+    max_turns: int = 2000,
+    target_depth: int = 3,
+    max_workers: Optional[int] = None,
+    chunksize: int = 16,
+) -> List[GameRecord]:
+    """Играет партии с заданными сидами в пуле процессов.
+
+    Сиды делятся на пачки по chunksize, чтобы передача результатов между
+    процессами не доминировала над самими партиями. При max_workers=1 пул
+    не создается. Порядок результатов совпадает с порядком сидов.
+    """
+    seeds = list(seeds)
+    chunks = [(seeds[i : i + chunksize], max_turns, target_depth) for i in range(0, len(seeds), chunksize)]
+    if max_workers == 1 or len(chunks) <= 1:
+        results = map(_play_many, chunks)
+        return [record for chunk in results for record in chunk]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [record for chunk in executor.map(_play_many, chunks) for record in chunk]
+
+
+def aggregate(records: List[GameRecord]) -> dict:
+    """Сводит итоги партий в отчет."""
+    games = len(records)
+    outcomes = Counter(record.outcome for record in records)
+    turns = np.array([record.turns for record in records], dtype=np.float64)
+    p10, p50, p90 = np.percentile(turns, (10, 50, 90)) if games else (0.0, 0.0, 0.0)
+
+    def total(name: str) -> Dict[str, int]:
+        counter: Counter = Counter()
+        for record in records:
+            counter.update(getattr(record, name))
+        return dict(counter.most_common())
+
+    return {
+        "games": games,
+        "win_rate": outcomes["win"] / games if games else 0.0,
+        "outcomes": dict(outcomes),
+        "turns": {"mean": float(turns.mean()) if games else 0.0, "p10": p10, "p50": p50, "p90": p90},
+        "depth": dict(sorted(Counter(record.depth for record in records).items())),
+        "damage_taken": total("damage_taken"),
+        "damage_taken_per_game": {name: value / games for name, value in total("damage_taken").items()},
+        "killed_by": dict(Counter(r.killed_by for r in records if r.killed_by is not None).most_common()),
+        "kills": total("kills"),
+        "items_picked": total("items_picked"),
+        "items_used": total("items_used"),
+    }
+
+
+def format_report(report: dict) -> str:
+    """Форматирует отчет для вывода в терминал."""
+    turns = report["turns"]
+    lines = [
+        f"Партий: {report['games']}   победы: {report['win_rate']:.1%}   итоги: {report['outcomes']}",
+        f"Ходов: среднее {turns['mean']:.0f}, p10 {turns['p10']:.0f}, p50 {turns['p50']:.0f}, p90 {turns['p90']:.0f}",
+        f"Достигнутая глубина: {report['depth']}",
+        "Урон по игроку (всего / за партию):",
+    ]
+    for name, value in report["damage_taken"].items():
+        lines.append(f"  {name:<12} {value:8d} / {report['damage_taken_per_game'][name]:6.2f}")
+    for title, key in (
+        ("Причины смерти", "killed_by"),
+        ("Убито монстров", "kills"),
+        ("Подобрано предметов", "items_picked"),
+        ("Использовано предметов", "items_used"),
+    ):
+        lines.append(f"{title}: " + ", ".join(f"{name} {value}" for name, value in report[key].items()))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Симуляция партий Rogue'n'Roll для балансировки")
+    parser.add_argument("--games", type=int, default=1000, help="количество партий")
+    parser.add_argument("--seed", type=int, default=0, help="сид первой партии (дальше по порядку)")
+    parser.add_argument("--max-turns", type=int, default=2000, help="предел ходов в партии")
+    parser.add_argument("--target-depth", type=int, default=3, help="сколько раз нужно спуститься для победы")
+    parser.add_argument("--workers", type=int, default=None, help="количество процессов (по умолчанию - все ядра)")
+    parser.add_argument("--chunksize", type=int, default=16, help="партий на одну задачу пула")
+    parser.add_argument("--json", default=None, help="файл для сохранения отчета в JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    records = run_games(
+        range(args.seed, args.seed + args.games),
+        max_turns=args.max_turns,
+        target_depth=args.target_depth,
+        max_workers=args.workers,
+        chunksize=args.chunksize,
+    )
+    report = aggregate(records)
+    elapsed = time.perf_counter() - start
+    print(format_report(report))
+    print(f"Время: {elapsed:.1f} с ({args.games / elapsed:.1f} партий/с, {os.cpu_count()} ядер)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(
+                {"report": report, "games": [asdict(record) for record in records]},
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
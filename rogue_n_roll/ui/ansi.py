@@ -0,0 +1,309 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import tcod.console
+import tcod.event
+
+CSI = "\x1b["
+ESC = 0x1B
+
+# Начало вывода: сброс атрибутов, очистка экрана, курсор в начало и скрытие курсора
+SCREEN_START = "\x1b[0m\x1b[2J\x1b[H\x1b[?25l"
+# Конец вывода: сброс атрибутов и показ курсора
+SCREEN_END = "\x1b[0m\x1b[?25h"
+# Переключение на альтернативный экран терминала и обратно
+ALT_SCREEN_ON = "\x1b[?1049h"
+ALT_SCREEN_OFF = "\x1b[?1049l"
+
+
+def console_frame(console: tcod.console.Console) -> np.ndarray:
+    """Возвращает клетки консоли (ch, fg, bg) в виде массива строк [y, x]."""
+    rgb = console.rgb
+    # Консоль в порядке "F" отдает клетки как [x, y]
+    if rgb.shape != (console.height, console.width):
+        return rgb.T
+    if console.width == console.height and rgb.flags.f_contiguous and not rgb.flags.c_contiguous:
+        return rgb.T
+    return rgb
+
+
+def changed_cells(previous: np.ndarray, frame: np.ndarray) -> np.ndarray:
+    """Возвращает маску клеток, отличающихся от предыдущего кадра."""
+    return (
+        (previous["ch"] != frame["ch"])
+        | (previous["fg"] != frame["fg"]).any(axis=-1)
+        | (previous["bg"] != frame["bg"]).any(axis=-1)
+    )
+
+
+# Символы, у которых виден только фон: цвет текста для них не выводится
+BLANK_CHARS = {0, 32}
+
+# Наибольший промежуток неизменных клеток в строке, который выгоднее
+# перерисовать, чем перепрыгнуть: перемещение курсора занимает 4-8 байт
+BRIDGE_GAP = 3
+
+
+def _char(code: int) -> str:
+    return chr(code) if code >= 32 else " "
+
+
+def _runs(xs: List[int], gap: int) -> List[Tuple[int, int]]:
+    """Объединяет номера клеток строки в отрезки [начало, конец], допуская промежутки до gap."""
+    runs = []
+    start = end = xs[0]
+    for x in xs[1:]:
+        if x - end - 1 > gap:
+            runs.append((start, end))
+            start = x
+        end = x
+    runs.append((start, end))
+    return runs
+
+
+class AnsiEncoder:
+    """Кодирует кадры консоли в ANSI-последовательности для терминала.
+
+    Кодировщик хранит предыдущий кадр и выводит только изменившиеся клетки.
+    Изменения в строке объединяются в отрезки: курсор перемещается один раз
+    на отрезок, а короткие промежутки неизменных клеток перерисовываются,
+    если это дешевле перемещения. Кодировщик помнит текущие цвета терминала
+    и положение курсора между кадрами, поэтому цвета (truecolor, 38;2 / 48;2)
+    выводятся только при смене, а у пустых клеток меняется только фон.
+    Первый кадр и кадр после reset() выводятся целиком с очисткой экрана.
+    """
+
+    def __init__(self, bridge_gap: int = BRIDGE_GAP):
+        self.bridge_gap = bridge_gap
+        self.previous: Optional[np.ndarray] = None
+        # Состояние терминала после последнего вывода: цвета и положение курсора
+        self._fg: Optional[List[int]] = None
+        self._bg: Optional[List[int]] = None
+        self._cursor: Optional[Tuple[int, int]] = None
+        # Статистика: кадры, выведенные клетки и байты
+        self.frames = 0
+        self.cells_written = 0
+        self.bytes_written = 0
+        # Байты полных перерисовок (первый кадр и кадры после reset)
+        self.full_frame_bytes = 0
+
+    def reset(self) -> None:
+        """Забывает предыдущий кадр и состояние терминала: следующий кадр будет выведен целиком."""
+        self.previous = None
+
+    def encode(self, console: tcod.console.Console) -> bytes:
+        """Возвращает ANSI-вывод, переводящий экран от предыдущего кадра к текущему."""
+        frame = console_frame(console)
+        parts: List[str] = []
+        full = self.previous is None or self.previous.shape != frame.shape
+        if full:
+            parts.append(SCREEN_START)
+            self._fg = self._bg = None
+            self._cursor = (0, 0)
+            changed = np.ones(frame.shape, dtype=bool)
+        else:
+            changed = changed_cells(self.previous, frame)
+
+        width = frame.shape[1]
+        cells = 0
+        for y in np.flatnonzero(changed.any(axis=1)).tolist():
+            chars = frame["ch"][y].tolist()
+            fgs = frame["fg"][y].tolist()
+            bgs = frame["bg"][y].tolist()
+            for start, end in _runs(np.flatnonzero(changed[y]).tolist(), self.bridge_gap):
+                parts.append(self._move(start, y))
+                for x in range(start, end + 1):
+                    parts.append(self._colors(chars[x], fgs[x], bgs[x]))
+                    parts.append(_char(chars[x]))
+                cells += end - start + 1
+                # После последней колонки положение курсора зависит от терминала
+                self._cursor = (end + 1, y) if end + 1 < width else None
+
+        self.previous = frame.copy()
+        data = "".join(parts).encode("utf-8")
+        self.frames += 1
+        self.cells_written += cells
+        self.bytes_written += len(data)
+        if full:
+            self.full_frame_bytes += len(data)
+        return data
+
+    def _move(self, x: int, y: int) -> str:
+        """Возвращает самое короткое перемещение курсора в клетку (x, y)."""
+        cursor = self._cursor
+        if cursor == (x, y):
+            return ""
+        if cursor is not None and cursor[1] == y and cursor[0] < x:
+            return f"{CSI}{x - cursor[0]}C" if x - cursor[0] > 1 else f"{CSI}C"
+        if x == 0:
+            return f"{CSI}{y + 1}H"
+        return f"{CSI}{y + 1};{x + 1}H"
+
+    def _colors(self, ch: int, fg: List[int], bg: List[int]) -> str:
+        """Возвращает смену цветов для клетки или пустую строку, если цвета уже нужные."""
+        codes = []
+        if fg != self._fg and ch not in BLANK_CHARS:
+            codes.append(f"38;2;{fg[0]};{fg[1]};{fg[2]}")
+            self._fg = fg
+        if bg != self._bg:
+            codes.append(f"48;2;{bg[0]};{bg[1]};{bg[2]}")
+            self._bg = bg
+        return f"{CSI}{';'.join(codes)}m" if codes else ""
+
+
+# Управляющие символы, которые являются клавишами
+_PLAIN_KEYS = {
+    "\r": tcod.event.KeySym.RETURN,
+    "\n": tcod.event.KeySym.RETURN,
+    "\t": tcod.event.KeySym.TAB,
+    " ": tcod.event.KeySym.SPACE,
+    "\x7f": tcod.event.KeySym.BACKSPACE,
+}
+# Ctrl+C в необработанном режиме терминала приходит байтом, а не сигналом
+_QUIT = 0x03
+# Функциональные клавиши в форме ESC O P..S
+_SS3_KEYS = {
+    "P": tcod.event.KeySym.F1,
+    "Q": tcod.event.KeySym.F2,
+    "R": tcod.event.KeySym.F3,
+    "S": tcod.event.KeySym.F4,
+}
+_CSI_KEYS = {
+    "A": tcod.event.KeySym.UP,
+    "B": tcod.event.KeySym.DOWN,
+    "C": tcod.event.KeySym.RIGHT,
+    "D": tcod.event.KeySym.LEFT,
+}
+# Символы, набираемые с Shift на клавиатуре US: символ -> клавиша без Shift
+_SHIFTED = {">": ".", "<": ",", "?": "/", ":": ";", '"': "'", "_": "-", "+": "="}
+
+# Сколько ждать продолжения после ESC в конце пачки ввода, секунды: по сети
+# последовательность стрелки может прийти двумя пачками
+ESCAPE_TIMEOUT = 0.1
+
+# Telnet: байт команды и команды согласования с аргументом
+_IAC = 0xFF
+_SB, _SE = 0xFA, 0xF0
+_NEGOTIATION = {0xFB, 0xFC, 0xFD, 0xFE}  # WILL, WONT, DO, DONT
+
+
+def key_event(sym: tcod.event.KeySym, shift: bool = False) -> tcod.event.KeyDown:
+    """Создает событие нажатия клавиши, как если бы оно пришло из окна."""
+    mod = tcod.event.Modifier.SHIFT if shift else tcod.event.Modifier.NONE
+    return tcod.event.KeyDown(scancode=tcod.event.Scancode.UNKNOWN, sym=sym, mod=mod)
+
+
+def _char_key(char: str) -> Optional[Tuple[tcod.event.KeySym, bool]]:
+    if char in _PLAIN_KEYS:
+        return _PLAIN_KEYS[char], False
+    shift = char.isupper() or char in _SHIFTED
+    char = _SHIFTED.get(char, char.lower())
+    if len(char) != 1 or not char.isascii() or not char.isprintable():
+        return None
+    try:
+        return tcod.event.KeySym(ord(char)), shift
+    except ValueError:
+        return None
+
+
+def _utf8_length(lead: int) -> int:
+    """Длина символа UTF-8 по первому байту."""
+    if lead < 0xC0:
+        return 1
+    if lead < 0xE0:
+        return 2
+    return 3 if lead < 0xF0 else 4
+
+
+class KeyDecoder:
+    """Разбирает байты ввода терминала в события нажатий клавиш tcod.
+
+    Понимает обычные символы, стрелки (в том числе с Shift: ESC [ 1 ; 2 A),
+    F1-F4, одиночный Escape, Enter в виде CR LF, Ctrl+C как событие выхода
+    и пропускает команды telnet. Незаконченная
+    последовательность в конце пачки откладывается до следующего вызова
+    feed(). ESC в конце пачки тоже откладывается: это может быть начало
+    стрелки, разрезанной при передаче. Если следующая пачка не продолжает
+    последовательность, ESC становится клавишей Escape; если ввода нет
+    дольше ESCAPE_TIMEOUT, вызывающий код получает клавишу через flush().
+    """
+
+    def __init__(self):
+        self._buffer = b""
+
+    def feed(self, data: bytes) -> List[tcod.event.Event]:
+        """Добавляет байты ввода и возвращает распознанные события."""
+        data = self._buffer + data
+        self._buffer = b""
+        events: List[tcod.event.Event] = []
+        i = 0
+        while i < len(data):
+            byte = data[i]
+            if byte == 0x0A and i > 0 and data[i - 1] == 0x0D:
+                i += 1  # Enter приходит как CR LF
+            elif byte == _QUIT:
+                events.append(tcod.event.Quit())
+                i += 1
+            elif byte == _IAC:
+                end = self._skip_telnet(data, i)
+                if end is None:
+                    self._buffer = data[i:]
+                    break
+                i = end
+            elif byte == ESC:
+                if i + 1 == len(data):
+                    self._buffer = data[i:]
+                    break
+                if data[i + 1] not in b"[O":
+                    events.append(key_event(tcod.event.KeySym.ESCAPE))
+                    i += 1
+                    continue
+                end = i + 2
+                while end < len(data) and not 0x40 <= data[end] <= 0x7E:
+                    end += 1
+                if end == len(data):
+                    self._buffer = data[i:]
+                    break
+                params = data[i + 2 : end].decode("ascii", "replace").split(";")
+                sym = _CSI_KEYS.get(chr(data[end]))
+                if sym is None and data[i + 1] == ord("O"):
+                    sym = _SS3_KEYS.get(chr(data[end]))
+                if sym is not None:
+                    # Модификатор xterm: 2 - Shift (1 + битовая маска)
+                    shift = len(params) > 1 and params[1].isdigit() and (int(params[1]) - 1) & 1
+                    events.append(key_event(sym, bool(shift)))
+                i = end + 1
+            else:
+                end = i + _utf8_length(byte)
+                if end > len(data):
+                    self._buffer = data[i:]
+                    break
+                key = _char_key(data[i:end].decode("utf-8", "replace"))
+                if key is not None:
+                    events.append(key_event(*key))
+                i = end
+        return events
+
+    @property
+    def pending_escape(self) -> bool:
+        """True, если последний ввод закончился одиночным ESC."""
+        return self._buffer == bytes((ESC,))
+
+    def flush(self) -> List[tcod.event.Event]:
+        """Отдает отложенный одиночный ESC как клавишу Escape (по истечении ESCAPE_TIMEOUT)."""
+        if not self.pending_escape:
+            return []
+        self._buffer = b""
+        return [key_event(tcod.event.KeySym.ESCAPE)]
+
+    @staticmethod
+    def _skip_telnet(data: bytes, i: int) -> Optional[int]:
+        """Пропускает команду telnet с позиции i. None, если она еще не пришла целиком."""
+        if i + 1 >= len(data):
+            return None
+        command = data[i + 1]
+        if command in _NEGOTIATION:
+            return i + 3 if i + 2 < len(data) else None
+        if command == _SB:
+            end = data.find(bytes((_IAC, _SE)), i + 2)
+            return end + 2 if end >= 0 else None
+        return i + 2
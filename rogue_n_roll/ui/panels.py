@@ -0,0 +1,209 @@
+from typing import Hashable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import tcod.console
+from rogue_n_roll.engine.colors import *
+
+if TYPE_CHECKING:
+    from rogue_n_roll.game_objects.item import Item
+    from rogue_n_roll.game_objects.stats import Stats
+
+Color = Tuple[int, int, int]
+TextParts = Sequence[Tuple[str, Color]]
+
+# Подсказки по управлению с цветными клавишами
+HELP_PARTS: TextParts = (
+    ("CONTROL: ", UI_TEXT),
+    ("[↑↓←→]", UI_KEYS),
+    (" MOVEMENT   ", UI_REGULAR_TEXT),
+    ("[I]", UI_KEYS),
+    (" INVENTORY   ", UI_REGULAR_TEXT),
+    ("[G]", UI_KEYS),
+    (" PICK UP   ", UI_REGULAR_TEXT),
+    ("[ESC]", UI_KEYS),
+    (" EXIT", UI_REGULAR_TEXT),
+)
+# Вторая строка подсказок, под клавишами первой
+HELP_EXTRA_PARTS: TextParts = (
+    ("[SHIFT+↑↓←→]", UI_KEYS),
+    (" RUN   ", UI_REGULAR_TEXT),
+    ("[O]", UI_KEYS),
+    (" EXPLORE   ", UI_REGULAR_TEXT),
+    ("[>/<]", UI_KEYS),
+    (" STAIRS", UI_REGULAR_TEXT),
+)
+
+# Легенда с цветными символами
+LEGEND_PARTS: TextParts = (
+    ("ENTITIES: ", UI_TEXT),
+    ("[@]", PLAYER_COLOR),
+    (" PLAYER   ", UI_REGULAR_TEXT),
+    ("[r]", RAT_COLOR),
+    (" RAT   ", UI_REGULAR_TEXT),
+    ("[O]", ORC_COLOR),
+    (" ORC   ", UI_REGULAR_TEXT),
+    ("[T]", TROLL_COLOR),
+    (" TROLL", UI_REGULAR_TEXT),
+)
+
+# Подписи характеристик HUD: (x подписи, подпись, x значения)
+HUD_FIELDS = ((2, "HEALTH:", 12), (25, "DAMAGE:", 32), (40, "DEFENSE:", 48), (55, "DEPTH:", 62))
+
+INVENTORY_TITLE = "INVENTORY"
+INVENTORY_HELP = "[↑/↓] SELECT   [ENTER] USE   [D] DROP   [ESC] CLOSE"
+# Окно инвентаря вмещает строку подсказок вместе с рамкой и отступами
+INVENTORY_WIDTH = len(INVENTORY_HELP) + 4
+INVENTORY_HEIGHT = 30
+
+
+def print_parts(console: tcod.console.Console, x: int, y: int, parts: TextParts) -> None:
+    """Печатает строку из частей разного цвета."""
+    for text, color in parts:
+        console.print(x=x, y=y, string=text, fg=color, bg=UI_BACKGROUND)
+        x += len(text)
+
+
+def health_color(current_hp: int, max_hp: int) -> Color:
+    """Цвет здоровья по доле от максимума."""
+    if current_hp > max_hp * 0.7:
+        return HEALTH_GOOD
+    if current_hp > max_hp * 0.3:
+        return HEALTH_WARNING
+    return HEALTH_CRITICAL
+
+
+def item_label(index: int) -> str:
+    """Метка предмета в списке: буквы для первых 26, дальше номера."""
+    return chr(97 + index) if index < 26 else str(index + 1)
+
+
+class Panel:
+    """Панель интерфейса во внеэкранной консоли.
+
+    Статичная часть (фон, рамка, подписи) рисуется один раз в background.
+    Динамическая часть рисуется поверх копии фона, только когда меняется
+    ключ ее значений, а в каждом кадре панель переносится на экран одним
+    blit вместо сотен вызовов print.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.background = tcod.console.Console(width, height, order="F")
+        self.console = tcod.console.Console(width, height, order="F")
+        self.draw_static(self.background)
+        self._key: Optional[Hashable] = None
+        # Количество перерисовок динамической части
+        self.redraws = 0
+
+    def draw_static(self, console: tcod.console.Console) -> None:
+        """Рисует неизменную часть панели."""
+
+    def draw_dynamic(self, console: tcod.console.Console, key: Hashable) -> None:
+        """Рисует значения панели, описанные ключом key."""
+
+    def update(self, key: Hashable) -> None:
+        """Перерисовывает динамическую часть, если ключ значений изменился."""
+        if key == self._key and self.redraws:
+            return
+        self.console.rgb[...] = self.background.rgb
+        self.draw_dynamic(self.console, key)
+        self._key = key
+        self.redraws += 1
+
+    def blit(self, dest: tcod.console.Console, x: int, y: int) -> None:
+        """Переносит панель на консоль dest в позицию (x, y)."""
+        self.console.blit(dest, x, y)
+
+
+class HudPanel(Panel):
+    """Панель характеристик игрока, подсказок и легенды под картой."""
+
+    def draw_static(self, console: tcod.console.Console) -> None:
+        console.clear(bg=UI_BACKGROUND)
+        console.print(x=0, y=0, string="═" * self.width, fg=UI_KEYS, bg=UI_BACKGROUND)
+        for label_x, label, _ in HUD_FIELDS:
+            console.print(x=label_x, y=1, string=label, fg=UI_TEXT, bg=UI_BACKGROUND)
+        print_parts(console, 2, 3, HELP_PARTS)
+        print_parts(console, 2 + len(HELP_PARTS[0][0]), 4, HELP_EXTRA_PARTS)
+        print_parts(console, 2, 5, LEGEND_PARTS)
+
+    def draw_dynamic(self, console: tcod.console.Console, key: Hashable) -> None:
+        current_hp, max_hp, attack_power, defense, depth = key
+        values = (
+            (f"{current_hp}/{max_hp}", health_color(current_hp, max_hp)),
+            (str(attack_power), UI_KEYS),
+            (str(defense), UI_KEYS),
+            (str(depth + 1), UI_KEYS),
+        )
+        for (_, _, value_x), (text, color) in zip(HUD_FIELDS, values):
+            console.print(x=value_x, y=1, string=text, fg=color, bg=UI_BACKGROUND)
+
+    def render(self, dest: tcod.console.Console, x: int, y: int, stats: "Stats", depth: int) -> None:
+        """Отрисовывает панель с текущими характеристиками."""
+        self.update((stats.current_hp, stats.max_hp, stats.attack_power, stats.defense, depth))
+        self.blit(dest, x, y)
+
+
+class InventoryPanel(Panel):
+    """Окно инвентаря с виртуализированным списком предметов.
+
+    Рисуются только строки, попадающие в окно списка, а окно прокручивается
+    вслед за выбранным предметом, поэтому стоимость кадра не зависит от
+    вместимости инвентаря.
+    """
+
+    # Первая строка списка; снизу остаются строка подсказок и рамка
+    LIST_TOP = 3
+
+    def __init__(self, width: int = INVENTORY_WIDTH, height: int = INVENTORY_HEIGHT):
+        super().__init__(width, height)
+        self.rows = height - self.LIST_TOP - 2
+        # Индекс первого видимого предмета
+        self.scroll = 0
+
+    def draw_static(self, console: tcod.console.Console) -> None:
+        width, height = self.width, self.height
+        console.clear(bg=UI_BACKGROUND)
+        console.draw_frame(0, 0, width, height, fg=UI_KEYS, bg=UI_BACKGROUND, decoration="╔═╗║ ║╚═╝")
+        console.print(
+            x=(width - len(INVENTORY_TITLE)) // 2, y=1, string=INVENTORY_TITLE, fg=UI_TEXT, bg=UI_BACKGROUND
+        )
+        console.print(
+            x=(width - len(INVENTORY_HELP)) // 2,
+            y=height - 2,
+            string=INVENTORY_HELP,
+            fg=UI_REGULAR_TEXT,
+            bg=UI_BACKGROUND,
+        )
+
+    def draw_dynamic(self, console: tcod.console.Console, key: Hashable) -> None:
+        scroll, selected, count, names = key
+        for row, name in enumerate(names):
+            index = scroll + row
+            color = UI_KEYS if index == selected else UI_REGULAR_TEXT
+            console.print(
+                x=2, y=self.LIST_TOP + row, string=f"{item_label(index)}) {name}", fg=color, bg=UI_BACKGROUND
+            )
+        # Метки прокрутки, если часть списка скрыта
+        if scroll > 0:
+            console.print(x=self.width - 3, y=self.LIST_TOP, string="↑", fg=UI_KEYS, bg=UI_BACKGROUND)
+        if scroll + self.rows < count:
+            console.print(
+                x=self.width - 3, y=self.LIST_TOP + self.rows - 1, string="↓", fg=UI_KEYS, bg=UI_BACKGROUND
+            )
+
+    def scroll_to(self, selected: int, count: int) -> None:
+        """Прокручивает список так, чтобы выбранный предмет был виден."""
+        if selected < self.scroll:
+            self.scroll = selected
+        elif selected >= self.scroll + self.rows:
+            self.scroll = selected - self.rows + 1
+        self.scroll = max(0, min(self.scroll, count - self.rows))
+
+    def render(
+        self, dest: tcod.console.Console, x: int, y: int, items: List["Item"], selected: int
+    ) -> None:
+        """Отрисовывает окно инвентаря с выбранным предметом selected."""
+        self.scroll_to(selected, len(items))
+        names = tuple(item.name for item in items[self.scroll : self.scroll + self.rows])
+        self.update((self.scroll, selected, len(items), names))
+        self.blit(dest, x, y)
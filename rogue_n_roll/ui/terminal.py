@@ -0,0 +1,83 @@
+from typing import BinaryIO, List, Optional
+import os
+import select
+import sys
+import tcod.console
+import tcod.event
+from rogue_n_roll.ui.ansi import ALT_SCREEN_OFF, ALT_SCREEN_ON, ESCAPE_TIMEOUT, SCREEN_END, AnsiEncoder, KeyDecoder
+
+# Размер одного чтения ввода
+READ_SIZE = 1024
+
+# Ctrl+L - перерисовать экран целиком (например, после изменения размера терминала)
+REDRAW_KEY = b"\x0c"
+
+
+class TerminalRenderer:
+    """Вывод игры в терминал через ANSI-последовательности вместо окна SDL.
+
+    Подходит для игры по SSH. Объект заменяет контекст tcod: present()
+    кодирует консоль через AnsiEncoder, и в терминал уходят только
+    изменившиеся клетки. Ввод читается в необработанном режиме терминала и
+    превращается в события tcod, поэтому управление совпадает с оконным.
+    Работает в POSIX-терминалах.
+    """
+
+    def __init__(self, input_fd: Optional[int] = None, output: Optional[BinaryIO] = None):
+        self.input_fd = sys.stdin.fileno() if input_fd is None else input_fd
+        self.output = output if output is not None else sys.stdout.buffer
+        self.encoder = AnsiEncoder()
+        self.decoder = KeyDecoder()
+        self._saved_mode = None
+        self._console: Optional[tcod.console.Console] = None
+
+    def open(self) -> None:
+        """Переводит терминал в необработанный режим и на альтернативный экран."""
+        if os.isatty(self.input_fd):
+            import termios
+            import tty
+
+            self._saved_mode = termios.tcgetattr(self.input_fd)
+            tty.setraw(self.input_fd)
+        self.encoder.reset()
+        self._write(ALT_SCREEN_ON.encode())
+
+    def close(self) -> None:
+        """Возвращает терминал в исходное состояние."""
+        self._write((SCREEN_END + ALT_SCREEN_OFF).encode())
+        if self._saved_mode is not None:
+            import termios
+
+            termios.tcsetattr(self.input_fd, termios.TCSADRAIN, self._saved_mode)
+            self._saved_mode = None
+
+    def present(self, console: tcod.console.Console) -> None:
+        """Выводит изменения консоли с прошлого кадра."""
+        self._console = console
+        self._write(self.encoder.encode(console))
+
+    def wait(self, timeout: Optional[float] = None) -> List[tcod.event.Event]:
+        """Ждет ввода не дольше timeout секунд (None - без ограничения) и возвращает события."""
+        ready, _, _ = select.select([self.input_fd], [], [], timeout)
+        if not ready:
+            return []
+        events: List[tcod.event.Event] = []
+        while True:
+            data = os.read(self.input_fd, READ_SIZE)
+            if not data:
+                return events + self.decoder.flush() + [tcod.event.Quit()]  # Ввод закрыт
+            if REDRAW_KEY in data and self._console is not None:
+                self.encoder.reset()
+                self.present(self._console)
+            events.extend(self.decoder.feed(data))
+            if not self.decoder.pending_escape:
+                return events
+            # ESC в конце ввода: ждем продолжения последовательности не дольше ESCAPE_TIMEOUT
+            ready, _, _ = select.select([self.input_fd], [], [], ESCAPE_TIMEOUT)
+            if not ready:
+                return events + self.decoder.flush()
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self.output.write(data)
+            self.output.flush()
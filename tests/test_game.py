@@ -5,6 +5,7 @@ from rogue_n_roll.game_objects.monster import Monster
 from rogue_n_roll.game_objects.stats import Stats
 from rogue_n_roll.map.game_map import GameMap
 from rogue_n_roll.map.map_generator import MapGenerator
+from rogue_n_roll.map import tile_types
 
 
 class TestFunctional:
@@ -13,8 +14,8 @@ class TestFunctional:
     def test_player_movement(self):
         """FT-01: Тест перемещения игрока."""
         game_map = GameMap(10, 10)
-        game_map.tiles[5, 5] = True  # Проходимая клетка
-        game_map.tiles[6, 5] = True  # Проходимая клетка для движения вниз
+        game_map.tiles[5, 5] = tile_types.floor  # Проходимая клетка
+        game_map.tiles[6, 5] = tile_types.floor  # Проходимая клетка для движения вниз
         player = Player(5, 5)
         game_map.add_entity(player)
 
@@ -26,7 +27,7 @@ class TestFunctional:
         assert (player.x, player.y) == (5, 6)
 
         # Попытка пройти сквозь стену
-        game_map.tiles[7, 5] = False  # Непроходимая клетка
+        game_map.tiles[7, 5] = tile_types.wall  # Непроходимая клетка
         assert player.move(0, 1) is False
         assert (player.x, player.y) == (5, 6)  # Позиция не изменилась
 
@@ -42,8 +43,8 @@ class TestFunctional:
         assert not np.array_equal(game_map1.tiles, game_map2.tiles)
         
         # Проверяем, что на карте есть и стены, и проходимые участки
-        assert np.any(game_map1.tiles)  # Есть проходимые клетки
-        assert not np.all(game_map1.tiles)  # Есть непроходимые клетки
+        assert np.any(game_map1.tiles["walkable"])  # Есть проходимые клетки
+        assert not np.all(game_map1.tiles["walkable"])  # Есть непроходимые клетки
 
     def test_character_stats(self):
         """FT-03: Тест характеристик персонажа."""
@@ -104,8 +105,8 @@ class TestFunctional:
         """FT-07: Тест поля зрения."""
         game_map = GameMap(10, 10)
         # Создаем коридор и делаем все стены непрозрачными
-        game_map.tiles.fill(False)  # Сначала все стены
-        game_map.tiles[5, :] = True  # Затем коридор
+        game_map.tiles[...] = tile_types.wall  # Сначала все стены
+        game_map.tiles[5, :] = tile_types.floor  # Затем коридор
         
         player = Player(5, 0)
         game_map.add_entity(player)
@@ -120,4 +121,1089 @@ class TestFunctional:
         # Проверяем, что исследованные клетки запоминаются
         assert game_map.explored[0, 5]
         game_map.visible.fill(False)
-        assert game_map.explored[0, 5]  # Клетка должна оставаться исследованной 
\ No newline at end of file
+        assert game_map.explored[0, 5]  # Клетка должна оставаться исследованной 
+
+    def test_map_render(self):
+        """FT-08: Тест векторной отрисовки карты."""
+        import tcod.console
+
+        game_map = GameMap(10, 10)
+        game_map.tiles[2, 1:4] = tile_types.floor
+        game_map.visible[2, 1] = True
+        game_map.explored[2, 1:3] = True
+
+        console = tcod.console.Console(10, 12, order="F")
+        game_map.render(console)
+
+        # Видимый пол рисуется светлой графикой, исследованный - темной
+        assert console.rgb[1, 2] == tile_types.floor["light"]
+        assert console.rgb[2, 2] == tile_types.floor["dark"]
+        # Неисследованные клетки закрыты
+        assert console.rgb[3, 2] == tile_types.SHROUD
+        assert console.rgb[0, 0] == tile_types.SHROUD
+
+    def test_occupancy_index(self):
+        """FT-09: Тест индекса занятости карты."""
+        from rogue_n_roll.game_objects.items import HealthPotion
+
+        game_map = GameMap(10, 10)
+        game_map.tiles[1, 1:5] = tile_types.floor
+        rat = Monster.create_rat(2, 1)
+        game_map.add_entity(rat)
+
+        assert game_map.get_blocking_entity_at(2, 1) is rat
+        assert not game_map.is_walkable(2, 1)
+        assert game_map.blocked_mask()[1, 2]
+
+        # Индекс следует за перемещением сущности
+        assert rat.move(1, 0)
+        assert game_map.get_blocking_entity_at(2, 1) is None
+        assert game_map.get_blocking_entity_at(3, 1) is rat
+        assert not game_map.blocked_mask()[1, 2]
+
+        game_map.remove_entity(rat)
+        assert game_map.is_walkable(3, 1)
+
+        # Предметы группируются по клеткам
+        potion = HealthPotion(1, 1)
+        game_map.add_item(potion)
+        assert game_map.get_items_at(1, 1) == [potion]
+        game_map.remove_item(potion)
+        assert game_map.get_items_at(1, 1) == []
+
+    def test_fov_cache(self):
+        """FT-10: Тест кэширования поля зрения."""
+        game_map = GameMap(10, 10)
+        game_map.tiles[5, :] = tile_types.floor
+
+        game_map.update_fov(2, 5, radius=8)
+        game_map.update_fov(2, 5, radius=8)  # Позиция не изменилась
+        assert (game_map.fov_cache_hits, game_map.fov_cache_misses) == (1, 1)
+
+        game_map.update_fov(3, 5, radius=8)
+        game_map.update_fov(2, 5, radius=8)  # Возврат на прежнюю позицию
+        assert (game_map.fov_cache_hits, game_map.fov_cache_misses) == (2, 2)
+
+        # Изменение тайлов сбрасывает кэш
+        game_map.tiles[4, 2] = tile_types.floor
+        game_map.mark_tiles_changed()
+        game_map.update_fov(2, 5, radius=8)
+        assert game_map.fov_cache_misses == 3
+        assert game_map.visible[4, 2]
+
+    def test_headless_step(self):
+        """FT-11: Тест безоконного режима движка."""
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action
+
+        engine = GameEngine(headless=True)
+        assert engine.context is None
+
+        observation = engine.observe()
+        assert observation.walkable.shape == (engine.map_height, engine.map_width)
+        assert observation.visible[engine.player.y, engine.player.x]
+        assert observation.entity_positions.shape == (len(engine.game_map.entities), 2)
+
+        # Наблюдения не меняются следующими ходами
+        explored = observation.explored.copy()
+        for action in (Action.MOVE_RIGHT, Action.MOVE_DOWN, Action.MOVE_LEFT, Action.MOVE_UP) * 5:
+            engine.step(action)
+        engine.game_map.explored[...] = True
+        assert np.array_equal(observation.explored, explored)
+        assert not np.shares_memory(observation.walkable, engine.game_map.tiles)
+
+        observation = engine.step(Action.OPEN_INVENTORY)
+        assert engine.show_inventory
+        observation = engine.step(Action.CLOSE_INVENTORY)
+        assert not engine.show_inventory
+        assert observation.turn == 22
+        assert not observation.done
+
+        assert engine.step(Action.QUIT).done
+
+    def test_seeded_replay(self, tmp_path):
+        """FT-12: Тест воспроизводимости партии по сиду и записи действий."""
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action, ActionLog
+        from rogue_n_roll.engine.replay import replay
+
+        moves = [Action.MOVE_UP, Action.MOVE_RIGHT, Action.MOVE_DOWN, Action.MOVE_LEFT, Action.PICK_UP]
+        engine = GameEngine(headless=True, seed=42)
+        for i in range(200):
+            engine.step(moves[(i * 7) % len(moves)])
+
+        path = tmp_path / "game.log"
+        engine.action_log.save(str(path))
+        log = ActionLog.load(str(path))
+        assert log.seed == 42 and len(log) == 200
+
+        checkpoints = []
+        replayed = replay(log, checkpoints=[100], on_checkpoint=lambda e: checkpoints.append(e.turn))
+        assert checkpoints == [100]
+        assert np.array_equal(replayed.game_map.tiles, engine.game_map.tiles)
+        assert np.array_equal(replayed.game_map.explored, engine.game_map.explored)
+        assert (replayed.player.x, replayed.player.y) == (engine.player.x, engine.player.y)
+
+    def test_batch_generation(self):
+        """FT-13: Тест параллельной генерации подземелий."""
+        from rogue_n_roll.map.batch import GenerationJob, generate_batch, generate_level, stack_tiles
+
+        jobs = [GenerationJob(seed=seed, map_width=60, map_height=40) for seed in range(6)]
+        parallel = generate_batch(jobs, max_workers=2, chunksize=1)
+        serial = [generate_level(job) for job in jobs]
+
+        for a, b in zip(parallel, serial):
+            assert a.tiles.tobytes() == b.tiles.tobytes()
+            assert np.array_equal(a.rooms, b.rooms)
+            assert np.array_equal(a.items, b.items)
+        assert stack_tiles(parallel).shape == (6, 40, 60)
+
+    def test_dense_room_placement(self):
+        """FT-14: Тест размещения комнат по маске занятости."""
+        import random
+        from rogue_n_roll.map.map_generator import DenseMapGenerator, RectangularRoom
+
+        generator = DenseMapGenerator(200, 150, max_rooms=1000, rng=random.Random(7), room_density=0.4)
+        game_map, rooms = generator.generate_map()
+
+        assert len(rooms) > 50
+        assert generator.placement_stats.rooms == len(rooms)
+        assert generator.placement_stats.rooms_per_second > 0
+        # Комнаты не пересекаются
+        for i, room in enumerate(rooms):
+            assert not any(room.intersects(other) for other in rooms[i + 1 :])
+
+        # Все комнаты связаны туннелями
+        walkable = game_map.tiles["walkable"]
+        reached = np.zeros_like(walkable)
+        start_x, start_y = rooms[0].center
+        stack = [(start_x, start_y)]
+        while stack:
+            x, y = stack.pop()
+            if reached[y, x] or not walkable[y, x]:
+                continue
+            reached[y, x] = True
+            stack.extend(((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)))
+        assert all(reached[room.center[1], room.center[0]] for room in rooms)
+
+        # Первая комната тоже участвует в поиске ближайшей для соединения
+        first = rooms[0]
+        probe = RectangularRoom(first.x1, first.y1, first.x2 - first.x1, first.y2 - first.y1)
+        assert generator._connection_target(rooms, probe) is first
+
+    def test_chunked_map(self, tmp_path):
+        """FT-15: Тест чанковой карты с вытеснением чанков на диск."""
+        import gc
+        import os
+        from rogue_n_roll.map.chunked_map import ChunkedGameMap
+
+        game_map = ChunkedGameMap(
+            1000, 1000, seed=3, chunk_size=32, max_resident_chunks=2,
+            storage_path=str(tmp_path / "chunks.bin"),
+        )
+        reference = game_map.tiles[0:32, 0:32].copy()
+        game_map.tiles[5, 5] = tile_types.floor
+        game_map.explored[5, 5] = True
+
+        # Обращение к другим чанкам вытесняет первый в файл
+        for cx in range(1, 5):
+            assert game_map.tiles[0, cx * 32].dtype == tile_types.tile_dt
+        assert game_map.resident_chunks == 2
+        assert game_map.chunks_evicted >= 3
+
+        # После загрузки с диска изменения сохранены
+        assert game_map.tiles["walkable"][5, 5]
+        assert game_map.explored[5, 5]
+        restored = game_map.tiles[0:32, 0:32]
+        restored_reference = reference.copy()
+        restored_reference[5, 5] = tile_types.floor
+        assert restored.tobytes() == restored_reference.tobytes()
+        assert game_map.chunks_loaded == 1
+
+        # Чанк генерируется детерминированно по сиду
+        with ChunkedGameMap(1000, 1000, seed=3, chunk_size=32) as other:
+            assert other.tiles[0:32, 32:64].tobytes() == game_map.tiles[0:32, 32:64].tobytes()
+        assert not os.path.exists(other.storage_path)
+
+        # Существующий файл подкачки не затирается без явного overwrite
+        with pytest.raises(FileExistsError):
+            ChunkedGameMap(64, 64, seed=3, storage_path=game_map.storage_path)
+        stale = tmp_path / "stale.bin"
+        stale.write_bytes(b"old")
+        ChunkedGameMap(64, 64, seed=3, storage_path=str(stale), overwrite=True).close()
+        assert stale.stat().st_size == 0
+        # Временный файл брошенной карты удаляется при ее сборке
+        forgotten = ChunkedGameMap(64, 64, seed=3)
+        forgotten_path = forgotten.storage_path
+        del forgotten
+        gc.collect()
+        assert not os.path.exists(forgotten_path)
+
+        # FOV и проходимость работают через общий интерфейс GameMap
+        ys, xs = np.nonzero(game_map.tiles["walkable"][0:32, 0:32])
+        game_map.update_fov(int(xs[0]), int(ys[0]), radius=8)
+        assert game_map.visible[int(ys[0]), int(xs[0])]
+        assert game_map.is_walkable(int(xs[0]), int(ys[0]))
+
+        # Несколько сущностей рисуются со смещением вида, как и сама карта
+        import tcod.console
+
+        ys, xs = np.nonzero(game_map.tiles["walkable"][500:532, 500:532])
+        px, py = int(xs[0]) + 500, int(ys[0]) + 500
+        game_map.update_fov(px, py, radius=8)
+        seen = [
+            (int(x) + 500, int(y) + 500) for x, y in zip(xs, ys)
+            if game_map.visible[int(y) + 500, int(x) + 500]
+        ][:3]
+        assert len(seen) == 3
+        monsters = [Monster.create_rat(x, y) for x, y in seen]
+        for monster in monsters:
+            game_map.add_entity(monster)
+        origin = (px - 20, py - 10)
+        console = tcod.console.Console(40, 20, order="F")
+        game_map.render(console, origin)
+        game_map.render_entities(console, origin)
+        for x, y in seen:
+            assert chr(console.rgb["ch"][x - origin[0], y - origin[1]]) == "r"
+        for monster in monsters:
+            game_map.remove_entity(monster)
+        game_map.close()
+
+    def test_entity_store(self):
+        """FT-16: Тест хранения сущностей в параллельных массивах."""
+        import gc
+        import tcod.console
+        from rogue_n_roll.game_objects.entity_store import default_store
+
+        store = default_store()
+        gc.collect()  # Освобождаем слоты мусора предыдущих тестов заранее
+        rat = Monster.create_rat(3, 4)
+        slot = rat.slot
+        assert (store.x[slot], store.y[slot], store.hp[slot]) == (3, 4, 5)
+        assert not hasattr(rat, "__dict__")
+
+        # Характеристики читаются и пишутся через хранилище
+        rat.stats.attack_power += 1
+        rat.stats.add_modifier("defense", 2)
+        assert store.attack[slot] == 3
+        assert rat.stats.get_effective_stat("defense") == 2
+        assert rat.stats.modifiers == {"defense": 2}
+
+        # Освобожденный слот переиспользуется
+        del rat
+        gc.collect()
+        orc = Monster.create_orc(1, 1)
+        assert orc.slot == slot
+        assert orc.stats.get_effective_stat("defense") == 1
+
+        # Видимые сущности рисуются одной записью в консоль
+        game_map = GameMap(10, 10)
+        game_map.add_entity(orc)
+        hidden = Monster.create_troll(5, 5)
+        game_map.add_entity(hidden)
+        game_map.visible[1, 1] = True
+        console = tcod.console.Console(10, 10, order="F")
+        game_map.render_entities(console)
+        assert chr(console.rgb["ch"][1, 1]) == "O"
+        assert chr(console.rgb["ch"][5, 5]) == " "
+
+        # Слоты сущностей карты берутся из ее индекса, а не из всего хранилища
+        assert game_map.entity_slots().tolist() == sorted((orc.slot, hidden.slot))
+        GameMap(10, 10).add_entity(Monster.create_rat(2, 2))
+        game_map.remove_entity(hidden)
+        assert game_map.entity_slots().tolist() == [orc.slot]
+
+        # Сборка циклов карта - сущность внутри allocate() не приводит к взаимоблокировке
+        import threading
+
+        def collect_under_lock() -> None:
+            cyclic = GameMap(10, 10)
+            for x in range(5):
+                cyclic.add_entity(Monster.create_rat(x, 0))
+            del cyclic
+            with store._lock:
+                gc.collect()
+
+        worker = threading.Thread(target=collect_under_lock, daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+        # Освобожденные при сборке слоты переиспользуются при следующем выделении
+        size = store.size
+        assert Monster.create_rat(0, 0).slot < size and not store._pending
+
+    def test_monster_ai(self):
+        """FT-17: Тест хода монстров по карте расстояний."""
+        from rogue_n_roll.engine.ai import take_monster_turns
+
+        # П-образный коридор: прямой путь к игроку перекрыт стеной
+        game_map = GameMap(10, 10)
+        game_map.tiles[1, 1:8] = tile_types.floor
+        game_map.tiles[1:5, 1] = tile_types.floor
+        game_map.tiles[1:5, 7] = tile_types.floor
+        player = Player(1, 4)
+        orc = Monster.create_orc(7, 4)
+        game_map.add_entity(player)
+        game_map.add_entity(orc)
+
+        take_monster_turns(game_map, player)
+        # Орк идет в обход стены, а не напрямую к игроку
+        assert (orc.x, orc.y) == (7, 3)
+
+        for _ in range(12):
+            take_monster_turns(game_map, player)
+        assert (orc.x, orc.y) == (1, 3)
+        assert player.stats.current_hp < player.stats.max_hp
+
+    def test_turn_scheduler(self):
+        """FT-18: Тест очереди ходов с учетом скорости."""
+        from rogue_n_roll.engine.scheduler import TurnScheduler
+
+        scheduler = TurnScheduler()
+        rat = Monster.create_rat(0, 0)  # Скорость 120
+        orc = Monster.create_orc(1, 0)  # Скорость 100
+        troll = Monster.create_troll(2, 0)  # Скорость 80
+        for monster in (rat, orc, troll):
+            scheduler.schedule(monster)
+
+        # В момент 0 действуют все сразу
+        assert scheduler.next_batch() == [rat, orc, troll]
+        for monster in (rat, orc, troll):
+            scheduler.reschedule(monster)
+
+        actions = {rat: 0, orc: 0, troll: 0}
+        while scheduler.time < 1200:
+            for monster in scheduler.next_batch():
+                actions[monster] += 1
+                scheduler.reschedule(monster)
+        assert actions[rat] > actions[orc] > actions[troll]
+
+        # Удаленные и погибшие сущности пропускаются
+        scheduler.remove(rat)
+        troll.take_damage(100)
+        batches = [scheduler.next_batch() for _ in range(3)]
+        assert all(monster is orc for batch in batches for monster in batch)
+        assert len(scheduler) == 0
+
+    def test_save_load(self, tmp_path):
+        """FT-19: Тест сохранения и загрузки партии."""
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action
+        from rogue_n_roll.engine.save import AutoSaver, load_game, save_game, snapshot, write_snapshot
+        from rogue_n_roll.game_objects.items import HealthPotion
+
+        moves = [Action.MOVE_UP, Action.MOVE_RIGHT, Action.MOVE_DOWN, Action.MOVE_LEFT, Action.PICK_UP]
+        engine = GameEngine(headless=True, seed=7)
+        engine.player.inventory.add_item(HealthPotion(0, 0))
+        for i in range(50):
+            engine.step(moves[(i * 3) % len(moves)])
+
+        path = str(tmp_path / "game.sav")
+        save_game(engine, path)
+        loaded = load_game(path, headless=True)
+        assert loaded.turn == engine.turn
+        assert len(loaded.player.inventory.items) == len(engine.player.inventory.items)
+        assert len(loaded.game_map.items) == len(engine.game_map.items)
+
+        # Загруженная партия продолжается так же, как исходная
+        for i in range(50):
+            action = moves[(i * 7) % len(moves)]
+            original, restored = engine.step(action), loaded.step(action)
+            assert original.player_position == restored.player_position
+            assert original.player_hp == restored.player_hp
+            assert np.array_equal(original.explored, restored.explored)
+            assert sorted(map(tuple, original.entity_positions)) == sorted(map(tuple, restored.entity_positions))
+        assert np.array_equal(loaded.action_log.as_array(), engine.action_log.as_array())
+
+        # Автосохранение пишет файл в фоне
+        autosave_path = str(tmp_path / "auto.sav")
+        engine.autosaver = AutoSaver(engine, autosave_path, every_turns=10)
+        for _ in range(10):
+            engine.step(Action.NONE)
+        engine.autosaver.close()
+        assert engine.autosaver.saves_written == 1
+        assert load_game(autosave_path, headless=True).turn == engine.turn
+
+        # Загруженная карта не держит файл сохранения, ошибки автосохранения не теряются
+        assert not isinstance(loaded.game_map.tiles, np.memmap)
+        save_game(loaded, path)
+        failing = AutoSaver(engine, str(tmp_path / "missing" / "auto.sav"))
+        failing.save_async()
+        failing.close()
+        assert failing.saves_failed == 1 and isinstance(failing.last_error, OSError)
+
+        # Сохраняются все посещенные этажи из кэша, а не только текущий
+        first = engine.dungeon.floors[0]
+        first.game_map.remove_item(next(iter(first.game_map.items)))
+        engine.change_floor(1)
+        save_game(engine, path)
+        loaded = load_game(path, headless=True)
+        assert list(loaded.dungeon.floors) == list(engine.dungeon.floors)
+        assert loaded.depth == 1 and loaded.game_map is loaded.dungeon.floors[1].game_map
+        restored = loaded.dungeon.floors[0]
+        assert restored.down_stairs == first.down_stairs and restored.scheduler.time == first.scheduler.time
+        assert np.array_equal(restored.game_map.explored, first.game_map.explored)
+        assert len(restored.game_map.items) == len(first.game_map.items)
+        assert sorted((e.name, e.x, e.y, e.stats.current_hp) for e in restored.game_map.entities) == sorted(
+            (e.name, e.x, e.y, e.stats.current_hp) for e in first.game_map.entities
+        )
+        next_turns = sorted((e.x, e.y, first.scheduler.next_turn(e) or -1) for e in first.game_map.entities)
+        assert next_turns == sorted(
+            (e.x, e.y, restored.scheduler.next_turn(e) or -1) for e in restored.game_map.entities
+        )
+        loaded.change_floor(0)
+        assert (loaded.player.x, loaded.player.y) == first.down_stairs
+
+        # Сохранение с тайлами чужого типа отклоняется
+        state = snapshot(engine)
+        state["floor0_tiles"] = np.zeros((engine.map_height, engine.map_width), dtype=np.int32)
+        write_snapshot(state, path)
+        with pytest.raises(ValueError):
+            load_game(path, headless=True)
+        engine.dungeon.shutdown()
+        loaded.dungeon.shutdown()
+
+    def test_bench_suite(self):
+        """FT-20: Тест набора замеров производительности."""
+        from rogue_n_roll.bench import SCENARIOS, compare, run_suite, to_json
+
+        results = run_suite(sizes=["small"], repeat=3)
+        assert {result.name for result in results} == set(SCENARIOS)
+        for result in results:
+            assert 0 <= result.min <= result.p50 <= result.p90 <= result.p99 <= result.max
+
+        current = to_json(results)
+        assert compare(current, current) == []
+
+        # Базовая линия вдвое быстрее: замедление обнаруживается, если порог его не допускает
+        baseline = {"results": {key: dict(value, p50=value["p50"] / 2) for key, value in current["results"].items()}}
+        assert len(compare(current, baseline, threshold=0.5)) == len(results)
+        assert compare(current, baseline, threshold=0.5, thresholds={"render": 1.5}) != []
+        assert all(r.key != "render/small" for r in compare(current, baseline, 0.5, {"render": 1.5}))
+
+    def test_profiler(self, tmp_path):
+        """FT-21: Тест профилировщика кадров и экспорта трассы."""
+        import json
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.profiler import Profiler
+
+        # Выключенный профилировщик ничего не записывает
+        profiler = Profiler()
+        with profiler.span("idle"):
+            pass
+        assert len(profiler.events) == 0
+
+        engine = GameEngine(headless=True, seed=3)
+        engine.show_profiler = True
+        engine.profiler.enabled = True
+        for _ in range(3):
+            engine.profiler.begin_frame()
+            engine.render()
+            engine.profiler.end_frame()
+
+        last, worst, phases = engine.profiler.summary()
+        assert len(engine.profiler.frames) == 3 and 0 < last <= worst
+        assert {"render", "fov", "map", "entities", "hud"} <= set(phases)
+        assert "FRAME" in str(engine.console)
+        # Панель профилировщика не затирает подсказки HUD
+        assert "EXPLORE" in str(engine.console)
+
+        path = tmp_path / "trace.json"
+        engine.profiler.export_chrome_trace(str(path))
+        trace = json.loads(path.read_text())
+        names = [event["name"] for event in trace["traceEvents"]]
+        assert names.count("frame") == 3 and names.count("fov") == 3
+        assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"])
+
+        # Ожидание ввода в игровом цикле не входит во время кадра
+        import time
+        import tcod.event
+
+        waits = []
+
+        def slow_wait(timeout):
+            time.sleep(0.05)
+            waits.append(timeout)
+            return [tcod.event.Quit()] if len(waits) == 3 else []
+
+        engine.profiler.frames.clear()
+        engine.wait_events = slow_wait
+        engine._run_frames()
+        assert len(engine.profiler.frames) == 3
+        assert max(frame for frame, _ in engine.profiler.frames) < 40
+        assert "wait" not in engine.profiler.summary()[2]
+        assert sum(1 for event in engine.profiler.events if event[0] == "wait") == 3
+
+    def test_startup_resources(self, capsys):
+        """FT-22: Тест ленивых импортов и загрузки ресурсов из пакета."""
+        import subprocess
+        import sys
+        from rogue_n_roll.engine.game_engine import GameEngine, load_tileset
+
+        # Генерация карт и игровые объекты не требуют tcod
+        code = (
+            "import sys, rogue_n_roll.map.batch, rogue_n_roll.game_objects.items; "
+            "print('tcod' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
+
+        # Шрифт загружается из данных пакета
+        assert load_tileset().tile_shape == (10, 10)
+
+        # Отчет о запуске не печатается поверх игрового экрана
+        engine = GameEngine(headless=True, seed=1)
+        engine.startup_profile = True
+        engine._report_startup()
+        assert not engine.startup_profile and capsys.readouterr().out == ""
+        assert engine._startup_report.startswith("Время запуска")
+
+    def test_dungeon_floors(self):
+        """FT-23: Тест многоэтажного подземелья с фоновой генерацией этажей."""
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action
+        from rogue_n_roll.engine.dungeon import Dungeon, Floor
+
+        def teleport(engine, position):
+            engine.game_map.remove_entity(engine.player)
+            engine.player.x, engine.player.y = position
+            engine.game_map.add_entity(engine.player)
+
+        engine = GameEngine(headless=True, seed=11)
+        first = engine.dungeon.floors[0]
+        assert first.up_stairs is None
+        assert Floor.from_map(0, first.game_map, first.scheduler).down_stairs == first.down_stairs
+
+        # Подняться с первого этажа и спуститься не с лестницы нельзя
+        assert not engine.perform(Action.ASCEND) and engine.depth == 0
+        assert engine.step(Action.DESCEND).turn == 1 and engine.depth == 0
+
+        teleport(engine, first.down_stairs)
+        engine.dungeon._pending[1].result()  # Дожидаемся фоновой генерации
+        engine.step(Action.DESCEND)
+        second = engine.dungeon.floors[1]
+        assert engine.depth == 1 and engine.game_map is second.game_map
+        assert (engine.player.x, engine.player.y) == second.up_stairs
+        assert engine.player not in first.game_map.entities
+        assert engine.dungeon.prefetch_hits == 1  # Этаж был сгенерирован заранее
+        assert 2 in engine.dungeon._pending
+
+        # Возвращение наверх берет этаж из кэша вместе с его состоянием
+        engine.step(Action.ASCEND)
+        assert engine.game_map is first.game_map
+        assert (engine.player.x, engine.player.y) == first.down_stairs
+
+        # Этажи зависят только от сида и глубины; кэш ограничен
+        dungeon = Dungeon(seed=11, map_width=80, map_height=43, max_cached_floors=2)
+        assert np.array_equal(dungeon.get(1).game_map.tiles, second.game_map.tiles)
+        dungeon.get(2)
+        dungeon.get(3)
+        assert list(dungeon.floors) == [2, 3]
+        dungeon.shutdown()
+        engine.dungeon.shutdown()
+
+    def test_event_coalescing(self):
+        """FT-24: Тест схлопывания событий и версии состояния для перерисовки."""
+        import tcod.event
+        from rogue_n_roll.engine.game_engine import GameEngine
+
+        def key(sym, repeat=False):
+            return tcod.event.KeyDown(
+                scancode=tcod.event.Scancode.A, sym=sym, mod=tcod.event.Modifier.NONE, repeat=repeat
+            )
+
+        engine = GameEngine(headless=True, seed=5)
+        version = engine.state_version
+
+        # Неигровые клавиши не меняют состояние и не требуют перерисовки
+        assert not engine.handle_events([key(tcod.event.KeySym.Z), key(tcod.event.KeySym.X)])
+        assert engine.state_version == version and len(engine.action_log) == 0
+
+        # Автоповторы удерживаемой клавиши схлопываются до одного на пачку
+        events = [key(tcod.event.KeySym.RIGHT)] + [key(tcod.event.KeySym.RIGHT, repeat=True)] * 5
+        assert not engine.handle_events(events)
+        assert len(engine.action_log) == 2
+        assert engine.state_version == version + 2
+        # Кадр перерисовывается один раз на изменение состояния
+        assert engine.render_if_dirty() and not engine.render_if_dirty()
+
+        # Выход прерывает обработку пачки
+        assert engine.handle_events([key(tcod.event.KeySym.ESCAPE), key(tcod.event.KeySym.RIGHT)])
+        assert len(engine.action_log) == 3
+
+    def test_auto_explore_and_run(self, monkeypatch):
+        """FT-25: Тест автоисследования и бега с остановкой на событиях."""
+        import rogue_n_roll.engine.game_engine as game_engine_module
+        import rogue_n_roll.engine.explore as explore_module
+        from rogue_n_roll.engine.explore import explore_field
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action
+        from rogue_n_roll.game_objects.items import HealthPotion
+
+        game_map = GameMap(40, 7)
+        game_map.tiles[3, 1:39] = tile_types.floor  # Длинный коридор
+        engine = GameEngine(headless=True, seed=0, generate_world=False)
+        engine.game_map = game_map
+        engine.player = Player(1, 3)
+        game_map.add_entity(engine.player)
+        game_map.update_fov(1, 3, radius=8)
+
+        # Одна команда проходит весь коридор
+        engine.step(Action.EXPLORE)
+        assert engine.turn == engine.player.x - 1  # Каждый шаг - отдельный ход
+        assert engine.player.x >= 30  # Конец коридора виден с расстояния FOV_RADIUS
+        assert game_map.explored[3, 1:39].all()
+        assert engine._auto_move(Action.EXPLORE) == 0  # Исследовать больше нечего
+
+        # Команда без единого шага не занимает ход и не записывается
+        turn, logged = engine.turn, len(engine.action_log)
+        engine.step(Action.EXPLORE)
+        assert (engine.turn, len(engine.action_log)) == (turn, logged)
+
+        # Бег останавливается на предмете
+        potion = HealthPotion(20, 3)
+        game_map.add_item(potion)
+        engine.step(Action.RUN_LEFT)
+        assert (engine.player.x, engine.player.y) == (20, 3)
+
+        # ...и при появлении монстра в поле зрения, не доходя до него
+        game_map.remove_item(potion)
+        engine.step(Action.RUN_LEFT)
+        assert engine.player.x == 1
+        rat = Monster.create_rat(35, 3)
+        game_map.add_entity(rat)
+        engine.scheduler.reschedule(rat)
+        engine.step(Action.RUN_RIGHT)
+        assert engine.player.x < rat.x - 1
+        assert rat.slot in engine.visible_hostiles()
+        # При монстре в поле зрения автоисследование не начинается
+        assert engine._auto_move(Action.EXPLORE) == 0
+
+        # Пока новые клетки не открываются, шаги идут по уже построенной карте расстояний
+        fields = []
+
+        def counted(game_map):
+            fields.append(game_map)
+            return explore_field(game_map)
+
+        monkeypatch.setattr(game_engine_module, "explore_field", counted)
+        monkeypatch.setattr(explore_module, "explore_field", counted)
+        far_map = GameMap(40, 7)
+        far_map.tiles[3, 1:39] = tile_types.floor
+        far_map.explored[:, :38] = True  # Граница исследованного - в дальнем конце коридора
+        engine = GameEngine(headless=True, seed=0, generate_world=False)
+        engine.game_map = far_map
+        engine.player = Player(1, 3)
+        far_map.add_entity(engine.player)
+        engine.step(Action.EXPLORE)
+        assert engine.player.x >= 30
+        assert len(fields) < engine.turn // 2
+
+    def test_batch_combat(self):
+        """FT-26: Тест пакетного разрешения боя и совпадения с поштучными ударами."""
+        import random
+        from rogue_n_roll.engine.combat import attack_damage, resolve_attacks, resolve_store_attacks
+        from rogue_n_roll.game_objects.entity_store import default_store
+
+        rng = random.Random(19)
+        fighters = []
+        for _ in range(40):
+            stats = Stats(
+                max_hp=rng.randint(1, 30),
+                current_hp=rng.randint(0, 30),
+                attack_power=rng.randint(0, 8),
+                defense=rng.randint(0, 8),
+            )
+            monster = Monster(0, 0, "m", (0, 0, 0), "Боец", 1, 0, 0)
+            monster.stats.load(stats)
+            monster.stats.add_modifier("attack_power", rng.randint(0, 3))
+            monster.stats.add_modifier("defense", rng.randint(0, 3))
+            fighters.append(monster)
+        pairs = [(rng.randrange(40), rng.randrange(40)) for _ in range(200)]
+
+        store = default_store()
+        slots = np.array([fighter.slot for fighter in fighters])
+        attack, defense = store.attack[slots].copy(), store.defense[slots].copy()
+        modifiers, hp = store.modifiers[slots].copy(), store.hp[slots].copy()
+        alive_before = hp > 0
+
+        # Пакет на копиях столбцов
+        attackers, defenders = np.array(pairs).T
+        result = resolve_attacks(attackers, defenders, attack, defense, hp, modifiers)
+
+        # Поштучный путь через объекты
+        expected_damage = []
+        for a, d in pairs:
+            before = fighters[d].stats.current_hp
+            fighters[a].attack(fighters[d])
+            expected_damage.append(
+                attack_damage(
+                    fighters[a].stats.get_effective_stat("attack_power"),
+                    fighters[d].stats.get_effective_stat("defense"),
+                )
+            )
+            assert fighters[d].stats.current_hp == max(0, before - expected_damage[-1])
+
+        assert result.damage.tolist() == expected_damage
+        assert hp.tolist() == store.hp[slots].tolist()
+        assert sorted(result.killed.tolist()) == np.flatnonzero(alive_before & (hp == 0)).tolist()
+
+        # Пакет прямо в хранилище: минимальный урон 1 даже при высокой защите
+        tank = Monster(0, 0, "t", (0, 0, 0), "Танк", 10, 0, 50)
+        resolve_store_attacks(np.array([fighters[0].slot] * 3), np.array([tank.slot] * 3))
+        assert tank.stats.current_hp == 7
+
+    def test_simulation(self):
+        """FT-27: Тест симуляции партий для балансировки."""
+        from rogue_n_roll.simulate import aggregate, format_report, run_games
+
+        serial = run_games(range(4), max_turns=60, max_workers=1)
+        parallel = run_games(range(4), max_turns=60, max_workers=2, chunksize=2)
+        assert serial == parallel  # Партии детерминированы по сиду
+
+        for record in serial:
+            assert record.outcome in ("win", "death", "timeout")
+            assert 0 < record.turns <= 60
+            if record.outcome == "death":
+                assert record.killed_by in record.damage_taken
+
+        report = aggregate(serial)
+        assert report["games"] == 4 and sum(report["outcomes"].values()) == 4
+        assert "Партий: 4" in format_report(report)
+
+    def test_game_server(self):
+        """FT-28: Тест сервера с потоковой передачей изменений экрана в ANSI."""
+        import asyncio
+        import tcod.console
+        import tcod.event
+        from rogue_n_roll.server import GameServer
+        from rogue_n_roll.ui.ansi import SCREEN_START, AnsiEncoder, KeyDecoder
+
+        # Разбор ввода: стрелки, Shift+стрелка, команды telnet, последовательность по частям
+        decoder = KeyDecoder()
+        events = decoder.feed(b"\xff\xfb\x01g>\x1b[1;2C\r\n\x1b[")
+        assert [event.sym for event in events] == [
+            tcod.event.KeySym.G,
+            tcod.event.KeySym.PERIOD,
+            tcod.event.KeySym.RIGHT,
+            tcod.event.KeySym.RETURN,
+        ]
+        assert events[2].mod & tcod.event.Modifier.SHIFT
+        assert [event.sym for event in decoder.feed(b"A\x1b")] == [tcod.event.KeySym.UP]
+        # ESC в конце пачки ждет продолжения: разрезанная стрелка не превращается в Escape
+        assert decoder.pending_escape and [event.sym for event in decoder.feed(b"[C")] == [tcod.event.KeySym.RIGHT]
+        decoder.feed(b"\x1b")
+        assert [event.sym for event in decoder.feed(b"q")] == [tcod.event.KeySym.ESCAPE, tcod.event.KeySym.Q]
+        decoder.feed(b"\x1b")
+        assert [event.sym for event in decoder.flush()] == [tcod.event.KeySym.ESCAPE] and not decoder.flush()
+
+        # Первый кадр выводится целиком, дальше - только изменившиеся клетки
+        console = tcod.console.Console(20, 5, order="F")
+        encoder = AnsiEncoder()
+        assert encoder.encode(console).startswith(SCREEN_START.encode())
+        assert encoder.encode(console) == b""
+        console.print(3, 2, "@", fg=(255, 255, 255))
+        assert encoder.encode(console).count(b"H") == 1  # Одно перемещение курсора
+
+        async def play():
+            server = GameServer(port=0, seed=3)
+            await server.start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            assert SCREEN_START.encode() in await reader.readuntil(b"@")
+            session = next(iter(server.sessions.values()))
+            full_frame = session.bytes_sent
+
+            # Генерация соседнего этажа ожидается без блокировки цикла asyncio
+            for future in session.pending_floors():
+                await asyncio.wrap_future(future)
+            assert not session.pending_floors()
+            dungeon = session.engine.dungeon
+            dungeon.get(1)
+            assert (dungeon.prefetch_hits, dungeon.prefetch_misses) == (1, 0)
+
+            writer.write(b"i")  # Открываем инвентарь: меняется часть экрана
+            await writer.drain()
+            while session.encoder.frames < 2:
+                await reader.read(65536)
+            assert 0 < session.bytes_sent - full_frame < full_frame
+
+            writer.write(b"\x1b\x1b")  # Закрыть инвентарь и выйти
+            await writer.drain()
+            tail = b""
+            while not reader.at_eof():
+                tail += await reader.read(65536)
+            assert "До встречи".encode() in tail
+            assert server.stats().sessions == 0 and server.total_sessions == 1
+            writer.close()
+            await server.close()
+
+        asyncio.run(asyncio.wait_for(play(), timeout=30))
+
+    def test_terminal_renderer(self):
+        """FT-29: Тест вывода в терминал: экран после ANSI-вывода совпадает с консолью."""
+        import io
+        import os
+        import random
+        import re
+        import tcod.console
+        import tcod.event
+        from rogue_n_roll.ui.ansi import AnsiEncoder, console_frame
+        from rogue_n_roll.ui.terminal import TerminalRenderer
+
+        width, height = 30, 8
+        screen = {}
+        state = {"cursor": (0, 0), "fg": None, "bg": None}
+
+        def apply(data: bytes) -> None:
+            """Простейший эмулятор терминала: курсор, цвета truecolor и символы."""
+            for params, command, char in re.findall(r"\x1b\[([0-9;?]*)([A-Za-z])|(.)", data.decode("utf-8"), re.S):
+                x, y = state["cursor"]
+                if char:
+                    screen[x, y] = (char, state["fg"], state["bg"])
+                    state["cursor"] = (x + 1, y)
+                elif command == "H":
+                    row, _, column = params.partition(";")
+                    state["cursor"] = (int(column or 1) - 1, int(row or 1) - 1)
+                elif command == "C":
+                    state["cursor"] = (x + int(params or 1), y)
+                elif command == "m":
+                    codes = [int(code) for code in params.split(";") if code]
+                    while codes:
+                        code = codes.pop(0)
+                        if code == 0:
+                            state["fg"] = state["bg"] = None
+                        elif code in (38, 48):
+                            color = tuple(codes[1:4])
+                            del codes[:4]
+                            state["fg" if code == 38 else "bg"] = color
+                elif command == "J":
+                    screen.clear()
+
+        def check(console) -> None:
+            frame = console_frame(console)
+            for y in range(height):
+                for x in range(width):
+                    char, fg, bg = screen[x, y]
+                    ch = int(frame["ch"][y, x])
+                    assert char == (chr(ch) if ch > 32 else " ")
+                    assert bg == tuple(frame["bg"][y, x])
+                    if char != " ":
+                        assert fg == tuple(frame["fg"][y, x])
+
+        # Случайные изменения: после каждого кадра экран терминала совпадает с консолью
+        rng = random.Random(7)
+        palette = [(0, 0, 0), (255, 255, 255), (200, 40, 40), (40, 200, 40)]
+        console = tcod.console.Console(width, height, order="F")
+        encoder = AnsiEncoder()
+        apply(encoder.encode(console))
+        check(console)
+        for _ in range(30):
+            for _ in range(rng.randint(0, 4)):
+                console.print(
+                    rng.randrange(width),
+                    rng.randrange(height),
+                    rng.choice(["@", "ab", "  ", "#.#", "═"]),
+                    fg=rng.choice(palette),
+                    bg=rng.choice(palette),
+                )
+            apply(encoder.encode(console))
+            check(console)
+
+        # Отрезок одного цвета: одно перемещение курсора и одна смена цветов
+        console.clear()
+        encoder.encode(console)
+        console.print(2, 3, "hello", fg=(255, 0, 0))
+        output = encoder.encode(console)
+        assert output.count(b"H") == 1 and output.count(b"m") == 1
+
+        # Терминальный вывод: кадры в поток, ввод из файлового дескриптора
+        read_fd, write_fd = os.pipe()
+        output = io.BytesIO()
+        renderer = TerminalRenderer(input_fd=read_fd, output=output)
+        try:
+            renderer.open()
+            renderer.present(console)
+            assert b"hello" in output.getvalue()
+            assert renderer.wait(0) == []
+            os.write(write_fd, b"\x1b[A\x03")
+            events = renderer.wait(1)
+            assert events[0].sym == tcod.event.KeySym.UP and isinstance(events[1], tcod.event.Quit)
+            # Одиночный ESC становится клавишей после короткого ожидания продолжения
+            os.write(write_fd, b"\x1b")
+            assert [event.sym for event in renderer.wait(1)] == [tcod.event.KeySym.ESCAPE]
+            renderer.close()
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_ui_panels(self):
+        """FT-30: Тест кэшируемых панелей интерфейса и виртуализированного инвентаря."""
+        from rogue_n_roll.engine.game_engine import GameEngine
+        from rogue_n_roll.engine.actions import Action
+        from rogue_n_roll.game_objects.items import HealthPotion
+
+        engine = GameEngine(headless=True, seed=4)
+        engine.render()
+        hud = engine.hud_panel
+        assert "HEALTH:" in str(engine.console) and "30/30" in str(engine.console)
+
+        # Без изменения характеристик панель только переносится на экран
+        engine.render()
+        engine.step(Action.MOVE_LEFT)
+        engine.render()
+        assert hud.redraws == 1
+        engine.player.stats.current_hp -= 1
+        engine.render()
+        assert hud.redraws == 2 and "29/30" in str(engine.console)
+
+        # Большой инвентарь: рисуется только видимое окно списка
+        engine.player.inventory.capacity = 500
+        engine.player.inventory.items.extend(HealthPotion(0, 0) for _ in range(500))
+        engine.step(Action.OPEN_INVENTORY)
+        engine.render()
+        panel = engine.inventory_panel
+        last_row = panel.LIST_TOP + panel.rows - 1
+
+        def marker(y):
+            return chr(panel.console.rgb["ch"][panel.width - 3, y])
+
+        assert str(engine.console).count("Health Potion") == panel.rows
+        assert marker(panel.LIST_TOP) == " " and marker(last_row) == "↓"
+
+        engine.selected_item_index = 499
+        engine.render()
+        assert panel.scroll == 500 - panel.rows
+        assert "500) Health Potion" in str(engine.console)
+        assert marker(panel.LIST_TOP) == "↑" and marker(last_row) == " "
+        redraws = panel.redraws
+        engine.render()
+        assert panel.redraws == redraws
+
+    def test_content_registry(self, tmp_path, monkeypatch):
+        """FT-31: Тест реестра контента с кэшем и предметов-легковесов."""
+        import json
+        import shutil
+        from importlib import resources
+        from rogue_n_roll.game_objects import content as content_module
+        from rogue_n_roll.game_objects.items import HealthPotion, ScrollOfLightning, create_item
+
+        # Предметы хранят только шаблон и собственное состояние
+        potion, other = HealthPotion(1, 2), HealthPotion(3, 4)
+        assert not hasattr(potion, "__dict__")
+        assert potion.template is other.template and potion.type_id == 0
+        assert (potion.char, potion.name) == ("!", "Health Potion")
+        assert isinstance(create_item("scroll_of_lightning", 0, 0), ScrollOfLightning)
+        rat = Monster.spawn("rat", 0, 0)
+        assert (rat.name, rat.char, rat.stats.max_hp, rat.stats.speed) == ("Крыса", "r", 5, 120)
+
+        # Новый тип с известным действием добавляется только в данные
+        data_dir = tmp_path / "data"
+        shutil.copytree(resources.files("rogue_n_roll") / "resources" / "content", data_dir)
+        items = json.loads((data_dir / "items.json").read_text(encoding="utf-8"))
+        items.append({"key": "elixir", "char": "!", "color": [0, 0, 255], "name": "Elixir", "effect": "heal", "power": 10})
+        (data_dir / "items.json").write_text(json.dumps(items), encoding="utf-8")
+
+        cache_dir = tmp_path / "cache"
+        registry = content_module.load_content(str(data_dir), str(cache_dir))
+        elixir = registry.item("elixir")
+        assert elixir.type_id == 4 and registry.item(4) is elixir and elixir.description == ""
+        assert len(list(cache_dir.iterdir())) == 1
+
+        # Повторная загрузка берет готовый кэш без разбора файлов данных
+        def fail(sources):
+            raise AssertionError("файлы данных разобраны повторно")
+
+        monkeypatch.setattr(content_module, "compile_content", fail)
+        assert content_module.load_content(str(data_dir), str(cache_dir)).item("elixir") == elixir
+        monkeypatch.undo()
+
+        # Изменение данных пересобирает кэш; ошибки в данных сообщаются явно
+        items[-1]["power"] = 12
+        (data_dir / "items.json").write_text(json.dumps(items), encoding="utf-8")
+        assert content_module.load_content(str(data_dir), str(cache_dir)).item("elixir").power == 12
+        del items[-1]["char"]
+        (data_dir / "items.json").write_text(json.dumps(items), encoding="utf-8")
+        with pytest.raises(ValueError):
+            content_module.load_content(str(data_dir), str(cache_dir))
+
+        # Типы, добавленные только в данные, появляются при генерации этажей по весам
+        from rogue_n_roll.engine.dungeon import Dungeon
+
+        items[-1]["char"] = "!"
+        for entry in items[:-1]:
+            entry["weight"] = 0
+        monsters = json.loads((data_dir / "monsters.json").read_text(encoding="utf-8"))
+        for entry in monsters:
+            entry["weight"] = 0
+        monsters.append({"key": "goblin", "char": "g", "color": [0, 128, 0], "name": "Гоблин",
+                         "max_hp": 7, "attack_power": 3, "defense": 0})
+        (data_dir / "items.json").write_text(json.dumps(items), encoding="utf-8")
+        (data_dir / "monsters.json").write_text(json.dumps(monsters), encoding="utf-8")
+        monkeypatch.setenv(content_module.CONTENT_ENV, str(data_dir))
+        monkeypatch.setenv(content_module.CACHE_ENV, str(cache_dir))
+        content_module.content.cache_clear()
+        try:
+            dungeon = Dungeon(seed=1, map_width=80, map_height=43)
+            game_map = dungeon.get(0).game_map
+            dungeon.shutdown()
+            assert game_map.items and {item.name for item in game_map.items} == {"Elixir"}
+            assert game_map.entities and {entity.name for entity in game_map.entities} == {"Гоблин"}
+        finally:
+            monkeypatch.undo()
+            content_module.content.cache_clear()
+
+    def test_spatial_queries(self):
+        """FT-32: Тест пространственных запросов карты в сравнении с полным перебором."""
+        import random
+        from rogue_n_roll.game_objects.items import ScrollOfLightning
+
+        rng = random.Random(5)
+        game_map = GameMap(60, 40)
+        game_map.tiles[1:39, 1:59] = tile_types.floor
+        monsters = []
+        for _ in range(150):
+            x, y = rng.randrange(1, 59), rng.randrange(1, 39)
+            if game_map.is_walkable(x, y):
+                monster = Monster.create_rat(x, y)
+                game_map.add_entity(monster)
+                monsters.append(monster)
+        # Часть сущностей перемещается между ячейками индекса, часть покидает карту
+        for monster in monsters[:60]:
+            monster.move(rng.choice((-1, 1)), rng.choice((-1, 1)))
+        for monster in monsters[60:80]:
+            game_map.remove_entity(monster)
+
+        def brute(x, y, radius, predicate=lambda entity: True):
+            found = [
+                entity
+                for entity in game_map.entities
+                if predicate(entity) and (entity.x - x) ** 2 + (entity.y - y) ** 2 <= radius * radius
+            ]
+            return sorted(found, key=lambda entity: (entity.x - x) ** 2 + (entity.y - y) ** 2)
+
+        odd = lambda entity: entity.slot % 2 == 1
+        for _ in range(200):
+            x, y, radius = rng.randrange(60), rng.randrange(40), rng.randrange(0, 20)
+            assert game_map.within_radius(x, y, radius) == brute(x, y, radius)
+            expected = brute(x, y, radius, odd)
+            assert game_map.nearest(x, y, odd, max_radius=radius) == (expected[0] if expected else None)
+            assert game_map.nearest(x, y) == brute(x, y, 100)[0]
+
+        # Поле зрения: только видимые сущности в его радиусе
+        player = Player(30, 20)
+        game_map.add_entity(player)
+        game_map.tiles[20, 25] = tile_types.wall
+        game_map.update_fov(player.x, player.y, radius=8)
+        seen = game_map.within_fov(lambda entity: entity is not player)
+        assert seen == [
+            entity for entity in brute(30, 20, 100) if entity is not player and game_map.visible[entity.y, entity.x]
+        ]
+
+        # Свиток молнии бьет ближайшую живую цель в пределах дальности
+        target = game_map.nearest(player.x, player.y, lambda entity: entity is not player)
+        scroll = ScrollOfLightning(player.x, player.y)
+        hp = target.stats.current_hp
+        in_range = player.distance_to(target) <= scroll.template.range
+        assert scroll.use(player) is in_range
+        assert (target.stats.current_hp < hp) is in_range
+        assert GameMap(10, 10).nearest(5, 5) is None